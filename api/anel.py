@@ -0,0 +1,56 @@
+"""
+Anel de hash consistente: diz qual worker é dono de cada game_id.
+
+Cada nó ocupa `replicas` pontos no anel (nós virtuais), para a carga
+ficar equilibrada; o dono de uma chave é o primeiro ponto no sentido
+horário a partir do hash dela. Quando um nó sai ou entra, só as chaves
+dos pontos dele mudam de dono (~1/N dos jogos), as outras ficam onde
+estavam.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect
+from hashlib import blake2b
+from typing import Iterable
+
+
+REPLICAS = 128
+
+
+def _hash(texto: str) -> int:
+    return int.from_bytes(blake2b(texto.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class AnelConsistente:
+    def __init__(self, nos: Iterable[str], replicas: int = REPLICAS):
+        self.nos = tuple(sorted(set(nos)))
+        if not self.nos:
+            raise ValueError("O anel precisa de pelo menos um nó.")
+        self.replicas = replicas
+        pontos = sorted((_hash(f"{no}#{i}"), no) for no in self.nos for i in range(replicas))
+        self._hashes = [h for h, _ in pontos]
+        self._donos = [no for _, no in pontos]
+
+    def dono(self, chave: str) -> str:
+        i = bisect(self._hashes, _hash(chave))
+        return self._donos[i % len(self._donos)]
+
+    def sem(self, no: str) -> "AnelConsistente":
+        return AnelConsistente([n for n in self.nos if n != no], self.replicas)
+
+    def com(self, no: str) -> "AnelConsistente":
+        return AnelConsistente([*self.nos, no], self.replicas)
+
+    def __contains__(self, no: str) -> bool:
+        return no in self.nos
+
+    def __eq__(self, outro) -> bool:
+        return (
+            isinstance(outro, AnelConsistente)
+            and self.nos == outro.nos
+            and self.replicas == outro.replicas
+        )
+
+    def __repr__(self) -> str:
+        return f"AnelConsistente({list(self.nos)!r})"
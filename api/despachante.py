@@ -0,0 +1,459 @@
+"""
+Vários workers com os jogos em memória: despachante + supervisor.
+
+Cada jogo vive na memória de um worker só (um processo uvicorn com
+api.main:app). O dono de cada game_id vem de um anel de hash consistente
+(api/anel.py), e o despachante encaminha cada requisição com `game_id`
+(/command, /turno, /state, /ws...) para o dono. O resto (/new_game,
+/lote/novos, /mapas...) vai para qualquer worker, em rodízio: o worker
+só cria ids que o anel dá para ele. O /lote/turnos é dividido por dono,
+as partes vão em paralelo e os resultados voltam juntos.
+
+    python -m api.despachante --workers 4 --porta 8000
+    python -m pytest tests/test_despachante.py   # 3 workers locais + failover
+
+O despachante também supervisiona os workers: se um morre, sai do anel
+(os jogos dele passam para os outros, que os carregam do SQLite
+compartilhado em ARIA_DB) e é reiniciado; quando volta a responder,
+entra de novo no anel e recebe os jogos de volta. A troca de anel tem
+duas fases: primeiro todos os workers gravam e soltam o que deixou de
+ser deles (POST /_cluster/anel), só depois o despachante passa a
+encaminhar pelo anel novo. Requisições que caem no meio da troca recebem
+421 do worker e são reenviadas.
+
+O que um worker morto ainda não tinha gravado (até ~0,5 s de escrita
+atrasada) se perde; reinícios normais (SIGTERM) gravam tudo antes de sair.
+Precisa do httpx (e do websockets para o /ws).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+from api.anel import AnelConsistente
+
+try:
+    from websockets.asyncio.client import connect as conectar_ws
+    from websockets.exceptions import ConnectionClosed, InvalidHandshake
+except ImportError:  # só o /ws depende dele
+    conectar_ws = None
+
+
+INTERVALO_SUPERVISAO = 0.2  # s entre checagens dos processos
+TIMEOUT_PARTIDA = 20.0  # s para um worker novo responder
+ESPERA_REINICIO = 1.0  # s antes de reiniciar um worker que morreu
+TENTATIVAS = 4  # envios de uma requisição (421 / worker fora do ar)
+
+# Cabeçalhos que não passam pelo proxy (hop-by-hop, ou refeitos aqui)
+_NAO_REPASSAR = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "host",
+    "content-length",
+}
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# -------------------------------
+# Workers (processos)
+# -------------------------------
+
+
+class Worker:
+    """Um processo uvicorn com api.main:app, ouvindo só em 127.0.0.1."""
+
+    def __init__(self, nome: str, porta: int):
+        self.nome = nome
+        self.porta = porta
+        self.url = f"http://127.0.0.1:{porta}"
+        self.processo: Optional[subprocess.Popen] = None
+        self.morreu_em = 0.0
+        self.reinicios = 0
+
+    def iniciar(self, anel: list[str], token: str, caminho_db: str):
+        env = dict(
+            os.environ,
+            ARIA_NO=self.nome,
+            ARIA_ANEL=",".join(anel),
+            ARIA_CLUSTER_TOKEN=token,
+            ARIA_DB=caminho_db,
+        )
+        self.processo = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "api.main:app",
+                "--host", "127.0.0.1", "--port", str(self.porta),
+                "--log-level", "warning", "--no-access-log",
+            ],
+            env=env,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+
+    def vivo(self) -> bool:
+        return self.processo is not None and self.processo.poll() is None
+
+    def parar(self, timeout: float = 10.0):
+        if self.processo is None or self.processo.poll() is not None:
+            return
+        self.processo.terminate()  # SIGTERM: uvicorn grava a fila do SQLite antes de sair
+        try:
+            self.processo.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.processo.kill()
+            self.processo.wait()
+
+
+# -------------------------------
+# Despachante
+# -------------------------------
+
+
+class Despachante:
+    """
+    Mantém o anel dos workers ativos, encaminha requisições para o dono
+    de cada jogo e reinicia quem morrer.
+    """
+
+    def __init__(self, workers: int = 2, caminho_db: str = "aria_jogos.db", porta_base: Optional[int] = None):
+        if workers < 1:
+            raise ValueError("Use pelo menos 1 worker.")
+        if not caminho_db:
+            raise ValueError("Com vários workers, ARIA_DB não pode ser vazio (o disco é compartilhado).")
+        self.caminho_db = caminho_db
+        self.token = secrets.token_hex(16)
+        self.workers = {
+            f"w{i}": Worker(f"w{i}", porta_base + i if porta_base else porta_livre())
+            for i in range(workers)
+        }
+        self.ativos: set[str] = set()
+        self.anel: Optional[AnelConsistente] = None
+        self._estavel = asyncio.Event()  # limpo durante uma troca de anel
+        self._troca = asyncio.Lock()
+        self._rodizio = itertools.count()
+        self._supervisor: Optional[asyncio.Task] = None
+        self.cliente: Optional[httpx.AsyncClient] = None
+        self.total_reenvios = 0
+
+    # ---- ciclo de vida ----
+
+    async def iniciar(self):
+        self.cliente = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=2.0),
+            limits=httpx.Limits(max_connections=256, max_keepalive_connections=64),
+        )
+        nomes = sorted(self.workers)
+        for w in self.workers.values():
+            w.iniciar(nomes, self.token, self.caminho_db)
+        await asyncio.gather(*(self._esperar_saude(w) for w in self.workers.values()))
+        await self._trocar_anel(set(nomes))
+        self._supervisor = asyncio.create_task(self._supervisionar())
+
+    async def encerrar(self):
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+        await asyncio.gather(
+            *(asyncio.to_thread(w.parar) for w in self.workers.values()), return_exceptions=True
+        )
+        if self.cliente is not None:
+            await self.cliente.aclose()
+
+    async def _esperar_saude(self, worker: Worker) -> bool:
+        limite = time.monotonic() + TIMEOUT_PARTIDA
+        while time.monotonic() < limite and worker.vivo():
+            try:
+                r = await self.cliente.get(
+                    worker.url + "/_cluster/saude", headers={"X-Aria-Token": self.token}
+                )
+                if r.status_code == 200:
+                    return True
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+        return False
+
+    async def _trocar_anel(self, nomes: set[str]):
+        """As duas fases: workers soltam o que não é mais deles, depois o roteamento muda."""
+        async with self._troca:
+            self._estavel.clear()
+            try:
+                if not nomes:
+                    self.ativos, self.anel = set(), None
+                    return
+                lista = sorted(nomes)
+
+                async def avisar(nome):
+                    try:
+                        await self.cliente.post(
+                            self.workers[nome].url + "/_cluster/anel",
+                            json={"nos": lista},
+                            headers={"X-Aria-Token": self.token},
+                        )
+                    except httpx.TransportError:
+                        pass  # morreu agora: o supervisor trata na próxima volta
+
+                await asyncio.gather(*(avisar(n) for n in lista))
+                self.ativos = set(nomes)
+                self.anel = AnelConsistente(lista)
+            finally:
+                self._estavel.set()
+
+    async def _supervisionar(self):
+        while True:
+            await asyncio.sleep(INTERVALO_SUPERVISAO)
+            agora = time.monotonic()
+            for w in self.workers.values():
+                if w.nome in self.ativos and not w.vivo():
+                    print(f"[despachante] {w.nome} caiu; saindo do anel", file=sys.stderr)
+                    w.morreu_em = agora
+                    await self._trocar_anel(self.ativos - {w.nome})
+                elif w.nome not in self.ativos and not w.vivo() and agora - w.morreu_em >= ESPERA_REINICIO:
+                    w.reinicios += 1
+                    w.iniciar(sorted(self.ativos | {w.nome}), self.token, self.caminho_db)
+                    if await self._esperar_saude(w):
+                        print(f"[despachante] {w.nome} de volta; entrando no anel", file=sys.stderr)
+                        await self._trocar_anel(self.ativos | {w.nome})
+                    else:
+                        w.parar()
+                        w.morreu_em = time.monotonic()
+
+    # ---- roteamento ----
+
+    def dono(self, game_id: Optional[str]) -> Optional[Worker]:
+        anel = self.anel
+        if anel is None:
+            return None
+        if game_id:
+            return self.workers[anel.dono(game_id)]
+        return self.workers[anel.nos[next(self._rodizio) % len(anel.nos)]]
+
+    async def _esperar_anel(self, pausa: float):
+        self.total_reenvios += 1
+        await asyncio.sleep(pausa)
+        try:
+            await asyncio.wait_for(self._estavel.wait(), TIMEOUT_PARTIDA)
+        except asyncio.TimeoutError:
+            pass
+
+    async def encaminhar(self, request: Request) -> Response:
+        if request.url.path.startswith("/_cluster"):
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
+        if request.url.path == "/lote/turnos" and request.method == "POST":
+            resposta = await self.encaminhar_lote(request)
+            if resposta is not None:
+                return resposta
+        corpo = await request.body()
+        game_id = request.query_params.get("game_id")
+        cabecalhos = [(k, v) for k, v in request.headers.items() if k.lower() not in _NAO_REPASSAR]
+        caminho = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+
+        for tentativa in range(TENTATIVAS):
+            worker = self.dono(game_id)
+            if worker is None:
+                await self._esperar_anel(0.2)
+                continue
+            try:
+                r = await self.cliente.request(
+                    request.method, worker.url + caminho, content=corpo, headers=cabecalhos
+                )
+            except httpx.TransportError:
+                # worker caiu e o supervisor ainda não viu: espera o anel novo
+                await self._esperar_anel(INTERVALO_SUPERVISAO * 2)
+                continue
+            if r.status_code == 421 and tentativa < TENTATIVAS - 1:
+                await self._esperar_anel(0.05)
+                continue
+            return Response(
+                r.content,
+                status_code=r.status_code,
+                headers={k: v for k, v in r.headers.items() if k.lower() not in _NAO_REPASSAR},
+            )
+        return JSONResponse({"detail": "Nenhum worker disponível para este jogo."}, status_code=503)
+
+    async def encaminhar_lote(self, request: Request) -> Optional[Response]:
+        """
+        /lote/turnos com jogos de vários donos: cada worker recebe só os
+        ids dele (com os cursores deles) e os resultados voltam na ordem do
+        pedido. Ids que voltam com 421 (o anel mudou no meio) ou cuja parte
+        falhou por transporte são reenviados para o dono novo.
+        Devolve None se o corpo não for um lote legível: aí vai inteiro
+        para um worker, que responde o erro de validação.
+        """
+        try:
+            pedido = json.loads(await request.body())
+            game_ids = [str(g) for g in pedido["game_ids"]]
+            cursores = dict(pedido.get("cursores") or {})
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+        cabecalhos = [(k, v) for k, v in request.headers.items() if k.lower() not in _NAO_REPASSAR]
+        caminho = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+
+        async def enviar(worker: Worker, ids: list[str]):
+            parte = {**pedido, "game_ids": ids, "cursores": {g: cursores[g] for g in ids if g in cursores}}
+            try:
+                return await self.cliente.post(worker.url + caminho, json=parte, headers=cabecalhos)
+            except httpx.TransportError:
+                return None
+
+        resultados: dict[str, dict] = {}
+        pendentes = list(dict.fromkeys(game_ids))
+        for tentativa in range(TENTATIVAS):
+            if not pendentes:
+                break
+            if tentativa:
+                await self._esperar_anel(INTERVALO_SUPERVISAO * 2)
+            anel = self.anel
+            if anel is None:
+                continue
+            partes: dict[str, list[str]] = {}
+            for gid in pendentes:
+                partes.setdefault(anel.dono(gid), []).append(gid)
+            respostas = await asyncio.gather(
+                *(enviar(self.workers[nome], ids) for nome, ids in partes.items())
+            )
+
+            pendentes = []
+            for ids, r in zip(partes.values(), respostas):
+                if r is None:
+                    pendentes += ids
+                    continue
+                if r.status_code != 200:
+                    # erro do lote inteiro (validação, tamanho): vale para todos
+                    return Response(r.content, status_code=r.status_code, media_type="application/json")
+                for item in r.json()["resultados"]:
+                    if item["status"] == 421:
+                        pendentes.append(item["game_id"])
+                    else:
+                        resultados[item["game_id"]] = item
+
+        for gid in pendentes:
+            resultados[gid] = {"game_id": gid, "status": 503, "detail": "Nenhum worker disponível para este jogo."}
+        vistos = set()
+        saida = []
+        for gid in game_ids:
+            if gid in vistos:
+                saida.append({"game_id": gid, "status": 400, "detail": "game_id repetido no lote."})
+            else:
+                vistos.add(gid)
+                saida.append(resultados[gid])
+        return JSONResponse({"resultados": saida})
+
+    async def encaminhar_ws(self, websocket: WebSocket):
+        game_id = websocket.query_params.get("game_id")
+        if conectar_ws is None or not game_id:
+            await websocket.close(code=1011 if conectar_ws is None else 4404)
+            return
+
+        upstream = None
+        for _ in range(TENTATIVAS):
+            worker = self.dono(game_id)
+            if worker is None:
+                await self._esperar_anel(0.2)
+                continue
+            url = worker.url.replace("http", "ws", 1) + f"/ws?{websocket.url.query}"
+            try:
+                upstream = await conectar_ws(url, open_timeout=5)
+                break
+            except (OSError, InvalidHandshake):
+                # recusado (id inválido, ou o anel está mudando) ou worker fora do ar
+                await self._esperar_anel(0.1)
+        if upstream is None:
+            await websocket.close(code=4404)
+            return
+
+        await websocket.accept()
+
+        async def do_cliente():
+            try:
+                while True:
+                    await upstream.send(await websocket.receive_text())
+            except (WebSocketDisconnect, ConnectionClosed):
+                pass
+
+        async def do_worker():
+            try:
+                async for mensagem in upstream:
+                    await websocket.send_text(mensagem)
+            except (ConnectionClosed, RuntimeError):
+                pass
+
+        tarefas = [asyncio.create_task(do_cliente()), asyncio.create_task(do_worker())]
+        try:
+            await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for t in tarefas:
+                t.cancel()
+            await upstream.close()
+            try:
+                await websocket.close(code=upstream.close_code or 1000)
+            except RuntimeError:
+                pass  # o cliente já tinha fechado
+
+
+def criar_app(despachante: Despachante) -> FastAPI:
+    from contextlib import asynccontextmanager
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await despachante.iniciar()
+        yield
+        await despachante.encerrar()
+
+    # sem /docs próprios: vão para um worker, como o resto
+    app = FastAPI(lifespan=lifespan, docs_url=None, redoc_url=None, openapi_url=None)
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        await despachante.encaminhar_ws(websocket)
+
+    @app.api_route(
+        "/{caminho:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"]
+    )
+    async def proxy(request: Request):
+        return await despachante.encaminhar(request)
+
+    return app
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Despachante para vários workers da API.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--porta", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--porta-workers", type=int, default=None, help="portas base dos workers (padrão: livres)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    despachante = Despachante(
+        args.workers, os.environ.get("ARIA_DB", "aria_jogos.db"), args.porta_workers
+    )
+    uvicorn.run(criar_app(despachante), host=args.host, port=args.porta)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
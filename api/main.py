@@ -1,18 +1,68 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import hmac
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Optional, Union
+
 from fastapi.middleware.cors import CORSMiddleware
 
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+from pydantic_core import to_json
+
+from core.models import Robo, Arena
+from core.cerebro import NIVEIS
+from core.engine import CondicaoParada, FormatoLogs, GameState
+from core.eventos import CAMPOS as CAMPOS_EVENTOS
+from core.diario import Diario, DiarioInvalido
+from core.mapas import MAPAS
+from core.replay import INTERVALO_PADRAO, GravadorJogo, Replay
 
-from typing import Optional
+from api.anel import AnelConsistente
+from api.metricas import CONTENT_TYPE, Metricas, MiddlewareMetricas
+from api.relogio import ORCAMENTO_BUSCA_MS, Assinatura, Relogio
+from api.store import GameStore, JogoDeOutroNo, JogoNaoEncontrado, Sessao
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
 
-from core.models import Robo, Arena
-from core.engine import GameState
+# Jogos em memória, indexados pelo game_id devolvido no /new_game
+store = GameStore.from_env()
+
+# Avança os jogos assistidos pelo /ws, na cadência de cada um
+relogio = Relogio(store)
+
+
+# De quanto em quanto tempo (s) os jogos além do TTL saem do store
+INTERVALO_LIMPEZA = 60.0
+
 
+async def _limpar_expirados():
+    while True:
+        await asyncio.sleep(INTERVALO_LIMPEZA)
+        try:
+            await asyncio.to_thread(store.limpar_expirados)
+        except Exception as e:
+            print(f"[store] erro ao limpar jogos expirados: {e!r}", file=sys.stderr)
 
-app = FastAPI(title="ARIA - Arena de Robôs IA API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    limpeza = asyncio.create_task(_limpar_expirados())
+    yield
+    limpeza.cancel()
+    await relogio.parar()
+    # grava o que ainda estiver na fila de snapshots antes de sair
+    if store.persistencia is not None:
+        store.persistencia.fechar()
+
+
+app = FastAPI(title="ARIA - Arena de Robôs IA API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,8 +75,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Por enquanto vamos manter um único jogo em memória
-current_game: Optional[GameState] = None
+# Por fora do CORS, para medir a requisição inteira (GET /metrics)
+metricas = Metricas(store, relogio)
+app.add_middleware(MiddlewareMetricas, metricas=metricas)
+
+
+# Streaming (/ws): cadência dos turnos (padrão e limites do `intervalo`),
+# heartbeat e limite de envio, em segundos
+INTERVALO_TURNO = float(os.environ.get("ARIA_INTERVALO_TURNO", "2.0"))
+INTERVALO_MINIMO = 0.05
+INTERVALO_MAXIMO = 60.0
+INTERVALO_HEARTBEAT = 15.0
+TIMEOUT_ENVIO = 5.0
+
+# Teto de turnos por chamada do /avancar
+MAX_TURNOS_AVANCAR = 200
+
+# Lotes: jogos por chamada e turnos somados (jogos x turnos) do /lote/turnos
+MAX_LOTE = 256
+MAX_TURNOS_LOTE = 5_000
+
+# Turnos que o /replay refaz (o diário vem do cliente: o custo tem teto)
+MAX_TURNOS_REPLAY = MAX_TURNOS_LOTE
+
+# Com cérebro (core/cerebro.py), cada turno gasta até o orçamento de busca
+# do nível (20 ms no difícil): os tetos acima, em turnos, prenderiam os
+# locks dos jogos por segundos. Por chamada do /avancar, /lote/turnos e
+# /replay, a busca soma no máximo este tanto (ms), o mesmo teto de cada
+# lote do relógio.
+MAX_MS_BUSCA_POR_CHAMADA = ORCAMENTO_BUSCA_MS
+
+# Corpos de /state guardados por jogo (um por cursor de logs distinto)
+MAX_CORPOS_POR_JOGO = 8
+
+# Pedidos idempotentes (/command, /turno) lembrados por jogo (para reconhecer retentativas)
+MAX_FEITOS_POR_JOGO = 32
+
+# Quadros por chamada do /replay/quadros
+MAX_QUADROS_REPLAY = 200
+
+# Replays mantidos em dia por jogo (um por intervalo entre quadros-chave)
+MAX_GRAVADORES_POR_JOGO = 2
+
+# Segredo dos endpoints /_cluster (posto pelo despachante; vazio = desligados)
+TOKEN_CLUSTER = os.environ.get("ARIA_CLUSTER_TOKEN", "")
 
 
 # -------------------------------
@@ -37,6 +129,9 @@ current_game: Optional[GameState] = None
 class NewGameRequest(BaseModel):
     robo_escolha: int  # 1 = vermelho, 2 = verde, 3 = azul
     nome: str
+    seed: Optional[int] = None  # fixa a aleatoriedade da luta
+    mapa: Optional[str] = None  # nome de um mapa com obstáculos (GET /mapas)
+    dificuldade: Optional[str] = None  # adversário com busca (GET /dificuldades); None = sorteio
 
 
 class CommandRequest(BaseModel):
@@ -55,25 +150,221 @@ class RoboOut(BaseModel):
     y: int
 
 
+class ArenaOut(BaseModel):
+    largura: int
+    altura: int
+    mapa: Optional[str] = None
+    bloqueios: list[tuple[int, int]] = []  # células (x, y) bloqueadas
+
+
 class GameStateOut(BaseModel):
+    game_id: str
     status: str
     turno: int
     jogador: RoboOut
     adversario: RoboOut
-    logs: list[str]
+    arena: ArenaOut
+    logs: list[Union[str, list]]  # textos, ou eventos com formato=eventos
+    log_inicio: int  # sequência do primeiro item de `logs`
+    log_cursor: int  # mande como `since` na próxima chamada
+
+
+class LogPageOut(BaseModel):
+    game_id: str
+    logs: list[Union[str, list]]
+    inicio: int  # sequência do primeiro item de `logs`
+    primeiro_disponivel: int  # logs anteriores a este já foram descartados
+    log_cursor: int
+
+
+class TurnoResumoOut(BaseModel):
+    turno: int
+    hp_jogador: int
+    hp_adversario: int
+    pos_jogador: tuple[int, int]
+    pos_adversario: tuple[int, int]
+
+
+class AvancoOut(BaseModel):
+    eventos: list[TurnoResumoOut]
+    estado: GameStateOut
+
+
+class DiarioOut(BaseModel):
+    game_id: str
+    turno: int
+    bytes: int
+    diario: str  # base64 de Diario.codificar()
+
+
+class ReplayRequest(BaseModel):
+    diario: str  # base64, como devolvido por /diario
+    turno: Optional[int] = Field(None, ge=1, le=MAX_TURNOS_REPLAY)  # padrão: o turno em que o diário foi gerado
+
+
+class QuadroReplayOut(BaseModel):
+    turno: int
+    status: str
+    jogador: RoboOut
+    adversario: RoboOut
+    logs: list[Union[str, list]]  # o que aconteceu desde o quadro anterior
+
+
+class ReplayQuadrosOut(BaseModel):
+    game_id: str
+    turno_final: int
+    status: str
+    intervalo: int  # turnos por quadro-chave
+    quadros_chave: int
+    bytes: int  # tamanho do arquivo (/replay/arquivo)
+    arena: ArenaOut
+    quadros: list[QuadroReplayOut]
+
+
+class NovosJogosRequest(BaseModel):
+    jogos: list[NewGameRequest] = Field(min_length=1, max_length=MAX_LOTE)
+
+
+class TurnosLoteRequest(BaseModel):
+    game_ids: list[str] = Field(min_length=1, max_length=MAX_LOTE)
+    turnos: int = Field(1, ge=1, le=MAX_TURNOS_AVANCAR)  # por jogo, como no /avancar
+    ate: CondicaoParada = "fim"
+    cursores: dict[str, int] = {}  # game_id -> since (log_cursor da resposta anterior)
+
+
+class ResultadoLoteOut(BaseModel):
+    game_id: Optional[str] = None
+    status: int  # 200, ou o código que a chamada avulsa devolveria
+    detail: Optional[str] = None
+    dono: Optional[str] = None  # com 421: o worker dono do jogo
+    eventos: Optional[list[TurnoResumoOut]] = None  # só no /lote/turnos
+    estado: Optional[GameStateOut] = None
+
+
+class LoteOut(BaseModel):
+    resultados: list[ResultadoLoteOut]  # um por item do pedido, na mesma ordem
+
+
+# -------------------------------
+# Serialização do estado
+# -------------------------------
+# Os modelos acima documentam as respostas (OpenAPI), mas o estado vai
+# direto do to_dict() para o JSON: as chaves já saem na ordem dos campos
+# e o resultado é o mesmo byte a byte, sem montar e validar os modelos
+# Pydantic a cada chamada.
+
 
+def _estado_dict(
+    game_id: str, game: GameState, since: Optional[int] = None, formato: FormatoLogs = "texto"
+) -> dict:
+    return {"game_id": game_id, **game.to_dict(since, formato)}
 
-def _game_to_out(game: GameState) -> GameStateOut:
-    d = game.to_dict()
-    return GameStateOut(
-        status=d["status"],
-        turno=d["turno"],
-        jogador=RoboOut(**d["jogador"]),
-        adversario=RoboOut(**d["adversario"]),
-        logs=d["logs"],
+
+def _codificar(conteudo) -> bytes:
+    # mesmo JSON compacto do JSONResponse, com o encoder do pydantic-core
+    # (bem mais rápido que o json da stdlib com centenas de logs)
+    return to_json(conteudo)
+
+
+def _etag(game: GameState) -> str:
+    return f'W/"{game.versao}"'
+
+
+def _etag_confere(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # comparação fraca: ignora o prefixo W/
+    alvo = etag[2:]
+    return any(t.strip().removeprefix("W/") == alvo for t in if_none_match.split(","))
+
+
+def _resposta_estado(corpo: bytes, game: GameState) -> Response:
+    return _resposta_corpo(corpo, _etag(game))
+
+
+def _resposta_corpo(corpo: bytes, etag: str) -> Response:
+    return Response(
+        corpo,
+        media_type="application/json",
+        # no-cache = o navegador pode guardar, mas revalida (If-None-Match)
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
     )
 
 
+def _versao_esperada(versao: Optional[int], if_match: Optional[str]) -> Optional[int]:
+    """`versao` da query ou, sem ela, a do ETag no If-Match (W/"12" -> 12)."""
+    if versao is not None or not if_match:
+        return versao
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match inválido: use o ETag de uma resposta anterior.")
+
+
+def _conflito(game: GameState, detalhe: str) -> HTTPException:
+    # 409 com o ETag atual: o cliente relê o /state e decide de novo
+    return HTTPException(status_code=409, detail=detalhe, headers={"ETag": _etag(game)})
+
+
+def _conferir_esperado(game: GameState, turno: Optional[int], versao: Optional[int]):
+    if turno is not None and game.turno != turno:
+        raise _conflito(game, f"Pedido para o turno {turno}, mas o jogo está no turno {game.turno}.")
+    if versao is not None and game.versao != versao:
+        raise _conflito(game, f"Versão {versao} desatualizada (atual: {game.versao}).")
+
+
+def _guardado(sessao: Sessao, chave, gerar):
+    """Valor guardado na sessão para `chave`, válido enquanto a versão do jogo não mudar."""
+    if sessao.versao_corpos != sessao.game.versao:
+        sessao.corpos.clear()
+        sessao.versao_corpos = sessao.game.versao
+    valor = sessao.corpos.get(chave)
+    if valor is None:
+        if len(sessao.corpos) >= MAX_CORPOS_POR_JOGO:
+            sessao.corpos.clear()
+        valor = sessao.corpos[chave] = gerar()
+    return valor
+
+
+def _corpo_estado(sessao: Sessao, since: Optional[int], formato: FormatoLogs = "texto") -> bytes:
+    """
+    JSON do estado, reaproveitado enquanto a versão do jogo não mudar.
+    Cursores que dão a mesma resposta (qualquer um <= primeiro log
+    guardado, ou >= log_cursor) dividem a mesma entrada do cache.
+    """
+    game = sessao.game
+    logs = game.logs
+    cursor = logs.primeiro_seq if since is None else min(max(since, logs.primeiro_seq), logs.proximo_seq)
+    return _guardado(
+        sessao,
+        (cursor, formato),
+        lambda: _codificar(_estado_dict(sessao.game_id, game, cursor, formato)),
+    )
+
+
+def _replay_do_jogo(sessao: Sessao, intervalo: int = INTERVALO_PADRAO) -> Replay:
+    """
+    Replay da luta até o turno atual. O gravador da sessão refaz a luta
+    uma vez só e depois codifica apenas os turnos novos; o replay pronto
+    fica guardado com os corpos do /state até o jogo mudar de novo.
+    """
+    gravador = sessao.gravadores.get(intervalo)
+    if gravador is None:
+        if len(sessao.gravadores) >= MAX_GRAVADORES_POR_JOGO:
+            sessao.gravadores.clear()
+        gravador = sessao.gravadores[intervalo] = GravadorJogo(sessao.game, intervalo)
+    return _guardado(sessao, ("replay", intervalo), lambda: Replay(gravador.atualizar(sessao.game)))
+
+
+def _turnos_com_busca(dificuldade: Optional[str], turnos: int, orcamento_ms: float = MAX_MS_BUSCA_POR_CHAMADA) -> int:
+    """Quantos dos `turnos` cabem em `orcamento_ms` de busca (todos, se o jogo não tem cérebro)."""
+    if dificuldade is None:
+        return turnos
+    return min(turnos, int(orcamento_ms // NIVEIS[dificuldade].orcamento_ms))
+
+
 # -------------------------------
 # Helpers para criar robôs
 # -------------------------------
@@ -95,48 +386,584 @@ def criar_robo_adversario_simples() -> Robo:
     return Robo("Adversário API", "branco", 2, 2, 2, "agressivo")
 
 
+def montar_jogo(req: NewGameRequest) -> GameState:
+    """GameState de um pedido do /new_game (ValueError se o pedido for inválido)."""
+    jogador = criar_robo_inicial(req.robo_escolha, req.nome)
+
+    if req.mapa is None:
+        arena = Arena(largura=16, altura=5)
+    elif req.mapa in MAPAS:
+        arena = Arena(mapa=MAPAS[req.mapa])
+    else:
+        raise ValueError(f"Mapa desconhecido: {req.mapa}")
+    adversario = criar_robo_adversario_simples()
+    if req.dificuldade is not None and req.dificuldade not in NIVEIS:
+        raise ValueError(f"Dificuldade desconhecida: {req.dificuldade}")
+
+    return GameState(
+        jogador=jogador, adversario=adversario, arena=arena, seed=req.seed, dificuldade=req.dificuldade
+    )
+
+
 # -------------------------------
 # Endpoints
 # -------------------------------
 
+DETALHE_NAO_ENCONTRADO = "Jogo não encontrado (id inválido ou expirado). Chame /new_game."
+DETALHE_OUTRO_NO = "Este jogo pertence a outro worker."
+
+
+@app.exception_handler(JogoNaoEncontrado)
+def jogo_nao_encontrado(request: Request, exc: JogoNaoEncontrado):
+    return JSONResponse(status_code=404, content={"detail": DETALHE_NAO_ENCONTRADO})
+
+
+@app.exception_handler(JogoDeOutroNo)
+def jogo_de_outro_no(request: Request, exc: JogoDeOutroNo):
+    # 421 Misdirected Request: o despachante reenvia para o dono certo
+    return JSONResponse(
+        status_code=421,
+        content={"detail": DETALHE_OUTRO_NO},
+        headers={"X-Aria-Dono": exc.dono},
+    )
+
 
 @app.post("/new_game", response_model=GameStateOut)
 def new_game(req: NewGameRequest):
-    global current_game
-
     try:
-        jogador = criar_robo_inicial(req.robo_escolha, req.nome)
+        game = montar_jogo(req)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    arena = Arena(largura=16, altura=5)
-    adversario = criar_robo_adversario_simples()
+    game_id = store.criar(game)
+    return _resposta_estado(_codificar(_estado_dict(game_id, game)), game)
+
+
+# `since` (opcional) = log_cursor da resposta anterior: só os logs novos voltam.
+# `formato=eventos` devolve os logs como eventos estruturados (GET /eventos)
+# em vez de texto, para o cliente montar o próprio texto.
+# As respostas com o estado trazem ETag (a versão do jogo); o /state aceita
+# If-None-Match e responde 304 se nada mudou desde então.
+#
+# /turno e /command aceitam o que o cliente espera encontrar: `turno` e/ou
+# `versao` (ou If-Match com o ETag). Com eles, o pedido é idempotente:
+# - /turno executa uma vez só por (turno, versão): a retentativa recebe a
+#   mesma resposta da primeira vez; /turno?turno=N logo depois de o turno N
+#   rodar (outra aba) devolve o estado atual;
+# - /command com turno/versão é aplicado uma vez só por (turno, versão, texto);
+# - pedidos iguais ao mesmo tempo viram uma execução só (GameStore.uma_vez),
+#   com a mesma resposta para todos;
+# - o que não bate (versão velha, turno que ainda não chegou ou que já
+#   ficou para trás) volta 409 com o ETag atual.
+# Sem turno/versão, continuam como antes: cada pedido executa.
+
+_RESPOSTA_CONFLITO = {409: {"description": "O jogo não está no turno/versão esperado"}}
+
+
+@app.post("/command", response_model=GameStateOut, responses=_RESPOSTA_CONFLITO)
+def send_command(
+    game_id: str,
+    req: CommandRequest,
+    since: Optional[int] = None,
+    formato: FormatoLogs = "texto",
+    turno: Optional[int] = None,
+    versao: Optional[int] = None,
+    if_match: Optional[str] = Header(None),
+):
+    versao = _versao_esperada(versao, if_match)
+    if turno is None and versao is None:
+        with store.usar(game_id, alterar=True) as game:
+            game.aplicar_comando(req.texto)
+            return _resposta_estado(_codificar(_estado_dict(game_id, game, since, formato)), game)
+
+    feito = ("comando", turno, versao, req.texto)
+
+    def aplicar(sessao: Sessao):
+        game = sessao.game
+        if feito not in sessao.feitos:
+            _conferir_esperado(game, turno, versao)
+            game.aplicar_comando(req.texto)
+            sessao.feitos[feito] = game.versao
+            if len(sessao.feitos) > MAX_FEITOS_POR_JOGO:
+                sessao.feitos.popitem(last=False)
+        return _corpo_estado(sessao, since, formato), _etag(game)
+
+    corpo, etag = store.uma_vez(game_id, (*feito, since, formato), aplicar, alterar=True)
+    return _resposta_corpo(corpo, etag)
+
+
+@app.post("/turno", response_model=GameStateOut, responses=_RESPOSTA_CONFLITO)
+def executar_turno(
+    game_id: str,
+    since: Optional[int] = None,
+    formato: FormatoLogs = "texto",
+    turno: Optional[int] = None,
+    versao: Optional[int] = None,
+    if_match: Optional[str] = Header(None),
+):
+    versao = _versao_esperada(versao, if_match)
+    if turno is None and versao is None:
+        with store.usar(game_id, alterar=True) as game:
+            game.executar_turno()
+            return _resposta_estado(_codificar(_estado_dict(game_id, game, since, formato)), game)
+
+    feito = ("turno", turno, versao, since, formato)
+
+    def executar(sessao: Sessao):
+        game = sessao.game
+        resposta = sessao.feitos.get(feito)
+        if resposta is not None:
+            return resposta  # retentativa: a resposta da primeira vez
+        if versao is None and turno == game.turno - 1:
+            # o turno acabou de rodar por outro pedido (outra aba): o estado atual
+            return _corpo_estado(sessao, since, formato), _etag(game)
+        _conferir_esperado(game, turno, versao)
+        game.executar_turno()
+        resposta = sessao.feitos[feito] = (_corpo_estado(sessao, since, formato), _etag(game))
+        if len(sessao.feitos) > MAX_FEITOS_POR_JOGO:
+            sessao.feitos.popitem(last=False)
+        return resposta
+
+    corpo, etag = store.uma_vez(game_id, feito, executar, alterar=True)
+    return _resposta_corpo(corpo, etag)
+
+
+@app.post("/avancar", response_model=AvancoOut)
+def avancar_turnos(
+    game_id: str,
+    turnos: int = Query(MAX_TURNOS_AVANCAR, ge=1, le=MAX_TURNOS_AVANCAR),
+    ate: CondicaoParada = "fim",
+    since: Optional[int] = None,
+    formato: FormatoLogs = "texto",
+):
+    """
+    Avança vários turnos numa chamada só: até `turnos` (no máximo
+    MAX_TURNOS_AVANCAR), até o jogo acabar, ou, com ate=hp, até o
+    primeiro turno em que algum HP mudar. Com cérebro no adversário, só
+    os turnos que cabem em MAX_MS_BUSCA_POR_CHAMADA de busca (12 no
+    difícil); o cliente chama de novo para seguir.
+    """
+    with store.usar(game_id, alterar=True) as game:
+        eventos = game.avancar(_turnos_com_busca(game.dificuldade, turnos), ate)
+        corpo = _codificar({"eventos": eventos, "estado": _estado_dict(game_id, game, since, formato)})
+        return _resposta_estado(corpo, game)
+
+
+@app.get("/state", response_model=GameStateOut, responses={304: {"description": "Nada mudou"}})
+def get_state(
+    game_id: str,
+    since: Optional[int] = None,
+    formato: FormatoLogs = "texto",
+    if_none_match: Optional[str] = Header(None),
+):
+    with store.usar_sessao(game_id) as sessao:
+        if _etag_confere(if_none_match, _etag(sessao.game)):
+            return Response(status_code=304, headers={"ETag": _etag(sessao.game)})
+        return _resposta_estado(_corpo_estado(sessao, since, formato), sessao.game)
 
-    current_game = GameState(jogador=jogador, adversario=adversario, arena=arena)
-    return _game_to_out(current_game)
 
+# -------------------------------
+# Lotes (bots e testes de carga)
+# -------------------------------
+# Vários jogos numa chamada só: uma validação, um JSON de resposta. Cada
+# item tem o seu resultado, na ordem do pedido; um jogo com erro não
+# derruba o lote, só vem com o status que a chamada avulsa teria.
+
+
+def _erro_lote(game_id: str, erro: LookupError) -> dict:
+    if isinstance(erro, JogoDeOutroNo):
+        return {"game_id": game_id, "status": 421, "detail": DETALHE_OUTRO_NO, "dono": erro.dono}
+    return {"game_id": game_id, "status": 404, "detail": DETALHE_NAO_ENCONTRADO}
+
+
+def _resposta_lote(resultados: list[dict]) -> Response:
+    return Response(_codificar({"resultados": resultados}), media_type="application/json")
+
+
+@app.post("/lote/novos", response_model=LoteOut)
+def novos_jogos(req: NovosJogosRequest, formato: FormatoLogs = "texto"):
+    """Cria vários jogos; cada item de `jogos` é um pedido do /new_game."""
+    resultados = []
+    for pedido in req.jogos:
+        try:
+            game = montar_jogo(pedido)
+        except ValueError as e:
+            resultados.append({"game_id": None, "status": 400, "detail": str(e)})
+            continue
+        game_id = store.criar(game)
+        resultados.append(
+            {"game_id": game_id, "status": 200, "estado": _estado_dict(game_id, game, None, formato)}
+        )
+    return _resposta_lote(resultados)
+
+
+@app.post("/lote/turnos", response_model=LoteOut)
+def turnos_em_lote(req: TurnosLoteRequest, formato: FormatoLogs = "texto"):
+    """
+    Avança vários jogos: cada um anda até `turnos` turnos, com a mesma
+    parada do /avancar (`ate`). Com `cursores`, o estado de cada jogo
+    traz só os logs a partir do cursor dele.
+
+    Os locks dos jogos são pegos em ordem de game_id (store.usar_varios),
+    então lotes com jogos em comum rodam um depois do outro, sem deadlock.
+
+    Jogos com cérebro dividem MAX_MS_BUSCA_POR_CHAMADA de busca, na ordem
+    do pedido: cada um anda o que couber no que sobrou (talvez nada, e
+    volta sem eventos), para o lote não prender os locks por segundos.
+    """
+    if len(req.game_ids) * req.turnos > MAX_TURNOS_LOTE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Lote grande demais: jogos x turnos passa de {MAX_TURNOS_LOTE}.",
+        )
+
+    resultados = []
+    vistos = set()
+    orcamento_ms = MAX_MS_BUSCA_POR_CHAMADA
+    with store.usar_varios(req.game_ids, alterar=True) as sessoes:
+        for game_id in req.game_ids:
+            if game_id in vistos:
+                resultados.append({"game_id": game_id, "status": 400, "detail": "game_id repetido no lote."})
+                continue
+            vistos.add(game_id)
+            sessao = sessoes[game_id]
+            if not isinstance(sessao, Sessao):
+                resultados.append(_erro_lote(game_id, sessao))
+                continue
+            game = sessao.game
+            eventos = game.avancar(_turnos_com_busca(game.dificuldade, req.turnos, orcamento_ms), req.ate)
+            if game.dificuldade is not None:
+                orcamento_ms -= len(eventos) * NIVEIS[game.dificuldade].orcamento_ms
+            resultados.append(
+                {
+                    "game_id": game_id,
+                    "status": 200,
+                    "eventos": eventos,
+                    "estado": _estado_dict(game_id, game, req.cursores.get(game_id), formato),
+                }
+            )
+    # os dicts já são cópias: o JSON pode ser montado sem os locks
+    return _resposta_lote(resultados)
+
+
+@app.get("/logs", response_model=LogPageOut)
+def get_logs(
+    game_id: str,
+    antes: Optional[int] = None,
+    limite: int = Query(50, ge=1, le=500),
+    formato: FormatoLogs = "texto",
+):
+    """
+    Histórico paginado, do mais novo para o mais antigo: a primeira página
+    vem sem `antes`; as seguintes usam `antes=<inicio da página anterior>`.
+    """
+    with store.usar(game_id) as game:
+        renderizar = game.renderizar_logs if formato == "texto" else None
+        inicio, logs = game.logs.pagina(antes, limite, renderizar)
+        return LogPageOut(
+            game_id=game_id,
+            logs=logs,
+            inicio=inicio,
+            primeiro_disponivel=game.logs.primeiro_seq,
+            log_cursor=game.logs.proximo_seq,
+        )
+
+
+@app.get("/diario", response_model=DiarioOut)
+def get_diario(game_id: str):
+    """Robôs iniciais + seed + comandos: o suficiente para reproduzir a luta."""
+    with store.usar(game_id) as game:
+        dados = Diario.de_jogo(game).codificar()
+        return DiarioOut(
+            game_id=game_id,
+            turno=game.turno,
+            bytes=len(dados),
+            diario=base64.b64encode(dados).decode("ascii"),
+        )
+
+
+@app.post("/replay", response_model=GameStateOut, responses={422: {"description": "Diário inválido"}})
+def replay(req: ReplayRequest):
+    """
+    Reconstrói uma luta a partir do diário, no turno pedido, e a registra
+    como um jogo novo (que pode continuar sendo jogado). O diário é
+    conferido antes (robôs, arena, mapa, decisões do cérebro) e a luta
+    refeita tem no máximo MAX_TURNOS_REPLAY turnos (com cérebro, poucos
+    além do fim do diário: MAX_MS_BUSCA_POR_CHAMADA de busca).
+    """
+    try:
+        dados = base64.b64decode(req.diario, validate=True)
+    except binascii.Error as e:
+        raise HTTPException(status_code=400, detail=f"Diário inválido (base64): {e}")
+    try:
+        diario = Diario.decodificar(dados)
+    except DiarioInvalido as e:
+        raise HTTPException(status_code=422, detail=f"Diário inválido: {e}")
+
+    alvo = diario.turno_final if req.turno is None else req.turno
+    if alvo > MAX_TURNOS_REPLAY:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Luta longa demais para refazer: turno {alvo} (máximo {MAX_TURNOS_REPLAY}).",
+        )
+    # depois do fim do diário, o cérebro (se houver) volta a buscar a cada turno
+    alem = alvo - diario.turno_final
+    if alem > _turnos_com_busca(diario.dificuldade, alem):
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Com o adversário {diario.dificuldade}, o replay vai no máximo "
+                f"{_turnos_com_busca(diario.dificuldade, alem)} turnos além do fim do diário."
+            ),
+        )
+
+    game = diario.reconstruir(alvo)
+    game_id = store.criar(game)
+    return _resposta_estado(_codificar(_estado_dict(game_id, game)), game)
+
+
+@app.get(
+    "/replay/arquivo",
+    response_class=Response,
+    responses={200: {"content": {"application/octet-stream": {}}, "description": "Arquivo de replay"}},
+)
+def get_replay_arquivo(game_id: str, intervalo: int = Query(INTERVALO_PADRAO, ge=1, le=1000)):
+    """
+    A luta até o turno atual num arquivo de replay (core/replay.py), com
+    um quadro-chave a cada `intervalo` turnos: python -m core.replay
+    mostra ou assiste qualquer turno sem refazer a luta.
+    """
+    with store.usar_sessao(game_id) as sessao:
+        replay = _replay_do_jogo(sessao, intervalo)
+    return Response(
+        replay.dados,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{game_id}.arpl"'},
+    )
+
+
+@app.get("/replay/quadros", response_model=ReplayQuadrosOut)
+def get_replay_quadros(
+    game_id: str,
+    de: int = Query(1, ge=1),
+    limite: int = Query(50, ge=1, le=MAX_QUADROS_REPLAY),
+    formato: FormatoLogs = "texto",
+):
+    """
+    Quadros do replay a partir do turno `de` (até `limite`), para assistir
+    ou pular para qualquer turno no frontend: cada página começa pelo
+    quadro-chave mais próximo, sem refazer a luta desde o turno 1. A
+    próxima página usa de = último turno recebido + 1.
+    """
+    with store.usar_sessao(game_id) as sessao:
+        replay = _replay_do_jogo(sessao)
+    ate = min(replay.turno_final, de + limite - 1)
+    corpo = {
+        "game_id": game_id,
+        **replay.info(),
+        "quadros": [replay.quadro(turno, formato) for turno in range(de, ate + 1)],
+    }
+    return Response(_codificar(corpo), media_type="application/json")
+
+
+@app.get("/mapas")
+def listar_mapas():
+    """Mapas com obstáculos aceitos em /new_game (campo `mapa`)."""
+    return [
+        {"nome": nome, "largura": m.largura, "altura": m.altura, "bloqueios": m.bloqueios}
+        for nome, m in MAPAS.items()
+    ]
+
+
+@app.get("/dificuldades")
+def listar_dificuldades():
+    """Níveis do adversário com busca aceitos em /new_game (campo `dificuldade`)."""
+    return [
+        {"nome": nome, "profundidade": nivel.profundidade, "orcamento_ms": nivel.orcamento_ms}
+        for nome, nivel in NIVEIS.items()
+    ]
+
+
+@app.get("/eventos")
+def listar_eventos():
+    """Campos de cada tipo de evento (logs com formato=eventos), depois do tipo."""
+    return CAMPOS_EVENTOS
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Contadores, histogramas por rota e gauges dos jogos (formato Prometheus).
+    É async de propósito: roda na thread do event loop, a mesma que
+    registra as requisições, então lê os contadores sem lock.
+    """
+    return Response(metricas.exportar(), media_type=CONTENT_TYPE)
+
+
+@app.get("/stats")
+def get_stats():
+    """Contagem de jogos residentes e uso de memória (para dimensionar instâncias)."""
+    return {**store.estatisticas(), "relogio": relogio.estatisticas()}
+
+
+# -------------------------------
+# Vários workers (usados só pelo api/despachante.py)
+# -------------------------------
 
-@app.post("/command", response_model=GameStateOut)
-def send_command(req: CommandRequest):
-    if current_game is None:
-        raise HTTPException(status_code=400, detail="Nenhum jogo ativo. Chame /new_game primeiro.")
 
-    current_game.aplicar_comando(req.texto)
-    return _game_to_out(current_game)
+class AnelIn(BaseModel):
+    nos: list[str]
 
 
-@app.post("/turno", response_model=GameStateOut)
-def executar_turno():
-    if current_game is None:
-        raise HTTPException(status_code=400, detail="Nenhum jogo ativo. Chame /new_game primeiro.")
+def _checar_token(token: Optional[str]):
+    if not TOKEN_CLUSTER or not token or not hmac.compare_digest(token, TOKEN_CLUSTER):
+        raise HTTPException(status_code=404, detail="Not Found")
 
-    current_game.executar_turno()
-    return _game_to_out(current_game)
 
+@app.get("/_cluster/saude", include_in_schema=False)
+def saude_cluster(x_aria_token: Optional[str] = Header(None)):
+    _checar_token(x_aria_token)
+    return {"no": store.no, "anel": list(store.anel.nos) if store.anel else None, "jogos": len(store)}
 
-@app.get("/state", response_model=GameStateOut)
-def get_state():
-    if current_game is None:
-        raise HTTPException(status_code=400, detail="Nenhum jogo ativo. Chame /new_game primeiro.")
 
-    return _game_to_out(current_game)
+@app.post("/_cluster/anel", include_in_schema=False)
+def atualizar_anel(req: AnelIn, x_aria_token: Optional[str] = Header(None)):
+    """Troca o anel; só responde depois de gravar e soltar os jogos que mudaram de dono."""
+    _checar_token(x_aria_token)
+    if store.no not in req.nos:
+        raise HTTPException(status_code=400, detail="O anel não inclui este nó.")
+    liberados = store.atualizar_anel(AnelConsistente(req.nos))
+    return {"no": store.no, "liberados": liberados}
+
+
+# -------------------------------
+# Streaming de turnos (WebSocket)
+# -------------------------------
+
+
+def _estado_ws(game_id: str, since: Optional[int] = None, formato: FormatoLogs = "texto") -> dict:
+    with store.usar(game_id) as game:
+        return _estado_dict(game_id, game, since, formato)
+
+
+def _comando_ws(game_id: str, texto: str):
+    with store.usar(game_id, alterar=True) as game:
+        game.aplicar_comando(texto)
+
+
+async def _receber_mensagens(websocket: WebSocket, game_id: str, mudou: asyncio.Event):
+    """
+    Lê o que o cliente manda pelo socket:
+    - {"tipo": "comando", "texto": "..."} -> aplica o comando
+    - {"tipo": "pong"} (ou qualquer outra coisa) -> só mantém a conexão viva
+    Termina quando o cliente desconecta.
+    """
+    try:
+        while True:
+            msg = await websocket.receive_json()
+            if isinstance(msg, dict) and msg.get("tipo") == "comando":
+                await run_in_threadpool(_comando_ws, game_id, str(msg.get("texto", "")))
+                mudou.set()
+    except (WebSocketDisconnect, ValueError):
+        pass
+
+
+@app.websocket("/ws")
+async def stream_turnos(
+    websocket: WebSocket,
+    game_id: str,
+    formato: FormatoLogs = "texto",
+    intervalo: float = Query(INTERVALO_TURNO, ge=INTERVALO_MINIMO, le=INTERVALO_MAXIMO),
+):
+    """
+    Empurra o estado do jogo a cada turno. Os turnos são do relógio do
+    servidor (api/relogio.py), na cadência `intervalo` (padrão
+    ARIA_INTERVALO_TURNO); várias conexões no mesmo jogo dividem o mesmo
+    relógio, na cadência de quem chegou primeiro. Sem nenhuma conexão,
+    o jogo fica parado. Os endpoints REST continuam valendo.
+    Cada mensagem traz só os logs novos desde a anterior (em texto, ou
+    como eventos com formato=eventos).
+
+    - Cliente lento: os turnos não esperam por ele, mas também não se
+      acumulam em mensagens; a próxima traz tudo desde a anterior. Se um
+      envio demorar mais que TIMEOUT_ENVIO, o cliente é desconectado.
+    - Heartbeat: sem nada para enviar por INTERVALO_HEARTBEAT segundos,
+      manda {"tipo": "ping"}.
+    """
+    try:
+        # existe() pode ler o disco (jogo despejado ou de outro worker antes)
+        if not await run_in_threadpool(store.existe, game_id):
+            await websocket.close(code=4404)
+            return
+    except JogoDeOutroNo:
+        await websocket.close(code=4421)
+        return
+
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+    assinatura: Optional[Assinatura] = None
+    receptor: Optional[asyncio.Task] = None
+
+    async def enviar(mensagem: dict) -> bool:
+        try:
+            await asyncio.wait_for(websocket.send_json(mensagem), TIMEOUT_ENVIO)
+            return True
+        except asyncio.TimeoutError:
+            await websocket.close(code=1013)
+            return False
+        except (WebSocketDisconnect, RuntimeError):
+            return False
+
+    try:
+        estado = await run_in_threadpool(_estado_ws, game_id, None, formato)
+        if not await enviar({"tipo": "estado", "estado": estado}):
+            return
+        if estado["status"] != "running":
+            await websocket.close(code=1000)
+            return
+
+        # o relógio e os comandos do cliente acionam o mesmo `mudou`
+        assinatura = relogio.assistir(game_id, intervalo)
+        mudou = assinatura.mudou
+        receptor = asyncio.create_task(_receber_mensagens(websocket, game_id, mudou))
+        ultimo_envio = loop.time()
+
+        while not receptor.done():
+            espera = ultimo_envio + INTERVALO_HEARTBEAT - loop.time()
+            try:
+                await asyncio.wait_for(mudou.wait(), max(0.0, espera))
+            except asyncio.TimeoutError:
+                pass
+            if receptor.done():
+                break
+            if assinatura.erro is not None:
+                raise assinatura.erro
+
+            if mudou.is_set():
+                mudou.clear()
+                estado = await run_in_threadpool(_estado_ws, game_id, estado["log_cursor"], formato)
+                mensagem = {"tipo": "estado", "estado": estado}
+            elif loop.time() - ultimo_envio >= INTERVALO_HEARTBEAT:
+                mensagem = {"tipo": "ping"}
+            else:
+                continue
+
+            if not await enviar(mensagem):
+                return
+            ultimo_envio = loop.time()
+
+            if mensagem["tipo"] == "estado" and estado["status"] != "running":
+                # batalha terminou: o estado final já foi enviado
+                await websocket.close(code=1000)
+                return
+    except JogoNaoEncontrado:
+        await enviar({"tipo": "erro", "detail": "Jogo não encontrado ou expirado."})
+        await websocket.close(code=4404)
+    except JogoDeOutroNo:
+        # o anel mudou no meio da conexão: o cliente reconecta e cai no dono novo
+        await websocket.close(code=4421)
+    finally:
+        if assinatura is not None:
+            relogio.deixar(assinatura)
+        if receptor is not None:
+            receptor.cancel()
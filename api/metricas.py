@@ -0,0 +1,232 @@
+"""
+Métricas da API no formato texto do Prometheus (GET /metrics).
+
+- MiddlewareMetricas: contagem de requisições, histograma de latência e
+  de tamanho de resposta por rota. O rótulo é o *template* da rota
+  ("/state", não "/state?game_id=..."); caminhos sem rota viram
+  "desconhecida", para a cardinalidade não crescer com lixo da internet.
+- Os gauges (jogos ativos, finalizados, turnos, logs retidos) são lidos
+  do GameStore só na hora do scrape.
+- Com o relógio do servidor (api/relogio.py): jogos agendados, ticks e
+  o histograma de atraso dos ticks.
+
+Custo por requisição: dois perf_counter, um bisect e alguns incrementos.
+O registro acontece no event loop (o middleware é ASGI puro), então não
+precisa de lock: os endpoints síncronos rodam no threadpool, mas quem
+observa o fim da resposta é sempre a thread do loop.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from api.relogio import Relogio
+    from api.store import GameStore
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (le) dos histogramas; o +Inf é implícito
+BUCKETS_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BUCKETS_TAMANHO = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000)
+
+ROTA_DESCONHECIDA = "desconhecida"
+
+
+class Histograma:
+    """Histograma cumulativo à moda do Prometheus (buckets fixos)."""
+
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites: tuple):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # o último é o +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def linhas(self, nome: str, rotulos: str = "") -> list[str]:
+        saida = []
+        acumulado = 0
+        prefixo = f"{rotulos}," if rotulos else ""
+        sufixo = f"{{{rotulos}}}" if rotulos else ""
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            saida.append(f'{nome}_bucket{{{prefixo}le="{limite:g}"}} {acumulado}')
+        saida.append(f'{nome}_bucket{{{prefixo}le="+Inf"}} {self.total}')
+        saida.append(f"{nome}_sum{sufixo} {_numero(self.soma)}")
+        saida.append(f"{nome}_count{sufixo} {self.total}")
+        return saida
+
+
+class _MetricasRota:
+    __slots__ = ("status", "latencia", "tamanho")
+
+    def __init__(self):
+        self.status: dict[int, int] = {}
+        self.latencia = Histograma(BUCKETS_LATENCIA)
+        self.tamanho = Histograma(BUCKETS_TAMANHO)
+
+
+class Metricas:
+    """Acumula as métricas HTTP e monta o texto do /metrics."""
+
+    def __init__(self, store: Optional["GameStore"] = None, relogio: Optional["Relogio"] = None):
+        self.store = store
+        self.relogio = relogio
+        self.iniciado_em = time.time()
+        self._rotas: dict[tuple[str, str], _MetricasRota] = {}
+
+    def registrar(self, metodo: str, rota: str, status: int, duracao: float, tamanho: int):
+        chave = (metodo, rota)
+        m = self._rotas.get(chave)
+        if m is None:
+            m = self._rotas[chave] = _MetricasRota()
+        m.status[status] = m.status.get(status, 0) + 1
+        m.latencia.observar(duracao)
+        m.tamanho.observar(tamanho)
+
+    # -------------------------------
+    # Exposição (formato texto)
+    # -------------------------------
+
+    def exportar(self) -> str:
+        linhas: list[str] = []
+        rotas = sorted(self._rotas.items())
+
+        linhas += [
+            "# HELP aria_http_requests_total Requisições HTTP atendidas.",
+            "# TYPE aria_http_requests_total counter",
+        ]
+        for (metodo, rota), m in rotas:
+            for status, total in sorted(m.status.items()):
+                linhas.append(
+                    f'aria_http_requests_total{{method="{metodo}",route="{_escapar(rota)}",'
+                    f'status="{status}"}} {total}'
+                )
+
+        linhas += [
+            "# HELP aria_http_request_duration_seconds Latência das requisições HTTP.",
+            "# TYPE aria_http_request_duration_seconds histogram",
+        ]
+        for (metodo, rota), m in rotas:
+            rotulos = f'method="{metodo}",route="{_escapar(rota)}"'
+            linhas += m.latencia.linhas("aria_http_request_duration_seconds", rotulos)
+
+        linhas += [
+            "# HELP aria_http_response_size_bytes Tamanho do corpo das respostas HTTP.",
+            "# TYPE aria_http_response_size_bytes histogram",
+        ]
+        for (metodo, rota), m in rotas:
+            rotulos = f'method="{metodo}",route="{_escapar(rota)}"'
+            linhas += m.tamanho.linhas("aria_http_response_size_bytes", rotulos)
+
+        linhas += [
+            "# HELP aria_processo_inicio_segundos Início do processo (unix time).",
+            "# TYPE aria_processo_inicio_segundos gauge",
+            f"aria_processo_inicio_segundos {_numero(self.iniciado_em)}",
+        ]
+
+        if self.store is not None:
+            linhas += _linhas_store(self.store)
+        if self.relogio is not None:
+            linhas += _linhas_relogio(self.relogio)
+        return "\n".join(linhas) + "\n"
+
+
+def _linhas_store(store: "GameStore") -> list[str]:
+    jogos = store.contagens()
+    metricas = (
+        ("aria_jogos_ativos", "gauge", "Jogos em memória ainda em andamento.", jogos["em_andamento"]),
+        ("aria_jogos_finalizados", "gauge", "Jogos em memória já terminados.", jogos["finalizados"]),
+        ("aria_logs_retidos", "gauge", "Linhas de log guardadas nos jogos em memória.", jogos["logs_retidos"]),
+        ("aria_turnos_executados_total", "counter", "Turnos executados desde o início do processo.", store.total_turnos),
+        ("aria_jogos_criados_total", "counter", "Jogos criados desde o início do processo.", store.total_criados),
+        ("aria_jogos_despejados_total", "counter", "Jogos retirados da memória (TTL/LRU).", store.total_despejados),
+        ("aria_jogos_restaurados_total", "counter", "Jogos recarregados do disco.", store.total_restaurados),
+        ("aria_pedidos_coalescidos_total", "counter", "Pedidos repetidos atendidos pela execução de outro igual.", store.total_coalescidos),
+    )
+    linhas = []
+    for nome, tipo, ajuda, valor in metricas:
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}", f"{nome} {valor}"]
+    return linhas
+
+
+def _linhas_relogio(relogio: "Relogio") -> list[str]:
+    metricas = (
+        ("aria_relogio_jogos", "gauge", "Jogos sendo avançados pelo relógio do servidor.", len(relogio)),
+        ("aria_relogio_ticks_total", "counter", "Turnos executados pelo relógio do servidor.", relogio.total_ticks),
+        ("aria_relogio_lotes_total", "counter", "Lotes de ticks enviados ao threadpool.", relogio.total_lotes),
+        ("aria_relogio_ultimo_atraso_segundos", "gauge", "Maior atraso do último lote de ticks.", _numero(relogio.ultimo_atraso)),
+    )
+    linhas = []
+    for nome, tipo, ajuda, valor in metricas:
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}", f"{nome} {valor}"]
+    linhas += [
+        "# HELP aria_relogio_atraso_segundos Atraso de cada tick em relação ao horário agendado.",
+        "# TYPE aria_relogio_atraso_segundos histogram",
+    ]
+    return linhas + relogio.atraso.linhas("aria_relogio_atraso_segundos")
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor))
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# -------------------------------
+# Middleware (ASGI puro)
+# -------------------------------
+
+
+class MiddlewareMetricas:
+    """
+    Mede cada requisição HTTP do app. Não usa BaseHTTPMiddleware (que
+    cria uma task e filas extras por requisição); só embrulha o `send`
+    para contar os bytes do corpo e pegar o status.
+    """
+
+    def __init__(self, app, metricas: Metricas):
+        self.app = app
+        self.metricas = metricas
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        tamanho = 0
+
+        async def send_medindo(mensagem):
+            nonlocal status, tamanho
+            tipo = mensagem["type"]
+            if tipo == "http.response.body":
+                tamanho += len(mensagem.get("body", b""))
+            elif tipo == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_medindo)
+        finally:
+            # o roteador grava a rota no próprio scope ao casar o caminho
+            rota = scope.get("route")
+            self.metricas.registrar(
+                scope["method"],
+                getattr(rota, "path", ROTA_DESCONHECIDA),
+                status,
+                time.perf_counter() - inicio,
+                tamanho,
+            )
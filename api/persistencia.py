@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from core.engine import GameState
+from core.snapshot import SnapshotInvalido, codificar_estado, decodificar_estado
+
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS jogos (
+    game_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    atualizado_em REAL NOT NULL,
+    snapshot BLOB NOT NULL
+)
+"""
+
+# marcador de "apagar" na fila de escrita
+_REMOVER = None
+
+
+class PersistenciaSQLite:
+    """
+    Guarda snapshots dos jogos num SQLite local (modo WAL), com escrita
+    atrasada (write-behind):
+
+    - agendar() só codifica o snapshot (barato, feito com o lock do jogo)
+      e o coloca numa fila; gravações repetidas do mesmo jogo se
+      sobrepõem e só a última vai para o disco.
+    - Uma thread de fundo grava a fila inteira numa transação a cada
+      `intervalo` segundos.
+    - carregar() olha primeiro a fila (snapshot ainda não gravado) e
+      depois o banco.
+    - Snapshots sem atualização há mais de `ttl` segundos são apagados
+      de tempos em tempos (jogos abandonados).
+    """
+
+    def __init__(self, caminho: str, intervalo: float = 0.5, ttl: float = 24 * 3600):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self.ttl = ttl
+        self._ultima_limpeza = 0.0
+
+        # game_id -> (status, snapshot) ou _REMOVER
+        self._pendentes: dict = {}
+        # lote que está sendo gravado agora (ainda visível para carregar())
+        self._gravando: dict = {}
+        self._cond = threading.Condition()
+        # garante que lotes chegam ao disco na ordem em que saíram da fila
+        self._escrita = threading.Lock()
+        self._leitura = threading.local()
+        self._fechado = False
+
+        self.total_gravados = 0
+        self.total_lotes = 0
+
+        conn = self._conectar()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_ESQUEMA)
+        conn.commit()
+        conn.close()
+
+        self._thread = threading.Thread(
+            target=self._laco_escrita, name="aria-persistencia", daemon=True
+        )
+        self._thread.start()
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # -------------------------------
+    # API usada pelo GameStore
+    # -------------------------------
+
+    def agendar(self, game_id: str, game: GameState):
+        """Enfileira o snapshot atual do jogo (chamar com o lock do jogo)."""
+        dados = codificar_estado(game)
+        with self._cond:
+            self._pendentes[game_id] = (game.status, dados)
+            self._cond.notify()
+
+    def remover(self, game_id: str):
+        with self._cond:
+            self._pendentes[game_id] = _REMOVER
+            self._cond.notify()
+
+    def carregar(self, game_id: str) -> Optional[GameState]:
+        with self._cond:
+            for fila in (self._pendentes, self._gravando):
+                if game_id in fila:
+                    item = fila[game_id]
+                    return None if item is _REMOVER else decodificar_estado(item[1])
+
+        conn = getattr(self._leitura, "conn", None)
+        if conn is None:
+            conn = self._leitura.conn = self._conectar()
+        linha = conn.execute(
+            "SELECT snapshot FROM jogos WHERE game_id = ?", (game_id,)
+        ).fetchone()
+        if linha is None:
+            return None
+        try:
+            return decodificar_estado(linha[0])
+        except SnapshotInvalido:
+            return None
+
+    def flush(self):
+        """Grava tudo o que estiver na fila, agora, nesta thread."""
+        conn = self._conectar()
+        try:
+            self._gravar_fila(conn)
+        finally:
+            conn.close()
+
+    def fechar(self):
+        with self._cond:
+            self._fechado = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+
+    def estatisticas(self) -> dict:
+        with self._cond:
+            pendentes = len(self._pendentes)
+        return {
+            "pendentes": pendentes,
+            "total_gravados": self.total_gravados,
+            "total_lotes": self.total_lotes,
+        }
+
+    # -------------------------------
+    # Thread de escrita
+    # -------------------------------
+
+    def _laco_escrita(self):
+        conn = self._conectar()
+        try:
+            while True:
+                with self._cond:
+                    while not self._pendentes and not self._fechado:
+                        self._cond.wait()
+                    if self._fechado:
+                        return
+                # junta o que chegar durante o intervalo num lote só
+                time.sleep(self.intervalo)
+                self._gravar_fila(conn)
+                self._apagar_antigos(conn)
+        finally:
+            conn.close()
+
+    def _gravar_fila(self, conn: sqlite3.Connection):
+        with self._escrita:
+            with self._cond:
+                lote, self._pendentes = self._pendentes, {}
+                self._gravando = lote
+            if not lote:
+                return
+
+            agora = time.time()
+            salvar = []
+            apagar = []
+            for gid, item in lote.items():
+                if item is _REMOVER:
+                    apagar.append((gid,))
+                else:
+                    status, dados = item
+                    salvar.append((gid, status, agora, dados))
+
+            try:
+                with conn:
+                    if salvar:
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO jogos "
+                            "(game_id, status, atualizado_em, snapshot) VALUES (?, ?, ?, ?)",
+                            salvar,
+                        )
+                    if apagar:
+                        conn.executemany("DELETE FROM jogos WHERE game_id = ?", apagar)
+            finally:
+                with self._cond:
+                    self._gravando = {}
+
+            self.total_gravados += len(lote)
+            self.total_lotes += 1
+
+    def _apagar_antigos(self, conn: sqlite3.Connection):
+        agora = time.time()
+        if agora - self._ultima_limpeza < 60:
+            return
+        self._ultima_limpeza = agora
+        with self._escrita, conn:
+            conn.execute("DELETE FROM jogos WHERE atualizado_em < ?", (agora - self.ttl,))
@@ -0,0 +1,266 @@
+"""
+Relógio do servidor: avança os jogos que alguém está assistindo (/ws),
+cada um na sua cadência, com uma tarefa asyncio só para o processo todo
+(em vez de um timer por conexão ou por aba fazendo polling no /turno).
+
+- Agenda: um heap de (vencimento, geração, game_id). Pausar um jogo só
+  o tira de `_jogos`; a entrada dele no heap fica velha (a geração não
+  bate mais) e é jogada fora quando chega ao topo.
+- Lotes: tudo o que vence até JANELA_LOTE depois de agora roda junto,
+  em lotes de até TAMANHO_LOTE jogos por ida ao threadpool
+  (GameStore.usar_varios: os locks são pegos em ordem, como no /lote).
+  Jogos com cérebro (core/cerebro.py) dividem ORCAMENTO_BUSCA_MS de busca
+  por lote, como no /lote/turnos; os que não cabem vão para o próximo
+  lote, para nenhum lote prender os locks por segundos.
+- Pausa: sem ninguém assistindo, o jogo sai da agenda (continua no
+  store, os endpoints REST seguem valendo); volta quando alguém assiste
+  de novo. Jogo que termina ou some (despejado, outro worker) também sai.
+- Atraso: quanto depois do vencimento cada tick rodou vai para um
+  histograma do /metrics. Ticks atrasados não são "recuperados": o
+  próximo vence um intervalo depois do anterior, ou agora, se isso já
+  passou.
+
+Quem assiste recebe uma Assinatura: o `mudou` dela é acionado depois de
+cada tick do jogo (e quando o jogo some, com o motivo em `erro`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import sys
+from typing import Optional, Union
+
+from api.metricas import Histograma
+from api.store import GameStore
+from core.cerebro import NIVEIS
+
+
+# Ticks que vencem até este tanto (s) depois de agora entram no mesmo lote
+JANELA_LOTE = 0.01
+
+# Jogos por ida ao threadpool (os locks ficam presos até o lote acabar)
+TAMANHO_LOTE = 64
+
+# Busca do cérebro somada num lote (ms): 12 jogos no difícil
+ORCAMENTO_BUSCA_MS = 250.0
+
+# Resultado de _avancar para um jogo que ficou para o próximo lote
+ADIADO = "adiado"
+
+# Limites (le) do histograma de atraso, em segundos
+BUCKETS_ATRASO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Assinatura:
+    """Alguém assistindo um jogo (ver Relogio.assistir)."""
+
+    __slots__ = ("game_id", "mudou", "erro")
+
+    def __init__(self, game_id: str, mudou: asyncio.Event):
+        self.game_id = game_id
+        self.mudou = mudou
+        self.erro: Optional[Exception] = None  # JogoNaoEncontrado / JogoDeOutroNo
+
+
+class _Agendado:
+    __slots__ = ("intervalo", "assinaturas", "geracao")
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self.assinaturas: set[Assinatura] = set()
+        self.geracao = 0
+
+
+class Relogio:
+    def __init__(
+        self,
+        store: GameStore,
+        janela: float = JANELA_LOTE,
+        tamanho_lote: int = TAMANHO_LOTE,
+        orcamento_ms: float = ORCAMENTO_BUSCA_MS,
+    ):
+        self.store = store
+        self.janela = janela
+        self.tamanho_lote = tamanho_lote
+        self.orcamento_ms = orcamento_ms
+
+        self._jogos: dict[str, _Agendado] = {}
+        self._agenda: list[tuple[float, int, str]] = []
+        self._geracao = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._acordar: Optional[asyncio.Event] = None
+        self._tarefa: Optional[asyncio.Task] = None
+
+        # Métricas (só mexidas no event loop, como as do api/metricas.py)
+        self.atraso = Histograma(BUCKETS_ATRASO)
+        self.ultimo_atraso = 0.0  # maior atraso do último lote
+        self.total_ticks = 0
+        self.total_lotes = 0
+
+    # -------------------------------
+    # Quem assiste
+    # -------------------------------
+
+    def assistir(self, game_id: str, intervalo: float) -> Assinatura:
+        """
+        Começa (ou continua) a avançar o jogo. A cadência é a de quem
+        começou a assistir; quem chega depois entra na que já está valendo.
+        """
+        self._garantir_tarefa()
+        agendado = self._jogos.get(game_id)
+        if agendado is None:
+            agendado = self._jogos[game_id] = _Agendado(intervalo)
+            self._agendar(game_id, agendado, self._loop.time() + intervalo)
+        assinatura = Assinatura(game_id, asyncio.Event())
+        agendado.assinaturas.add(assinatura)
+        return assinatura
+
+    def deixar(self, assinatura: Assinatura):
+        """Para de assistir; sem mais ninguém, o jogo sai da agenda (pausa)."""
+        agendado = self._jogos.get(assinatura.game_id)
+        if agendado is None:
+            return
+        agendado.assinaturas.discard(assinatura)
+        if not agendado.assinaturas:
+            del self._jogos[assinatura.game_id]
+
+    def __len__(self) -> int:
+        return len(self._jogos)
+
+    # -------------------------------
+    # Agenda
+    # -------------------------------
+
+    def _agendar(self, game_id: str, agendado: _Agendado, vencimento: float):
+        self._geracao += 1
+        agendado.geracao = self._geracao
+        heapq.heappush(self._agenda, (vencimento, self._geracao, game_id))
+        self._acordar.set()
+
+    def _valida(self, entrada: tuple[float, int, str]) -> bool:
+        agendado = self._jogos.get(entrada[2])
+        return agendado is not None and agendado.geracao == entrada[1]
+
+    def _garantir_tarefa(self):
+        # começa na primeira assinatura (e de novo se o event loop mudou)
+        loop = asyncio.get_running_loop()
+        if self._tarefa is not None and not self._tarefa.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._acordar = asyncio.Event()
+        self._tarefa = loop.create_task(self._rodar())
+
+    async def parar(self):
+        tarefa, self._tarefa = self._tarefa, None
+        if tarefa is None or tarefa.done():
+            return
+        tarefa.cancel()
+        try:
+            await tarefa
+        except asyncio.CancelledError:
+            pass
+
+    # -------------------------------
+    # Ticks
+    # -------------------------------
+
+    async def _rodar(self):
+        loop = asyncio.get_running_loop()
+        agenda = self._agenda
+        while True:
+            self._acordar.clear()
+            while agenda and not self._valida(agenda[0]):
+                heapq.heappop(agenda)
+            if not agenda:
+                await self._acordar.wait()
+                continue
+            espera = agenda[0][0] - loop.time()
+            if espera > 0:
+                try:
+                    await asyncio.wait_for(self._acordar.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            agora = loop.time()
+            limite = agora + self.janela
+            vencidos = []
+            while agenda and agenda[0][0] <= limite:
+                entrada = heapq.heappop(agenda)
+                if self._valida(entrada):
+                    vencidos.append((entrada[2], entrada[0]))
+            atrasos = [max(0.0, agora - vencimento) for _, vencimento in vencidos]
+            for atraso in atrasos:
+                self.atraso.observar(atraso)
+            self.ultimo_atraso = max(atrasos)
+
+            while vencidos:
+                lote, vencidos = vencidos[: self.tamanho_lote], vencidos[self.tamanho_lote :]
+                try:
+                    resultados = await asyncio.to_thread(self._avancar, [gid for gid, _ in lote])
+                except Exception as e:
+                    # não derruba o relógio dos outros jogos: quem assiste estes recebe o erro
+                    print(f"[relogio] erro num lote de {len(lote)} jogos: {e!r}", file=sys.stderr)
+                    resultados = dict.fromkeys((gid for gid, _ in lote), e)
+                self.total_lotes += 1
+                # os que passaram do orçamento de busca abrem o próximo lote
+                adiados = [item for item in lote if resultados[item[0]] is ADIADO]
+                if adiados:
+                    lote = [item for item in lote if resultados[item[0]] is not ADIADO]
+                    vencidos = adiados + vencidos
+                self._entregar(lote, resultados, loop.time())
+
+    def _avancar(self, game_ids: list[str]) -> dict[str, Union[str, Exception]]:
+        """
+        (threadpool) Um turno em cada jogo em andamento; devolve o status,
+        ou o erro, de cada um, ou ADIADO para quem não coube no orçamento
+        de busca (o primeiro com cérebro sempre cabe).
+        """
+        resultados: dict[str, Union[str, Exception]] = {}
+        orcamento_ms = self.orcamento_ms
+        with self.store.usar_varios(game_ids, alterar=True) as sessoes:
+            for game_id, sessao in sessoes.items():
+                if isinstance(sessao, LookupError):
+                    resultados[game_id] = sessao
+                    continue
+                game = sessao.game
+                if game.status == "running":
+                    if game.dificuldade is not None:
+                        custo_ms = NIVEIS[game.dificuldade].orcamento_ms
+                        if custo_ms > orcamento_ms and orcamento_ms < self.orcamento_ms:
+                            resultados[game_id] = ADIADO
+                            continue
+                        orcamento_ms -= custo_ms
+                    game.executar_turno()
+                resultados[game_id] = game.status
+        return resultados
+
+    def _entregar(self, lote: list[tuple[str, float]], resultados: dict, agora: float):
+        for game_id, vencimento in lote:
+            agendado = self._jogos.get(game_id)
+            if agendado is None:
+                continue  # todo mundo saiu enquanto o lote rodava
+            resultado = resultados[game_id]
+            self.total_ticks += 1
+            for assinatura in agendado.assinaturas:
+                if isinstance(resultado, Exception):
+                    assinatura.erro = resultado
+                assinatura.mudou.set()
+            if resultado == "running":
+                self._agendar(game_id, agendado, max(vencimento + agendado.intervalo, agora))
+            else:
+                del self._jogos[game_id]
+
+    # -------------------------------
+    # Estatísticas
+    # -------------------------------
+
+    def estatisticas(self) -> dict:
+        return {
+            "jogos": len(self._jogos),
+            "ticks": self.total_ticks,
+            "lotes": self.total_lotes,
+            "atraso_medio_s": self.atraso.soma / self.atraso.total if self.atraso.total else 0.0,
+            "ultimo_atraso_s": self.ultimo_atraso,
+        }
@@ -0,0 +1,513 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional, TypeVar, Union
+
+from core.engine import GameState
+
+from api.anel import AnelConsistente
+from api.persistencia import PersistenciaSQLite
+
+
+T = TypeVar("T")
+
+def _env_int(nome: str, padrao: int) -> int:
+    valor = os.environ.get(nome)
+    if not valor:
+        return padrao
+    try:
+        return int(valor)
+    except ValueError:
+        return padrao
+
+
+class JogoNaoEncontrado(KeyError):
+    """Game id desconhecido (nunca existiu ou já foi despejado)."""
+
+
+class JogoDeOutroNo(LookupError):
+    """Com vários workers (api/despachante.py): o jogo pertence a outro nó."""
+
+    def __init__(self, game_id: str, dono: str):
+        super().__init__(game_id)
+        self.game_id = game_id
+        self.dono = dono
+
+
+class Sessao:
+    """Um jogo residente no store + o lock que serializa o acesso a ele."""
+
+    __slots__ = (
+        "game_id",
+        "game",
+        "lock",
+        "criado_em",
+        "ultimo_acesso",
+        "corpos",
+        "versao_corpos",
+        "em_voo",
+        "feitos",
+        "usuarios",
+        "gravadores",
+    )
+
+    def __init__(self, game_id: str, game: GameState):
+        self.game_id = game_id
+        self.game = game
+        self.lock = threading.Lock()
+        self.criado_em = time.monotonic()
+        self.ultimo_acesso = self.criado_em
+        # JSON já codificado do estado (por cursor de logs), válido enquanto
+        # game.versao == versao_corpos; quem usa é a API
+        self.corpos: dict = {}
+        self.versao_corpos = -1
+        # pedidos em andamento por chave (GameStore.uma_vez), protegido
+        # pelo lock do store
+        self.em_voo: dict = {}
+        # pedidos idempotentes já aplicados: chave -> versão do jogo logo
+        # depois (/command) ou a resposta dada (/turno); a API usa para
+        # reconhecer retentativas
+        self.feitos: "OrderedDict" = OrderedDict()
+        # pedidos que pegaram a sessão e ainda não a soltaram (protegido
+        # pelo lock do store): com algum, ela não é despejada, senão ele
+        # seguiria alterando uma cópia órfã enquanto o próximo pedido
+        # carrega outra do disco
+        self.usuarios = 0
+        # replays mantidos em dia enquanto o jogo anda, por intervalo entre
+        # quadros-chave (core.replay.GravadorJogo); quem usa é a API
+        self.gravadores: dict = {}
+
+
+class GameStore:
+    """
+    Registro de jogos em memória, indexado pelo game_id devolvido no /new_game.
+
+    - Cada jogo tem seu próprio lock (os endpoints rodam no threadpool).
+    - Ordem LRU: todo acesso move o jogo para o fim do OrderedDict.
+    - Jogos ociosos há mais de `ttl_ocioso` segundos, ou terminados há mais
+      de `ttl_finalizado`, são despejados por limpar_expirados() (a API
+      chama de tempos em tempos, ver api/main.py).
+    - Acima de `max_jogos`, despeja primeiro os terminados, depois o LRU.
+    - Jogo em uso (algum pedido com a sessão na mão, esperando ou com o
+      lock dele) nunca é despejado; se todos estiverem em uso, o store
+      passa de `max_jogos` até algum ser solto.
+
+    Com `persistencia`, todo jogo criado ou alterado é salvo (write-behind)
+    e um id que não está em memória é carregado do disco no primeiro
+    acesso, então reinícios e despejos por LRU não perdem lutas. Jogos
+    despejados por TTL são apagados do disco também.
+
+    Com `anel` (vários workers, ver api/despachante.py), este store é o
+    nó `no`: só cria ids que o anel dá para ele e recusa os outros
+    (JogoDeOutroNo). O disco é compartilhado: quando o anel muda, os jogos
+    que mudaram de dono são gravados e soltos, e o novo dono os carrega.
+    """
+
+    def __init__(
+        self,
+        max_jogos: int = 1000,
+        ttl_ocioso: float = 30 * 60,
+        ttl_finalizado: float = 5 * 60,
+        persistencia: Optional[PersistenciaSQLite] = None,
+        no: Optional[str] = None,
+        anel: Optional[AnelConsistente] = None,
+    ):
+        if anel is not None and (no is None or persistencia is None):
+            raise ValueError("Com anel, o store precisa do nome do nó e de persistência.")
+        self.max_jogos = max_jogos
+        self.ttl_ocioso = ttl_ocioso
+        self.ttl_finalizado = ttl_finalizado
+        self.persistencia = persistencia
+        self.no = no
+        self.anel = anel
+
+        self._sessoes: "OrderedDict[str, Sessao]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_criados = 0
+        self.total_despejados = 0
+        self.total_restaurados = 0
+        self.total_turnos = 0  # turnos executados pelos jogos deste processo
+        self.total_coalescidos = 0  # pedidos que aproveitaram a execução de um igual (uma_vez)
+
+    @classmethod
+    def from_env(cls) -> "GameStore":
+        """
+        ARIA_DB é o arquivo SQLite dos snapshots (padrão aria_jogos.db);
+        vazio desliga a persistência. ARIA_NO e ARIA_ANEL (nós separados
+        por vírgula) são postos pelo despachante em cada worker.
+        """
+        caminho_db = os.environ.get("ARIA_DB", "aria_jogos.db")
+        ttl_ocioso = _env_int("ARIA_TTL_OCIOSO", 30 * 60)
+        nos = [n for n in os.environ.get("ARIA_ANEL", "").split(",") if n]
+        return cls(
+            max_jogos=_env_int("ARIA_MAX_JOGOS", 1000),
+            ttl_ocioso=ttl_ocioso,
+            ttl_finalizado=_env_int("ARIA_TTL_FINALIZADO", 5 * 60),
+            persistencia=(
+                PersistenciaSQLite(caminho_db, ttl=ttl_ocioso) if caminho_db else None
+            ),
+            no=os.environ.get("ARIA_NO") or None,
+            anel=AnelConsistente(nos) if nos else None,
+        )
+
+    # -------------------------------
+    # Criação / acesso
+    # -------------------------------
+
+    def criar(self, game: GameState) -> str:
+        game_id = uuid.uuid4().hex
+        anel = self.anel
+        if anel is not None:
+            # sorteia até cair num id deste nó (~N tentativas com N nós)
+            while anel.dono(game_id) != self.no:
+                game_id = uuid.uuid4().hex
+        self._inserir(Sessao(game_id, game))
+        with self._lock:
+            self.total_criados += 1
+        if self.persistencia is not None:
+            self.persistencia.agendar(game_id, game)
+        return game_id
+
+    def _inserir(self, sessao: Sessao, reservar: bool = False) -> Sessao:
+        """
+        Coloca a sessão no store (ou devolve a que já estiver lá). Com
+        reservar=True, já sai reservada, como de _sessao().
+        """
+        with self._lock:
+            existente = self._sessoes.get(sessao.game_id)
+            if existente is not None:
+                sessao = existente
+            else:
+                while len(self._sessoes) >= self.max_jogos and self._despejar_um():
+                    pass
+                self._sessoes[sessao.game_id] = sessao
+            if reservar:
+                sessao.usuarios += 1
+            return sessao
+
+    def _sessao(self, game_id: str) -> Sessao:
+        """
+        A sessão do jogo, reservada: não é despejada até _soltar(sessao).
+        Todo _sessao() tem o seu _soltar(), num finally.
+        """
+        anel = self.anel
+        if anel is not None:
+            dono = anel.dono(game_id)
+            if dono != self.no:
+                raise JogoDeOutroNo(game_id, dono)
+        agora = time.monotonic()
+        with self._lock:
+            sessao = self._sessoes.get(game_id)
+            if sessao is not None:
+                sessao.ultimo_acesso = agora
+                sessao.usuarios += 1
+                self._sessoes.move_to_end(game_id)
+                return sessao
+
+        # Não está em memória: tenta o disco (reinício ou despejo por LRU)
+        game = self.persistencia.carregar(game_id) if self.persistencia else None
+        if game is None:
+            raise JogoNaoEncontrado(game_id)
+        sessao = self._inserir(Sessao(game_id, game), reservar=True)
+        with self._lock:
+            self.total_restaurados += 1
+        return sessao
+
+    def _soltar(self, sessao: Sessao):
+        with self._lock:
+            sessao.usuarios -= 1
+
+    @contextmanager
+    def usar(self, game_id: str, alterar: bool = False) -> Iterator[GameState]:
+        """
+        Dá acesso exclusivo ao jogo enquanto o bloco `with` estiver aberto.
+        Levanta JogoNaoEncontrado se o id não existir.
+        Com alterar=True, o jogo é salvo ao fim do bloco.
+        """
+        with self.usar_sessao(game_id, alterar) as sessao:
+            yield sessao.game
+
+    @contextmanager
+    def usar_sessao(self, game_id: str, alterar: bool = False) -> Iterator[Sessao]:
+        """Como usar(), mas entrega a Sessao (para o cache de respostas)."""
+        sessao = self._sessao(game_id)
+        try:
+            with self._travar(sessao, alterar):
+                yield sessao
+        finally:
+            self._soltar(sessao)
+
+    @contextmanager
+    def _travar(self, sessao: Sessao, alterar: bool) -> Iterator[Sessao]:
+        game_id = sessao.game_id
+        with sessao.lock:
+            if self.anel is not None and self.anel.dono(game_id) != self.no:
+                # o anel mudou enquanto esperava o lock: o jogo já foi solto
+                raise JogoDeOutroNo(game_id, self.anel.dono(game_id))
+            turno = sessao.game.turno
+            yield sessao
+            if alterar:
+                self._alterado(sessao, turno)
+
+    def uma_vez(self, game_id: str, chave, funcao: Callable[[Sessao], T], alterar: bool = False) -> T:
+        """
+        Junta pedidos iguais que chegam juntos (retentativa depois de um
+        timeout, duas abas no mesmo jogo): o primeiro com `chave` roda
+        funcao(sessao) com o jogo travado, como usar_sessao(); quem chegar
+        com a mesma chave enquanto ele roda não pega o lock, só espera e
+        recebe o mesmo resultado (ou a mesma exceção).
+        """
+        sessao = self._sessao(game_id)
+        try:
+            return self._uma_vez(sessao, chave, funcao, alterar)
+        finally:
+            self._soltar(sessao)
+
+    def _uma_vez(self, sessao: Sessao, chave, funcao: Callable[[Sessao], T], alterar: bool) -> T:
+        with self._lock:
+            futuro = sessao.em_voo.get(chave)
+            primeiro = futuro is None
+            if primeiro:
+                futuro = sessao.em_voo[chave] = Future()
+            else:
+                self.total_coalescidos += 1
+        if not primeiro:
+            return futuro.result()
+
+        try:
+            with self._travar(sessao, alterar):
+                resultado = funcao(sessao)
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            with self._lock:
+                sessao.em_voo.pop(chave, None)
+
+    @contextmanager
+    def usar_varios(
+        self, game_ids: Iterable[str], alterar: bool = False
+    ) -> Iterator[dict[str, Union[Sessao, LookupError]]]:
+        """
+        Como usar_sessao(), para vários jogos de uma vez (os lotes da API):
+        entrega {game_id: Sessao}, com a exceção (JogoNaoEncontrado,
+        JogoDeOutroNo) no lugar da Sessao dos ids que não deram certo.
+
+        Os locks são pegos em ordem crescente de game_id e ficam todos
+        presos até o fim do bloco. Como todo mundo que pega mais de um lock
+        segue a mesma ordem (e usar() pega um só), dois lotes com jogos em
+        comum nunca esperam um pelo outro em ciclo.
+        """
+        sessoes: dict[str, Union[Sessao, LookupError]] = {}
+        reservadas: list[Sessao] = []
+        presas: list[tuple[Sessao, int]] = []
+        try:
+            for game_id in sorted(set(game_ids)):
+                try:
+                    sessao = self._sessao(game_id)
+                except (JogoNaoEncontrado, JogoDeOutroNo) as e:
+                    sessoes[game_id] = e
+                    continue
+                reservadas.append(sessao)
+                sessao.lock.acquire()
+                if self.anel is not None and self.anel.dono(game_id) != self.no:
+                    sessao.lock.release()
+                    sessoes[game_id] = JogoDeOutroNo(game_id, self.anel.dono(game_id))
+                    continue
+                presas.append((sessao, sessao.game.turno))
+                sessoes[game_id] = sessao
+
+            yield sessoes
+
+            if alterar:
+                for sessao, turno in presas:
+                    self._alterado(sessao, turno)
+        finally:
+            for sessao, _ in reversed(presas):
+                sessao.lock.release()
+            for sessao in reservadas:
+                self._soltar(sessao)
+
+    def _alterado(self, sessao: Sessao, turno_antes: int):
+        # Chamado com o lock da sessão: conta os turnos e agenda o snapshot.
+        if sessao.game.turno != turno_antes:
+            with self._lock:
+                self.total_turnos += sessao.game.turno - turno_antes
+        if self.persistencia is not None:
+            self.persistencia.agendar(sessao.game_id, sessao.game)
+
+    def existe(self, game_id: str) -> bool:
+        """Se o jogo está em memória ou no disco (carrega se estiver no disco)."""
+        try:
+            self._soltar(self._sessao(game_id))
+            return True
+        except JogoNaoEncontrado:
+            return False
+
+    def remover(self, game_id: str) -> bool:
+        if self.persistencia is not None:
+            self.persistencia.remover(game_id)
+        with self._lock:
+            return self._sessoes.pop(game_id, None) is not None
+
+    def __contains__(self, game_id: str) -> bool:
+        with self._lock:
+            return game_id in self._sessoes
+
+    def __len__(self) -> int:
+        return len(self._sessoes)
+
+    # -------------------------------
+    # Despejo (TTL / LRU)
+    # -------------------------------
+
+    @staticmethod
+    def _despejavel(sessao: Sessao) -> bool:
+        # Chamado com self._lock já adquirido (usuarios não muda por baixo).
+        # O lock cobre quem pega a sessão sem _sessao() (atualizar_anel).
+        return sessao.usuarios == 0 and not sessao.lock.locked()
+
+    def _expirou(self, sessao: Sessao, agora: float) -> bool:
+        ocioso = agora - sessao.ultimo_acesso
+        if sessao.game.status != "running":
+            return ocioso > self.ttl_finalizado
+        return ocioso > self.ttl_ocioso
+
+    def _despejar_um(self) -> bool:
+        # Chamado com self._lock já adquirido e o store cheio.
+        # (O jogo continua no disco, se houver persistência.)
+        # Devolve False se todos estiverem em uso.
+        lru = None
+        for gid, sessao in self._sessoes.items():
+            if not self._despejavel(sessao):
+                continue
+            if sessao.game.status != "running":
+                lru = gid
+                break
+            if lru is None:
+                lru = gid
+        if lru is None:
+            return False
+        del self._sessoes[lru]
+        self.total_despejados += 1
+        return True
+
+    def limpar_expirados(self) -> int:
+        """
+        Despeja os jogos ociosos além do TTL (os em uso ficam para a
+        próxima) e os apaga do disco. Devolve quantos saíram.
+        """
+        agora = time.monotonic()
+        with self._lock:
+            expirados = [
+                gid for gid, s in self._sessoes.items() if self._expirou(s, agora) and self._despejavel(s)
+            ]
+            for gid in expirados:
+                del self._sessoes[gid]
+            self.total_despejados += len(expirados)
+        # fora do lock do store: a remoção vai para a fila da persistência
+        if self.persistencia is not None:
+            for gid in expirados:
+                self.persistencia.remover(gid)
+        return len(expirados)
+
+    # -------------------------------
+    # Vários workers (anel)
+    # -------------------------------
+
+    def atualizar_anel(self, anel: AnelConsistente) -> int:
+        """
+        Passa a usar `anel` e solta os jogos que agora são de outro nó:
+        cada um é gravado (com o lock dele, esperando quem estiver usando)
+        e sai da memória sem ser apagado do disco. Só volta depois que tudo
+        foi para o disco, para o novo dono já ler o estado certo.
+        Devolve quantos jogos foram soltos.
+        """
+        if self.persistencia is None or self.no is None:
+            raise ValueError("Store sem nó/persistência não participa de anel.")
+        self.anel = anel
+        with self._lock:
+            sessoes = [s for gid, s in self._sessoes.items() if anel.dono(gid) != self.no]
+
+        for sessao in sessoes:
+            with sessao.lock:
+                self.persistencia.agendar(sessao.game_id, sessao.game)
+                with self._lock:
+                    self._sessoes.pop(sessao.game_id, None)
+        self.persistencia.flush()
+        return len(sessoes)
+
+    # -------------------------------
+    # Estatísticas (dimensionamento)
+    # -------------------------------
+
+    def contagens(self) -> dict:
+        """Versão barata de estatisticas() (sem medir memória), para o /metrics."""
+        with self._lock:
+            sessoes = list(self._sessoes.values())
+
+        em_andamento = sum(1 for s in sessoes if s.game.status == "running")
+        return {
+            "em_andamento": em_andamento,
+            "finalizados": len(sessoes) - em_andamento,
+            "logs_retidos": sum(len(s.game.logs) for s in sessoes),
+        }
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            sessoes = list(self._sessoes.values())
+
+        em_andamento = sum(1 for s in sessoes if s.game.status == "running")
+        bytes_jogos = sum(tamanho_aproximado(s.game) for s in sessoes)
+
+        return {
+            "jogos": len(sessoes),
+            "em_andamento": em_andamento,
+            "finalizados": len(sessoes) - em_andamento,
+            "max_jogos": self.max_jogos,
+            "total_criados": self.total_criados,
+            "total_despejados": self.total_despejados,
+            "total_restaurados": self.total_restaurados,
+            "total_turnos": self.total_turnos,
+            "total_coalescidos": self.total_coalescidos,
+            "bytes_jogos": bytes_jogos,
+            "bytes_por_jogo": bytes_jogos // len(sessoes) if sessoes else 0,
+            "rss_bytes": _rss_bytes(),
+            "persistencia": self.persistencia.estatisticas() if self.persistencia else None,
+        }
+
+
+def tamanho_aproximado(game: GameState) -> int:
+    """
+    Estimativa (sys.getsizeof) da memória de um GameState: o objeto,
+    os dois robôs, a arena e os logs.
+    """
+    total = sys.getsizeof(game) + sys.getsizeof(game.__dict__)
+    for obj in (game.arena, game.jogador, game.adversario):
+        total += sys.getsizeof(obj)
+        atributos = getattr(obj, "__dict__", None)
+        if atributos is not None:
+            total += sys.getsizeof(atributos)
+    total += sys.getsizeof(game.logs)
+    total += sum(sys.getsizeof(linha) for linha in game.logs)
+    return total
+
+
+def _rss_bytes() -> Optional[int]:
+    """RSS atual do processo (Linux); None se não der para ler."""
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
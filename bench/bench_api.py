@@ -0,0 +1,321 @@
+"""
+Custo da API: serialização do estado conforme os logs crescem (direto
+do to_dict, pelos modelos Pydantic, e do cache por versão do /state), e
+vazão/latência dos endpoints por um cliente ASGI no mesmo processo (sem
+rede, sem uvicorn), incluindo o /state respondido com 304 e os lotes
+(/lote/novos, /lote/turnos) contra as mesmas chamadas avulsas; e o
+relógio do servidor (api/relogio.py) com muitos jogos assistidos.
+
+    python -m bench.bench_api [--requisicoes 300]
+
+Precisa do httpx (pip install httpx) para a parte dos endpoints. Os
+jogos vão para um SQLite temporário (ARIA_DB), não para o do servidor.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import atexit
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from bench.bench_motor import ARENA, _robos, melhor_de
+from core.engine import GameState
+
+_PASTA = tempfile.mkdtemp(prefix="aria-bench-")
+atexit.register(shutil.rmtree, _PASTA, True)
+if "api.main" not in sys.modules:
+    os.environ.setdefault("ARIA_DB", os.path.join(_PASTA, "bench.db"))
+
+from api.main import (  # noqa: E402
+    GameStateOut,
+    _codificar,
+    _corpo_estado,
+    _estado_dict,
+    app,
+    store,
+)
+from api.relogio import Relogio  # noqa: E402
+from api.store import Sessao  # noqa: E402
+
+try:
+    import httpx
+except ImportError:  # só a parte dos endpoints depende dele
+    httpx = None
+
+
+# -------------------------------
+# Serialização
+# -------------------------------
+
+
+def _jogo_com_logs(tamanho: int) -> GameState:
+    game = GameState(*_robos(), ARENA, max_logs=tamanho, seed=0)
+    game.avancar(10)
+    while len(game.logs) < tamanho:
+        game.aplicar_comando("focar no ataque")
+    game.to_dict()  # textos já renderizados, como num jogo que alguém acompanha
+    return game
+
+
+def medir_serializacao(tamanhos=(10, 100, 500), repeticoes: int = 2000) -> dict:
+    """
+    µs para gerar o JSON do estado com o buffer de logs cheio: completo,
+    incremental (since), com os logs como eventos (formato=eventos), pelos
+    modelos Pydantic (o caminho antigo, para comparar) e do cache do
+    /state (mesma versão, outro poll).
+    """
+    resultado = {}
+    for tamanho in tamanhos:
+        game = _jogo_com_logs(tamanho)
+        recentes = game.logs.proximo_seq - 3  # o que um turno costuma gerar
+        sessao = Sessao("bench", game)
+
+        def completo():
+            for _ in range(repeticoes):
+                _codificar(_estado_dict("bench", game))
+
+        def incremental():
+            for _ in range(repeticoes):
+                _codificar(_estado_dict("bench", game, since=recentes))
+
+        def eventos():
+            for _ in range(repeticoes):
+                _codificar(_estado_dict("bench", game, formato="eventos"))
+
+        def pydantic():
+            for _ in range(repeticoes):
+                GameStateOut.model_validate(_estado_dict("bench", game)).model_dump_json()
+
+        def em_cache():
+            for _ in range(repeticoes):
+                _corpo_estado(sessao, None)
+
+        por_chamada = lambda funcao: melhor_de(funcao, 3) / repeticoes * 1e6  # noqa: E731
+        resultado[f"serializar_logs_{tamanho}_us"] = por_chamada(completo)
+        resultado[f"serializar_logs_{tamanho}_incremental_us"] = por_chamada(incremental)
+        resultado[f"serializar_logs_{tamanho}_eventos_us"] = por_chamada(eventos)
+        resultado[f"serializar_logs_{tamanho}_pydantic_us"] = por_chamada(pydantic)
+        resultado[f"serializar_logs_{tamanho}_cache_us"] = por_chamada(em_cache)
+    return resultado
+
+
+# -------------------------------
+# Endpoints
+# -------------------------------
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+def _resumo(prefixo: str, latencias: list[float], total: float) -> dict:
+    return {
+        f"{prefixo}_req_por_s": len(latencias) / total,
+        f"{prefixo}_p50_ms": statistics.median(latencias) * 1000,
+        f"{prefixo}_p95_ms": _percentil(latencias, 0.95) * 1000,
+        f"{prefixo}_p99_ms": _percentil(latencias, 0.99) * 1000,
+    }
+
+
+async def _medir_endpoints(requisicoes: int, concorrencia: int) -> dict:
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+
+        async def novo_jogo(seed: int) -> dict:
+            r = await cliente.post("/new_game", json={"robo_escolha": 1, "nome": "Bench", "seed": seed})
+            r.raise_for_status()
+            return r.json()
+
+        async def serie(prefixo: str, requisicao) -> dict:
+            latencias = []
+            inicio = time.perf_counter()
+            for k in range(requisicoes):
+                t0 = time.perf_counter()
+                await requisicao(k)
+                latencias.append(time.perf_counter() - t0)
+            return _resumo(prefixo, latencias, time.perf_counter() - inicio)
+
+        resultado = {}
+        resultado.update(await serie("new_game", novo_jogo))
+
+        estado = await novo_jogo(0)
+
+        async def comando(k):
+            r = await cliente.post(
+                "/command", params={"game_id": estado["game_id"]}, json={"texto": "focar no ataque"}
+            )
+            r.raise_for_status()
+
+        resultado.update(await serie("command", comando))
+
+        async def turno(k):
+            nonlocal estado
+            if estado["status"] != "running":
+                estado = await novo_jogo(k)
+            r = await cliente.post(
+                "/turno", params={"game_id": estado["game_id"], "since": estado["log_cursor"]}
+            )
+            r.raise_for_status()
+            estado = r.json()
+
+        resultado.update(await serie("turno", turno))
+
+        async def state(k):
+            r = await cliente.get(
+                "/state", params={"game_id": estado["game_id"], "since": estado["log_cursor"]}
+            )
+            r.raise_for_status()
+
+        resultado.update(await serie("state", state))
+
+        etag = (await cliente.get("/state", params={"game_id": estado["game_id"]})).headers["etag"]
+
+        async def state_304(k):
+            r = await cliente.get(
+                "/state", params={"game_id": estado["game_id"]}, headers={"If-None-Match": etag}
+            )
+            assert r.status_code == 304, r.status_code
+
+        resultado.update(await serie("state_304", state_304))
+
+        # Vários clientes ao mesmo tempo, cada um no seu jogo (/turno)
+        jogos = [await novo_jogo(1000 + c) for c in range(concorrencia)]
+        latencias = []
+
+        async def cliente_turnos(c):
+            jogo = jogos[c]
+            for k in range(requisicoes // concorrencia):
+                if jogo["status"] != "running":
+                    jogo = await novo_jogo(2000 + c * requisicoes + k)
+                t0 = time.perf_counter()
+                r = await cliente.post(
+                    "/turno", params={"game_id": jogo["game_id"], "since": jogo["log_cursor"]}
+                )
+                latencias.append(time.perf_counter() - t0)
+                r.raise_for_status()
+                jogo = r.json()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente_turnos(c) for c in range(concorrencia)))
+        resultado.update(
+            _resumo(f"turno_{concorrencia}_clientes", latencias, time.perf_counter() - inicio)
+        )
+
+        # Lotes: `concorrencia` jogos por chamada (jogos criados e turnos
+        # por segundo, para comparar com new_game_req_por_s/turno_req_por_s)
+        pedido_novos = {
+            "jogos": [{"robo_escolha": 1, "nome": "Bench", "seed": s} for s in range(concorrencia)]
+        }
+        lote: list[dict] = []
+
+        async def novos(k):
+            nonlocal lote
+            r = await cliente.post("/lote/novos", json=pedido_novos)
+            r.raise_for_status()
+            lote = [item["estado"] for item in r.json()["resultados"]]
+
+        medidas = await serie(f"lote_novos_{concorrencia}", novos)
+        resultado[f"lote_novos_{concorrencia}_jogos_por_s"] = (
+            medidas.pop(f"lote_novos_{concorrencia}_req_por_s") * concorrencia
+        )
+        resultado.update(medidas)
+
+        async def turnos_lote(k):
+            nonlocal lote
+            if any(jogo["status"] != "running" for jogo in lote):
+                await novos(k)
+            r = await cliente.post(
+                "/lote/turnos",
+                json={
+                    "game_ids": [jogo["game_id"] for jogo in lote],
+                    "cursores": {jogo["game_id"]: jogo["log_cursor"] for jogo in lote},
+                },
+            )
+            r.raise_for_status()
+            lote = [item["estado"] for item in r.json()["resultados"]]
+
+        medidas = await serie(f"lote_turnos_{concorrencia}", turnos_lote)
+        resultado[f"lote_turnos_{concorrencia}_turnos_por_s"] = (
+            medidas.pop(f"lote_turnos_{concorrencia}_req_por_s") * concorrencia
+        )
+        resultado.update(medidas)
+    return resultado
+
+
+# -------------------------------
+# Relógio do servidor
+# -------------------------------
+
+
+def medir_relogio(jogos: int = 1000, intervalo: float = 0.2, duracao: float = 2.0) -> dict:
+    """
+    `jogos` assistidos ao mesmo tempo, cada um com um tick a cada
+    `intervalo`: ticks por segundo que o relógio deu conta e o atraso
+    médio dos ticks. Os robôs têm HP alto para nenhuma luta acabar antes.
+    """
+    from core.models import Robo
+
+    def robo(nome):
+        return Robo(nome, "branco", 1, 50, 1, "agressivo")
+
+    ids = [store.criar(GameState(robo("A"), robo("B"), ARENA, max_logs=50, seed=k)) for k in range(jogos)]
+
+    async def rodar():
+        relogio = Relogio(store)
+        assinaturas = [relogio.assistir(gid, intervalo) for gid in ids]
+        await asyncio.sleep(intervalo)  # os primeiros ticks só vencem depois de um intervalo
+        ticks_antes = relogio.total_ticks
+        inicio = time.perf_counter()
+        await asyncio.sleep(duracao)
+        decorrido = time.perf_counter() - inicio
+        ticks = relogio.total_ticks - ticks_antes
+        for assinatura in assinaturas:
+            relogio.deixar(assinatura)
+        await relogio.parar()
+        return ticks / decorrido, relogio.atraso.soma / max(1, relogio.atraso.total)
+
+    ticks_s, atraso = asyncio.run(rodar())
+    for gid in ids:
+        store.remover(gid)
+    return {
+        f"relogio_{jogos}_ticks_por_s": ticks_s,
+        f"relogio_{jogos}_atraso_ms": atraso * 1000,
+    }
+
+
+def medir(rapido: bool = False, requisicoes: int = 300, concorrencia: int = 16) -> dict:
+    resultado = medir_serializacao(repeticoes=200 if rapido else 2000)
+    resultado.update(medir_relogio(duracao=0.5 if rapido else 2.0))
+    if httpx is None:
+        print("httpx não instalado: pulando os endpoints (pip install httpx)", file=sys.stderr)
+        return resultado
+    resultado.update(
+        asyncio.run(_medir_endpoints(requisicoes // 3 if rapido else requisicoes, concorrencia))
+    )
+    return resultado
+
+
+def encerrar():
+    """Grava o que ficou na fila e fecha o SQLite temporário."""
+    if store.persistencia is not None:
+        store.persistencia.fechar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requisicoes", type=int, default=300)
+    parser.add_argument("--concorrencia", type=int, default=16)
+    args = parser.parse_args()
+
+    try:
+        for nome, valor in medir(requisicoes=args.requisicoes, concorrencia=args.concorrencia).items():
+            print(f"{nome:>36}: {valor:,.2f}")
+    finally:
+        encerrar()
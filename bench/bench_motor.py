@@ -0,0 +1,183 @@
+"""
+Custo do motor de batalha: escolher_acao, executar_turno, lutas inteiras,
+GameState.clonar, o cérebro de busca do adversário (core/cerebro.py) e o
+interpretador de comandos (core/comandos.py).
+
+    python -m bench.bench_motor
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from core import comandos
+from core.cerebro import CerebroBusca
+from core.engine import GameState
+from core.models import Arena, Robo
+
+
+ARENA = Arena(16, 5)
+
+
+def _robos():
+    return (
+        Robo("Bench", "vermelho", 3, 2, 1, "agressivo"),
+        Robo("Adversário", "branco", 2, 2, 2, "agressivo"),
+    )
+
+
+def melhor_de(funcao, repeticoes: int = 5) -> float:
+    """Menor tempo (s) de `repeticoes` execuções: o menos afetado por ruído."""
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - t0)
+    return min(tempos)
+
+
+def medir_escolher_acao(chamadas: int = 200_000) -> float:
+    """ns por chamada de Robo.escolher_acao."""
+    robo = _robos()[0]
+    rng = random.Random(0)
+    escolher = robo.escolher_acao
+
+    def rodar():
+        for _ in range(chamadas):
+            escolher(rng)
+
+    return melhor_de(rodar) / chamadas * 1e9
+
+
+def medir_turnos(turnos: int = 20_000, max_logs: int = 500) -> float:
+    """Turnos por segundo de GameState.executar_turno (lutas novas quando uma acaba)."""
+
+    def rodar():
+        seed = 0
+        game = GameState(*_robos(), ARENA, max_logs=max_logs, seed=seed)
+        for _ in range(turnos):
+            if game.status != "running":
+                seed += 1
+                game = GameState(*_robos(), ARENA, max_logs=max_logs, seed=seed)
+            game.executar_turno()
+
+    return turnos / melhor_de(rodar, 3)
+
+
+def medir_batalhas(batalhas: int = 500) -> tuple[float, float]:
+    """(lutas por segundo, turnos por luta) com lutas inteiras headless."""
+    turnos = [0]
+
+    def rodar():
+        turnos[0] = 0
+        for seed in range(batalhas):
+            game = GameState(*_robos(), ARENA, max_logs=1, seed=seed)
+            game.avancar(1000)
+            turnos[0] += game.turno - 1
+
+    return batalhas / melhor_de(rodar, 3), turnos[0] / batalhas
+
+
+def medir_clonar(clones: int = 20_000) -> float:
+    """µs por GameState.clonar de uma luta no meio (logs cheios não são copiados)."""
+    game = GameState(*_robos(), ARENA, seed=0)
+    game.avancar(20)
+
+    def rodar():
+        for _ in range(clones):
+            game.clonar()
+
+    return melhor_de(rodar) / clones * 1e6
+
+
+def medir_cerebro(dificuldade: str, lutas: int = 20) -> tuple[float, float]:
+    """(nós por segundo da busca, ms por escolha) em lutas inteiras com o cérebro no adversário."""
+    resultado = [0.0, 0.0]
+
+    def rodar():
+        cerebro = CerebroBusca(dificuldade)
+        escolhas = 0
+        for seed in range(lutas):
+            game = GameState(*_robos(), ARENA, max_logs=1, seed=seed, dificuldade=dificuldade)
+            game.cerebro = cerebro
+            game.avancar(1000)
+            escolhas += len(game.decisoes)
+        resultado[:] = [cerebro.nos_por_s, cerebro.tempo / escolhas * 1000]
+
+    melhor_de(rodar, 1)
+    return resultado[0], resultado[1]
+
+
+# Comandos de jogadores: poucas frases, muito repetidas
+FRASES = (
+    "focar no ataque",
+    "defenda muito",
+    "não fuja, bata forte",
+    "esquiva e contra-ataca",
+    "manter distância",
+    "ataque",
+)
+
+
+def _interpretar_legado(texto: str) -> dict:
+    """A cadeia de `in` que core/comandos.py substituiu: só a referência do bench."""
+    texto = texto.lower()
+    preferencias = {"ataque": 0, "defesa": 0, "esquiva": 0}
+    if not texto.strip():
+        return preferencias
+    if "ataq" in texto or "agress" in texto or "bate" in texto:
+        preferencias["ataque"] += 2
+    if "defes" in texto or "proteg" in texto or "tank" in texto:
+        preferencias["defesa"] += 2
+    if "esquiv" in texto or "desvi" in texto or "foge" in texto or "distân" in texto:
+        preferencias["esquiva"] += 2
+    if "contra" in texto:
+        preferencias["defesa"] += 1
+        preferencias["ataque"] += 1
+    return preferencias
+
+
+def medir_interpretar(chamadas: int = 50_000) -> tuple[float, float, float]:
+    """
+    µs por comando: (legado, novo sem cache, novo), com FRASES repetidas
+    como no jogo (o novo com o cache LRU já aquecido).
+    """
+    frases = [FRASES[i % len(FRASES)] for i in range(chamadas)]
+
+    def medir_funcao(funcao):
+        def rodar():
+            for texto in frases:
+                funcao(texto)
+
+        return melhor_de(rodar, 3) / chamadas * 1e6
+
+    return (
+        medir_funcao(_interpretar_legado),
+        medir_funcao(comandos._interpretar.__wrapped__),
+        medir_funcao(comandos.interpretar),
+    )
+
+
+def medir(rapido: bool = False) -> dict:
+    fator = 10 if rapido else 1
+    batalhas_s, turnos_por_batalha = medir_batalhas(500 // fator)
+    nos_s, escolha_ms = medir_cerebro("dificil", 20 // fator)
+    legado_us, sem_cache_us, interpretar_us = medir_interpretar(50_000 // fator)
+    return {
+        "escolher_acao_ns": medir_escolher_acao(200_000 // fator),
+        "turnos_por_s": medir_turnos(20_000 // fator),
+        "batalhas_por_s": batalhas_s,
+        "turnos_por_batalha": turnos_por_batalha,
+        "clonar_us": medir_clonar(20_000 // fator),
+        "cerebro_dificil_nos_por_s": nos_s,
+        "cerebro_dificil_escolha_ms": escolha_ms,
+        "interpretar_legado_us": legado_us,
+        "interpretar_sem_cache_us": sem_cache_us,
+        "interpretar_us": interpretar_us,
+    }
+
+
+if __name__ == "__main__":
+    for nome, valor in medir().items():
+        print(f"{nome:>24}: {valor:,.1f}")
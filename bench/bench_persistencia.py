@@ -0,0 +1,80 @@
+"""
+Custo de snapshot/restore por jogo e vazão da escrita em lote no SQLite.
+
+    python -m bench.bench_persistencia [--jogos 2000] [--turnos 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from api.persistencia import PersistenciaSQLite
+from core.engine import GameState
+from core.models import Arena, Robo
+from core.snapshot import codificar_estado, decodificar_estado
+
+
+def _jogo(seed: int, turnos: int) -> GameState:
+    game = GameState(
+        Robo("Bench", "vermelho", 3, 2, 1, "agressivo"),
+        Robo("Adversário", "branco", 2, 2, 2, "agressivo"),
+        Arena(16, 5),
+        seed=seed,
+    )
+    game.aplicar_comando("focar no ataque")
+    game.avancar(turnos)
+    return game
+
+
+def medir(jogos: int = 2000, turnos: int = 20) -> dict:
+    lista = [_jogo(i, turnos) for i in range(jogos)]
+
+    t0 = time.perf_counter()
+    snapshots = [codificar_estado(g) for g in lista]
+    t_codificar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for dados in snapshots:
+        decodificar_estado(dados)
+    t_decodificar = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as pasta:
+        persistencia = PersistenciaSQLite(os.path.join(pasta, "bench.db"), intervalo=0.05)
+        t0 = time.perf_counter()
+        for i, g in enumerate(lista):
+            persistencia.agendar(f"jogo-{i}", g)
+        t_agendar = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        persistencia.fechar()
+        t_gravar = time.perf_counter() - t0
+
+        persistencia = PersistenciaSQLite(os.path.join(pasta, "bench.db"))
+        t0 = time.perf_counter()
+        for i in range(jogos):
+            persistencia.carregar(f"jogo-{i}")
+        t_carregar = time.perf_counter() - t0
+        persistencia.fechar()
+
+    return {
+        "jogos": jogos,
+        "bytes_por_snapshot": sum(map(len, snapshots)) / jogos,
+        "codificar_us": t_codificar / jogos * 1e6,
+        "decodificar_us": t_decodificar / jogos * 1e6,
+        "agendar_us": t_agendar / jogos * 1e6,
+        "gravar_lote_us_por_jogo": t_gravar / jogos * 1e6,
+        "carregar_do_disco_us": t_carregar / jogos * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jogos", type=int, default=2000)
+    parser.add_argument("--turnos", type=int, default=20)
+    args = parser.parse_args()
+
+    for nome, valor in medir(args.jogos, args.turnos).items():
+        print(f"{nome:>26}: {valor:,.1f}")
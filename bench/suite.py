@@ -0,0 +1,185 @@
+"""
+Roda todos os benchmarks, salva o resultado em JSON e compara com a
+baseline guardada no repositório.
+
+    python -m bench                          # roda e compara com bench/baseline.json
+    python -m bench --rapido                 # amostras menores (smoke test)
+    python -m bench --atualizar-baseline     # grava o resultado como nova baseline
+    python -m bench --so motor api
+
+Cada grupo roda --repeticoes vezes e fica o melhor valor de cada
+métrica (o menos afetado por ruído da máquina). Sai com código 1 se
+alguma métrica piorar mais que --tolerancia em relação à baseline
+(p95/p99 usam o dobro da tolerância, são ruidosos).
+A baseline depende da máquina: gere a sua na máquina do deploy/CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+from typing import Optional
+
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PADRAO = os.path.join(PASTA, "baseline.json")
+SAIDA_PADRAO = os.path.join(PASTA, "resultados.json")
+
+GRUPOS = ("motor", "api", "persistencia")
+
+
+def _rodar_grupo(grupo: str, rapido: bool) -> dict:
+    if grupo == "motor":
+        from bench import bench_motor
+
+        return bench_motor.medir(rapido)
+    if grupo == "api":
+        from bench import bench_api
+
+        return bench_api.medir(rapido)
+    if grupo == "persistencia":
+        from bench import bench_persistencia
+
+        return bench_persistencia.medir(jogos=200 if rapido else 2000)
+    raise ValueError(f"Grupo de benchmark desconhecido: {grupo}")
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PASTA,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _melhor(metrica: str, valores: list[float]) -> float:
+    direcao = sentido(metrica)
+    if direcao == "maior":
+        return max(valores)
+    if direcao == "menor":
+        return min(valores)
+    return valores[-1]
+
+
+def rodar(grupos=GRUPOS, rapido: bool = False, repeticoes: int = 3) -> dict:
+    resultados = {}
+    try:
+        for grupo in grupos:
+            rodadas = []
+            for r in range(repeticoes):
+                print(f"[bench] {grupo} ({r + 1}/{repeticoes})...", file=sys.stderr, flush=True)
+                rodadas.append(_rodar_grupo(grupo, rapido))
+            resultados[grupo] = {
+                metrica: _melhor(metrica, [rodada[metrica] for rodada in rodadas])
+                for metrica in rodadas[0]
+            }
+    finally:
+        if "bench.bench_api" in sys.modules:
+            sys.modules["bench.bench_api"].encerrar()
+    return {
+        "gerado_em": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "rapido": rapido,
+        "repeticoes": repeticoes,
+        "resultados": resultados,
+    }
+
+
+# -------------------------------
+# Comparação com a baseline
+# -------------------------------
+
+
+def sentido(metrica: str) -> Optional[str]:
+    """"maior" / "menor" = qual lado é melhor; None = só informativa."""
+    partes = metrica.split("_")
+    if metrica.endswith("_por_s"):
+        return "maior"
+    if {"ns", "us", "ms", "bytes"} & set(partes):
+        return "menor"
+    return None
+
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> list[dict]:
+    linhas = []
+    for grupo, metricas in atual["resultados"].items():
+        base_grupo = baseline.get("resultados", {}).get(grupo, {})
+        for metrica, valor in metricas.items():
+            base = base_grupo.get(metrica)
+            direcao = sentido(metrica)
+            linha = {"metrica": f"{grupo}.{metrica}", "atual": valor, "baseline": base, "status": "-"}
+            if base and direcao is not None:
+                variacao = (valor - base) / base
+                piora = -variacao if direcao == "maior" else variacao
+                limite = tolerancia * (2 if metrica.endswith(("_p95_ms", "_p99_ms")) else 1)
+                linha["variacao"] = variacao
+                if piora > limite:
+                    linha["status"] = "REGRESSÃO"
+                elif piora < -limite:
+                    linha["status"] = "melhora"
+                else:
+                    linha["status"] = "ok"
+            linhas.append(linha)
+    return linhas
+
+
+def _formatar(linhas: list[dict]) -> str:
+    saida = [f"{'métrica':46s} {'baseline':>12s} {'atual':>12s} {'var':>8s}  status"]
+    for l in linhas:
+        base = f"{l['baseline']:,.2f}" if l["baseline"] is not None else "-"
+        var = f"{l['variacao'] * 100:+.1f}%" if "variacao" in l else ""
+        saida.append(f"{l['metrica']:46s} {base:>12s} {l['atual']:>12,.2f} {var:>8s}  {l['status']}")
+    return "\n".join(saida)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do motor e da API.")
+    parser.add_argument("--so", nargs="+", choices=GRUPOS, default=list(GRUPOS))
+    parser.add_argument("--rapido", action="store_true", help="amostras menores")
+    parser.add_argument("--repeticoes", type=int, default=3, help="rodadas por grupo (fica a melhor)")
+    parser.add_argument("--saida", default=SAIDA_PADRAO)
+    parser.add_argument("--baseline", default=BASELINE_PADRAO)
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa aceita (0.25 = 25%%)")
+    parser.add_argument("--atualizar-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    atual = rodar(args.so, args.rapido, args.repeticoes)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(atual, f, indent=2)
+        f.write("\n")
+    print(f"[bench] resultado salvo em {args.saida}", file=sys.stderr)
+
+    if args.atualizar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(atual, f, indent=2)
+            f.write("\n")
+        print(f"[bench] baseline atualizada: {args.baseline}", file=sys.stderr)
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        print(f"[bench] sem baseline em {args.baseline}; só mostrando os números", file=sys.stderr)
+
+    linhas = comparar(atual, baseline, args.tolerancia)
+    print(_formatar(linhas))
+    regressoes = [l for l in linhas if l["status"] == "REGRESSÃO"]
+    if regressoes:
+        print(f"\n{len(regressoes)} métrica(s) piores que a baseline além de {args.tolerancia:.0%}.")
+        return 1
+    return 0
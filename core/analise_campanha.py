@@ -0,0 +1,196 @@
+"""
+Analisador Monte Carlo da campanha de 10 partidas.
+
+Para cada robô inicial e cada estratégia de upgrade, joga muitas
+campanhas headless (core/campanha.py) num pool de processos e estima a
+curva de sobrevivência: a chance de o jogador ainda estar vivo depois
+de cada partida.
+
+Cada tarefa usa seu próprio random.Random, semeado a partir de
+(seed, robô, estratégia, número da tarefa), então os fluxos aleatórios
+são independentes entre processos e o resultado é reproduzível.
+
+    python -m core.analise_campanha --campanhas 20000
+    python -m core.analise_campanha --ic 0.01 --processos 8
+
+Com --ic, cada combinação para assim que o intervalo de confiança de 95%
+de todos os pontos da curva tiver largura <= --ic.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Optional
+
+from .campanha import ESTRATEGIAS_UPGRADE, ROBOS_INICIAIS, TOTAL_PARTIDAS, jogar_campanha_headless
+
+
+Z_95 = 1.959963984540054
+
+
+def _rodar_tarefa(seed: int, tarefa: int, inicial: str, estrategia: str, campanhas: int):
+    """Roda `campanhas` campanhas e devolve o histograma de vitórias (0..10)."""
+    rng = random.Random(f"{seed}:{inicial}:{estrategia}:{tarefa}")
+    histograma = [0] * (TOTAL_PARTIDAS + 1)
+    for _ in range(campanhas):
+        histograma[jogar_campanha_headless(inicial, estrategia, rng)] += 1
+    return inicial, estrategia, histograma
+
+
+def curva_sobrevivencia(histograma: list[int]) -> list[float]:
+    """S[k-1] = fração das campanhas que venceram pelo menos k partidas."""
+    total = sum(histograma)
+    curva = []
+    restantes = total
+    for k in range(1, TOTAL_PARTIDAS + 1):
+        restantes -= histograma[k - 1]
+        curva.append(restantes / total if total else 0.0)
+    return curva
+
+
+def largura_wilson(p: float, n: int, z: float = Z_95) -> float:
+    """Largura total do intervalo de Wilson para uma proporção p em n ensaios."""
+    if n == 0:
+        return 1.0
+    denominador = 1 + z * z / n
+    meia = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominador
+    return 2 * meia
+
+
+def largura_maxima(histograma: list[int]) -> float:
+    n = sum(histograma)
+    return max(largura_wilson(p, n) for p in curva_sobrevivencia(histograma))
+
+
+def analisar(
+    iniciais: Optional[list[str]] = None,
+    estrategias: Optional[list[str]] = None,
+    campanhas: int = 10_000,
+    largura_ic: Optional[float] = None,
+    processos: Optional[int] = None,
+    tamanho_tarefa: int = 250,
+    seed: int = 0,
+    progresso=None,
+) -> dict:
+    """
+    Roda a simulação e devolve {(inicial, estrategia): histograma}.
+
+    Sem `largura_ic`, cada combinação roda `campanhas` campanhas. Com
+    `largura_ic`, `campanhas` vira o teto e a combinação para antes se o
+    IC de 95% de todos os pontos da curva estiver estreito o bastante.
+    `progresso(chave, histograma)` é chamado a cada tarefa concluída.
+    """
+    iniciais = iniciais or list(ROBOS_INICIAIS)
+    estrategias = estrategias or list(ESTRATEGIAS_UPGRADE)
+    combos = [(i, e) for i in iniciais for e in estrategias]
+
+    histogramas = {c: [0] * (TOTAL_PARTIDAS + 1) for c in combos}
+    agendadas = {c: 0 for c in combos}  # campanhas já enviadas ao pool
+    tarefas = {c: 0 for c in combos}
+
+    def precisa_mais(c) -> bool:
+        if agendadas[c] >= campanhas:
+            return False
+        if largura_ic is None:
+            return True
+        feitas = sum(histogramas[c])
+        # só decide parar com uma amostra mínima
+        return feitas < tamanho_tarefa or largura_maxima(histogramas[c]) > largura_ic
+
+    processos = processos or os.cpu_count() or 1
+    em_voo = {}
+
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+
+        def agendar():
+            # round-robin entre as combinações que ainda precisam de amostras
+            while len(em_voo) < processos * 2:
+                candidatas = [c for c in combos if precisa_mais(c)]
+                if not candidatas:
+                    return
+                c = min(candidatas, key=lambda c: agendadas[c])
+                n = min(tamanho_tarefa, campanhas - agendadas[c])
+                futuro = pool.submit(_rodar_tarefa, seed, tarefas[c], c[0], c[1], n)
+                em_voo[futuro] = c
+                agendadas[c] += n
+                tarefas[c] += 1
+
+        agendar()
+        while em_voo:
+            prontos, _ = wait(em_voo, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                del em_voo[futuro]
+                inicial, estrategia, parcial = futuro.result()
+                chave = (inicial, estrategia)
+                histogramas[chave] = [a + b for a, b in zip(histogramas[chave], parcial)]
+                if progresso is not None:
+                    progresso(chave, histogramas[chave])
+            agendar()
+
+    return histogramas
+
+
+def _formatar(histogramas: dict) -> str:
+    cabecalho = "robô      estratégia   campanhas  " + " ".join(
+        f"P{k:<4d}" for k in range(1, TOTAL_PARTIDAS + 1)
+    ) + "  ±IC"
+    linhas = [cabecalho, "-" * len(cabecalho)]
+    for (inicial, estrategia), histograma in histogramas.items():
+        curva = curva_sobrevivencia(histograma)
+        linhas.append(
+            f"{inicial:9s} {estrategia:12s} {sum(histograma):9d}  "
+            + " ".join(f"{p * 100:5.1f}" for p in curva)
+            + f"  {largura_maxima(histograma) * 50:.2f}%"
+        )
+    return "\n".join(linhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Curvas de sobrevivência da campanha (Monte Carlo).")
+    parser.add_argument("--campanhas", type=int, default=10_000, help="campanhas por combinação (teto, com --ic)")
+    parser.add_argument("--ic", type=float, default=None, help="largura alvo do IC de 95%% (ex: 0.01)")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--tarefa", type=int, default=250, help="campanhas por tarefa do pool")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--robo", action="append", choices=list(ROBOS_INICIAIS))
+    parser.add_argument("--estrategia", action="append", choices=list(ESTRATEGIAS_UPGRADE))
+    parser.add_argument("--json", help="salva os histogramas neste arquivo")
+    args = parser.parse_args(argv)
+
+    histogramas = analisar(
+        iniciais=args.robo,
+        estrategias=args.estrategia,
+        campanhas=args.campanhas,
+        largura_ic=args.ic,
+        processos=args.processos,
+        tamanho_tarefa=args.tarefa,
+        seed=args.seed,
+    )
+
+    print("P<k> = % de campanhas que venceram pelo menos k partidas")
+    print(_formatar(histogramas))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                [
+                    {
+                        "robo": inicial,
+                        "estrategia": estrategia,
+                        "histograma_vitorias": histograma,
+                        "sobrevivencia": curva_sobrevivencia(histograma),
+                    }
+                    for (inicial, estrategia), histograma in histogramas.items()
+                ],
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Regras da campanha de 10 partidas, sem pygame e sem input().
+
+game_loop.py usa estas funções para a campanha interativa; o analisador
+Monte Carlo (core/analise_campanha.py) usa jogar_campanha_headless.
+Toda função que sorteia recebe o gerador `rng` (padrão: módulo random).
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Callable
+
+from .engine import GameState
+from .models import Arena, Robo
+
+
+TOTAL_PARTIDAS = 10
+
+# Status máximo do adversário por partida (1 a 10)
+STATUS_MAX_POR_PARTIDA = [6, 7, 8, 10, 11, 12, 14, 15, 16, 18]
+
+# Robôs iniciais que o jogador pode escolher (mesmos da API)
+ROBOS_INICIAIS = {
+    "vermelho": ("vermelho", 3, 2, 1, "agressivo"),
+    "verde": ("verde", 2, 3, 1, "defensivo"),
+    "azul": ("azul", 1, 1, 4, "velocista"),
+}
+
+# Teto de turnos por batalha headless (na prática as lutas acabam bem antes)
+MAX_TURNOS_BATALHA = 10_000
+
+
+def criar_robo_inicial(cor: str, nome: str = "Jogador") -> Robo:
+    cor_robo, ataque, defesa, velocidade, personalidade = ROBOS_INICIAIS[cor]
+    return Robo(nome, cor_robo, ataque, defesa, velocidade, personalidade)
+
+
+def obter_status_maximo(partida: int) -> int:
+    """
+    Retorna o status máximo da partida (1 a 10).
+    Usa a tabela acima, baseada no exemplo do documento.
+    """
+    indice = max(1, min(partida, 10)) - 1
+    return STATUS_MAX_POR_PARTIDA[indice]
+
+
+def gerar_stats_aleatorios(status_max: int, rng=random) -> tuple[int, int, int]:
+    """
+    Gera (ataque, defesa, velocidade) com soma = status_max.
+    Garante que cada um é pelo menos 1.
+    """
+    # ataque entre 1 e status_max - 2
+    ataque = rng.randint(1, status_max - 2)
+    restante = status_max - ataque
+
+    defesa = rng.randint(1, restante - 1)
+    velocidade = restante - defesa
+
+    return ataque, defesa, velocidade
+
+
+def definir_cor_e_personalidade(
+    ataque: int, defesa: int, velocidade: int, rng=random
+) -> tuple[str, str]:
+    """
+    Define cor do robô adversário com base no maior status:
+    - maior = ataque -> vermelho
+    - maior = defesa -> verde
+    - maior = velocidade -> azul
+    - todos iguais -> branco
+    - empate entre dois -> escolhe aleatório entre as cores correspondentes
+
+    Também define personalidade:
+    - ataque maior -> agressivo
+    - defesa maior -> defensivo
+    - velocidade maior -> velocista
+    - empatado -> aleatório entre esses perfis
+    """
+    valores = {"ataque": ataque, "defesa": defesa, "velocidade": velocidade}
+    max_valor = max(valores.values())
+
+    maiores = [k for k, v in valores.items() if v == max_valor]
+
+    cores_map = {
+        "ataque": "vermelho",
+        "defesa": "verde",
+        "velocidade": "azul",
+    }
+
+    if len(maiores) == 3:
+        cor = "branco"
+    elif len(maiores) == 1:
+        cor = cores_map[maiores[0]]
+    else:
+        cor = cores_map[rng.choice(maiores)]
+
+    # personalidade
+    if len(maiores) == 1:
+        if maiores[0] == "ataque":
+            personalidade = "agressivo"
+        elif maiores[0] == "defesa":
+            personalidade = "defensivo"
+        else:
+            personalidade = "velocista"
+    else:
+        personalidade = rng.choice(["agressivo", "defensivo", "velocista"])
+
+    return cor, personalidade
+
+
+def gerar_adversario(partida: int, rng=random) -> Robo:
+    status_max = obter_status_maximo(partida)
+    ataque, defesa, velocidade = gerar_stats_aleatorios(status_max, rng)
+    cor, personalidade = definir_cor_e_personalidade(ataque, defesa, velocidade, rng)
+    return Robo(f"Adversário {partida}", cor, ataque, defesa, velocidade, personalidade)
+
+
+def aplicar_ponto(jogador: Robo, atributo: str):
+    """
+    +1 ponto de status após uma vitória.
+    - ataque: aumenta dano
+    - defesa: aumenta redução de dano e HP máximo (+10)
+    - velocidade: aumenta chance de agir primeiro e mobilidade
+    """
+    if atributo == "ataque":
+        jogador.ataque += 1
+    elif atributo == "defesa":
+        jogador.defesa += 1
+        jogador.hp_max += 10
+        jogador.hp_atual = min(jogador.hp_atual + 10, jogador.hp_max)
+    else:
+        jogador.velocidade += 1
+
+
+# -----------------------------------------
+# Estratégias de upgrade (para a simulação)
+# -----------------------------------------
+
+ATRIBUTOS = ("ataque", "defesa", "velocidade")
+
+
+def _menor_atributo(jogador: Robo, partida: int, rng) -> str:
+    valores = [jogador.ataque, jogador.defesa, jogador.velocidade]
+    return ATRIBUTOS[valores.index(min(valores))]
+
+
+ESTRATEGIAS_UPGRADE: dict[str, Callable[[Robo, int, random.Random], str]] = {
+    "ataque": lambda jogador, partida, rng: "ataque",
+    "defesa": lambda jogador, partida, rng: "defesa",
+    "velocidade": lambda jogador, partida, rng: "velocidade",
+    "alternado": lambda jogador, partida, rng: ATRIBUTOS[(partida - 1) % 3],
+    "equilibrado": _menor_atributo,
+    "aleatorio": lambda jogador, partida, rng: rng.choice(ATRIBUTOS),
+}
+
+
+# -----------------------------------------
+# Campanha headless
+# -----------------------------------------
+
+
+def simular_batalha_headless(jogador: Robo, adversario: Robo, arena: Arena, rng) -> bool:
+    """
+    Mesma batalha do game_loop.simular_batalha (robôs na linha do meio),
+    sem comandos do jogador. True se o jogador venceu.
+    """
+    game = GameState(
+        jogador,
+        adversario,
+        arena,
+        max_logs=1,
+        seed=rng.getrandbits(32),
+        posicoes=((2, arena.altura // 2), (arena.largura - 3, arena.altura // 2)),
+    )
+    game.avancar(MAX_TURNOS_BATALHA)
+    return game.status == "player_won"
+
+
+def jogar_campanha_headless(inicial: str, estrategia: str, rng) -> int:
+    """
+    Joga a campanha inteira com o robô inicial `inicial` e a estratégia de
+    upgrade `estrategia`. Devolve quantas partidas o jogador venceu (0 a 10).
+    """
+    arena = Arena(largura=16, altura=5)
+    jogador = criar_robo_inicial(inicial)
+    escolher = ESTRATEGIAS_UPGRADE[estrategia]
+
+    vitorias = 0
+    for partida in range(1, TOTAL_PARTIDAS + 1):
+        # Reseta HP do jogador antes da partida
+        jogador.hp_atual = jogador.hp_max
+        adversario = gerar_adversario(partida, rng)
+
+        if not simular_batalha_headless(jogador, adversario, arena, rng):
+            break
+
+        vitorias += 1
+        if vitorias < TOTAL_PARTIDAS:
+            aplicar_ponto(jogador, escolher(jogador, partida, rng))
+
+    return vitorias
@@ -0,0 +1,366 @@
+"""
+Cérebro de busca para um robô (o adversário da API, com `dificuldade`).
+
+Em vez de sortear a ação pelos pesos (Robo.escolher_acao), o robô olha
+os próximos turnos com expectimax:
+
+- nós de escolha: a vez do robô do cérebro ("eu"), que fica com a melhor
+  das três ações;
+- nós de acaso: a vez do outro robô, que continua sorteando pelos pesos
+  dele (personalidade x preferências), e o dano de cada ataque
+  (ataque + 0..2 - defesa, no mínimo 1).
+
+As vezes sempre se alternam (a ordem do turno é fixa, pela velocidade),
+então a busca conta meias-jogadas: uma ação de um robô. O estado da busca
+é compacto - HP e posição dos dois robôs, de quem é a vez e quantas
+meias-jogadas faltam - e vira um inteiro só, a chave da tabela de
+transposição. A tabela sobrevive entre os turnos enquanto as regras
+(stats, pesos do outro, arena) forem as mesmas; um comando do jogador
+muda os pesos e a limpa.
+
+A busca é por aprofundamento iterativo: profundidade 1, 2, ... até a
+máxima do nível ou até estourar o orçamento de milissegundos do turno;
+vale a escolha da última profundidade completa. Cada profundidade
+reaproveita da tabela o que a anterior já calculou.
+
+O tempo depende da máquina, então o resultado da busca não é
+reproduzível: o GameState guarda as decisões (GameState.decisoes) e o
+diário/snapshot levam junto. Reconstruir a luta usa as decisões gravadas
+(CerebroGravado), sem buscar de novo.
+
+    python -m core.cerebro      # vitórias e custo de cada nível
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, NamedTuple, Optional, Sequence
+
+if TYPE_CHECKING:
+    from .engine import GameState
+
+
+ACOES = ("atacar", "defender", "esquivar")
+LETRAS = {"atacar": "a", "defender": "d", "esquivar": "e"}
+_ACAO_DA_LETRA = {letra: acao for acao, letra in LETRAS.items()}
+
+
+class Nivel(NamedTuple):
+    profundidade: int  # meias-jogadas (ações de um robô) à frente
+    orcamento_ms: float  # tempo de busca por turno
+
+
+NIVEIS: dict[str, Nivel] = {
+    "facil": Nivel(2, 1.0),
+    "medio": Nivel(6, 5.0),
+    "dificil": Nivel(12, 20.0),
+}
+
+# Entradas da tabela de transposição antes de ela ser esvaziada
+MAX_TABELA = 500_000
+
+# O tempo só é conferido a cada tantos nós (perf_counter custa)
+_CONFERIR_TEMPO = 256
+
+# Valor de vitória/derrota; a avaliação no horizonte fica dentro de +-_PESO_AVALIACAO
+_VITORIA = 1.0
+_PESO_AVALIACAO = 0.9
+
+
+class _TempoEsgotado(Exception):
+    pass
+
+
+def codificar_decisoes(decisoes: Sequence[str]) -> str:
+    """Decisões do cérebro numa string curta (uma letra por ação), para o diário/snapshot."""
+    return "".join(LETRAS[acao] for acao in decisoes)
+
+
+def decodificar_decisoes(texto: str) -> list[str]:
+    try:
+        return [_ACAO_DA_LETRA[letra] for letra in texto]
+    except KeyError as e:
+        raise ValueError(f"Decisão do cérebro desconhecida: {e.args[0]!r}") from None
+
+
+def _distribuicao_dano(ataque: int, defesa: int) -> tuple[tuple[int, float], ...]:
+    """(dano, probabilidade) de um ataque, juntando os danos iguais (mínimo 1)."""
+    danos: dict[int, float] = {}
+    for extra in (0, 1, 2):
+        dano = max(1, ataque + extra - defesa)
+        danos[dano] = danos.get(dano, 0.0) + 1 / 3
+    return tuple(danos.items())
+
+
+class CerebroBusca:
+    """
+    Expectimax com tabela de transposição e orçamento de tempo por turno.
+    `escolher(game, indice)` devolve a ação do robô `indice` (0 = jogador,
+    1 = adversário, como nos eventos) no estado atual do jogo.
+
+    Contadores (acumulados desde a criação): `nos` (nós expandidos),
+    `tempo` (segundos de busca) e `profundidade_alcancada` da última
+    escolha.
+    """
+
+    def __init__(self, dificuldade: str):
+        if dificuldade not in NIVEIS:
+            raise ValueError(
+                f"Dificuldade desconhecida: {dificuldade} (use {', '.join(NIVEIS)})."
+            )
+        self.dificuldade = dificuldade
+        self.nivel = NIVEIS[dificuldade]
+        self.tabela: dict[int, float] = {}
+        self._regras = None
+        self._modelo = None
+        self.nos = 0
+        self.tempo = 0.0
+        self.profundidade_alcancada = 0
+
+    # -------------------------------
+    # Modelo da luta (regras fixas enquanto a tabela vale)
+    # -------------------------------
+
+    def _preparar(self, game: "GameState", indice: int):
+        eu, outro = (game.jogador, game.adversario) if indice == 0 else (game.adversario, game.jogador)
+        regras = (
+            id(game.arena),
+            eu.ataque,
+            eu.defesa,
+            outro.ataque,
+            outro.defesa,
+            outro.pesos_acumulados,
+            eu.hp_max,
+            outro.hp_max,
+        )
+        if regras == self._regras:
+            return self._modelo
+        self._regras = regras
+        self.tabela.clear()
+        self._modelo = _Modelo(game, eu, outro, self.tabela)
+        return self._modelo
+
+    # -------------------------------
+    # Escolha
+    # -------------------------------
+
+    def escolher(self, game: "GameState", indice: int) -> str:
+        modelo = self._preparar(game, indice)
+        if len(self.tabela) > MAX_TABELA:
+            self.tabela.clear()
+
+        eu, outro = (game.jogador, game.adversario) if indice == 0 else (game.adversario, game.jogador)
+        estado = (eu.hp_atual, outro.hp_atual, eu.x, eu.y, outro.x, outro.y)
+
+        inicio = time.perf_counter()
+        modelo.limite = inicio + self.nivel.orcamento_ms / 1000
+        modelo.nos = 0
+        melhor = ACOES[0]
+        self.profundidade_alcancada = 0
+        for profundidade in range(1, self.nivel.profundidade + 1):
+            try:
+                valores = modelo.raiz(estado, profundidade)
+            except _TempoEsgotado:
+                if self.profundidade_alcancada:
+                    break
+                # nem a profundidade 1 coube: termina sem olhar o relógio
+                modelo.limite = float("inf")
+                valores = modelo.raiz(estado, profundidade)
+            # empate fica com a primeira de ACOES (atacar)
+            melhor = ACOES[max(range(len(ACOES)), key=lambda i: (valores[i], -i))]
+            self.profundidade_alcancada = profundidade
+        self.nos += modelo.nos
+        self.tempo += time.perf_counter() - inicio
+        return melhor
+
+    @property
+    def nos_por_s(self) -> float:
+        return self.nos / self.tempo if self.tempo else 0.0
+
+
+class _Modelo:
+    """
+    A luta reduzida ao que a busca precisa, do ponto de vista de "eu":
+    estado (hp_eu, hp_outro, x_eu, y_eu, x_outro, y_outro), com a
+    distância e o passo da arena (com mapa, seguem o terreno; o passo fica
+    memoizado).
+    """
+
+    def __init__(self, game: "GameState", eu, outro, tabela: dict):
+        arena = game.arena
+        self.tabela = tabela
+        self.limite = float("inf")
+        self.nos = 0
+
+        self.dano_eu = _distribuicao_dano(eu.ataque, outro.defesa)
+        self.dano_outro = _distribuicao_dano(outro.ataque, eu.defesa)
+        atacar, defender, total = outro.pesos_acumulados
+        self.probs_outro = (atacar / total, (defender - atacar) / total, (total - defender) / total)
+
+        # avaliação no horizonte: quem precisa de menos turnos para derrubar o outro
+        # ("eu" ataca sempre que pode; o outro só com a probabilidade de atacar)
+        self.ritmo_eu = sum(d * p for d, p in self.dano_eu)
+        self.ritmo_outro = sum(d * p for d, p in self.dano_outro) * max(self.probs_outro[0], 1e-9)
+
+        # chave compacta: campos em bits, do tamanho da arena e do HP
+        bits_hp = max(eu.hp_max, outro.hp_max, eu.hp_atual, outro.hp_atual, 1).bit_length()
+        self.bits_x = max(arena.largura - 1, 1).bit_length()
+        self.bits_y = max(arena.altura - 1, 1).bit_length()
+        self.bits_hp = bits_hp
+
+        terreno = arena.mapa.terreno if arena.mapa is not None else None
+        self._passos: dict = {}
+        if terreno is not None:
+            self._distancia = terreno.distancia
+            self._passo = terreno.passo
+        else:
+            largura, altura = arena.largura, arena.altura
+
+            def passo(x, y, alvo_x, alvo_y, aproximar):
+                sentido = 1 if aproximar else -1
+                dx = (alvo_x > x) - (alvo_x < x)
+                dy = (alvo_y > y) - (alvo_y < y)
+                return min(largura - 1, max(0, x + sentido * dx)), min(altura - 1, max(0, y + sentido * dy))
+
+            self._distancia = lambda x1, y1, x2, y2: abs(x1 - x2) + abs(y1 - y2)
+            self._passo = passo
+
+    def passo(self, x, y, alvo_x, alvo_y, aproximar):
+        chave = (x, y, alvo_x, alvo_y, aproximar)
+        destino = self._passos.get(chave)
+        if destino is None:
+            destino = self._passos[chave] = self._passo(x, y, alvo_x, alvo_y, aproximar)
+        return destino
+
+    def avaliar(self, hp_eu: int, hp_outro: int) -> float:
+        turnos_eu = hp_eu / self.ritmo_outro  # até "eu" cair
+        turnos_outro = hp_outro / self.ritmo_eu  # até o outro cair
+        return _PESO_AVALIACAO * (turnos_eu - turnos_outro) / (turnos_eu + turnos_outro)
+
+    # -------------------------------
+    # Busca
+    # -------------------------------
+
+    def raiz(self, estado: tuple, profundidade: int) -> list[float]:
+        """Valor de cada ação de ACOES no estado (vez de "eu"), olhando `profundidade` meias-jogadas."""
+        return [self._acao(0, acao, *estado, profundidade - 1) for acao in ACOES]
+
+    def _acao(self, vez: int, acao: str, hp_eu, hp_outro, xe, ye, xo, yo, resto) -> float:
+        """Valor esperado depois de `acao` do robô da vez (0 = eu, 1 = outro)."""
+        if vez == 0:
+            if acao == "atacar" and self.distancia(xe, ye, xo, yo) <= 1:
+                total = 0.0
+                for dano, p in self.dano_eu:
+                    hp = hp_outro - dano
+                    total += p * (_VITORIA if hp <= 0 else self.valor(hp_eu, hp, xe, ye, xo, yo, 1, resto))
+                return total
+            if acao != "defender":
+                xe, ye = self.passo(xe, ye, xo, yo, acao == "atacar")
+            return self.valor(hp_eu, hp_outro, xe, ye, xo, yo, 1, resto)
+
+        if acao == "atacar" and self.distancia(xo, yo, xe, ye) <= 1:
+            total = 0.0
+            for dano, p in self.dano_outro:
+                hp = hp_eu - dano
+                total += p * (-_VITORIA if hp <= 0 else self.valor(hp, hp_outro, xe, ye, xo, yo, 0, resto))
+            return total
+        if acao != "defender":
+            xo, yo = self.passo(xo, yo, xe, ye, acao == "atacar")
+        return self.valor(hp_eu, hp_outro, xe, ye, xo, yo, 0, resto)
+
+    def distancia(self, x1, y1, x2, y2) -> int:
+        return self._distancia(x1, y1, x2, y2)
+
+    def valor(self, hp_eu, hp_outro, xe, ye, xo, yo, vez, resto) -> float:
+        if resto == 0:
+            return self.avaliar(hp_eu, hp_outro)
+
+        bx, by, bh = self.bits_x, self.bits_y, self.bits_hp
+        chave = ((((((((hp_eu << bh | hp_outro) << bx | xe) << by | ye) << bx | xo) << by | yo) << 1) | vez) << 6) | resto
+        valor = self.tabela.get(chave)
+        if valor is not None:
+            return valor
+
+        self.nos += 1
+        if not self.nos % _CONFERIR_TEMPO and time.perf_counter() > self.limite:
+            raise _TempoEsgotado
+
+        resto -= 1
+        if vez == 0:
+            valor = max(self._acao(0, acao, hp_eu, hp_outro, xe, ye, xo, yo, resto) for acao in ACOES)
+        else:
+            valor = 0.0
+            for acao, p in zip(ACOES, self.probs_outro):
+                if p:
+                    valor += p * self._acao(1, acao, hp_eu, hp_outro, xe, ye, xo, yo, resto)
+        self.tabela[chave] = valor
+        return valor
+
+
+class CerebroGravado:
+    """
+    Repete as decisões gravadas de uma luta (diário/snapshot), na ordem;
+    depois delas, passa a vez para `depois` (o cérebro do nível, se a luta
+    continuar). A posição vem de len(game.decisoes), então o mesmo objeto
+    serve para clones do jogo.
+    """
+
+    def __init__(self, decisoes: Sequence[str], depois: Optional[CerebroBusca] = None):
+        self.decisoes = list(decisoes)
+        self.depois = depois
+
+    @property
+    def dificuldade(self) -> Optional[str]:
+        return self.depois.dificuldade if self.depois is not None else None
+
+    def escolher(self, game: "GameState", indice: int) -> str:
+        feitas = len(game.decisoes)
+        if feitas < len(self.decisoes):
+            return self.decisoes[feitas]
+        if self.depois is None:
+            raise ValueError("Acabaram as decisões gravadas do cérebro.")
+        return self.depois.escolher(game, indice)
+
+
+def criar_cerebro(dificuldade: Optional[str]) -> Optional[CerebroBusca]:
+    """Cérebro de um nível de NIVEIS (None = sem cérebro, o robô sorteia pelos pesos)."""
+    return CerebroBusca(dificuldade) if dificuldade is not None else None
+
+
+# -------------------------------
+# Medição
+# -------------------------------
+
+
+def _medir(lutas: int = 200):
+    """Taxa de vitória do adversário sem cérebro e em cada nível, e o custo da busca."""
+    from .engine import GameState
+    from .models import Arena, Robo
+
+    def robos():
+        return (
+            Robo("Jogador", "vermelho", 3, 2, 1, "agressivo"),
+            Robo("Adversário", "branco", 2, 2, 2, "agressivo"),
+        )
+
+    print(f"vitórias do adversário em {lutas} lutas (jogador {robos()[0].personalidade}):")
+    for dificuldade in (None, *NIVEIS):
+        vitorias = turnos = 0
+        cerebro = criar_cerebro(dificuldade)
+        inicio = time.perf_counter()
+        for seed in range(lutas):
+            game = GameState(*robos(), Arena(16, 5), max_logs=1, seed=seed, dificuldade=dificuldade)
+            game.cerebro = cerebro or game.cerebro
+            game.avancar(1000)
+            vitorias += game.status == "enemy_won"
+            turnos += game.turno - 1
+        duracao = time.perf_counter() - inicio
+        nome = dificuldade or "sem cérebro"
+        extra = ""
+        if cerebro is not None:
+            extra = f", {cerebro.nos_por_s:,.0f} nós/s, {duracao / turnos * 1000:.2f} ms/turno"
+        print(f"{nome:>12}: {vitorias / lutas:6.1%}{extra}")
+
+
+if __name__ == "__main__":
+    _medir()
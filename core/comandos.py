@@ -0,0 +1,286 @@
+"""
+Interpretação dos comandos do jogador ("focar no ataque", "não fuja,
+defenda muito"...) em ajustes de preferência {ataque, defesa, esquiva}.
+
+O vocabulário é uma tabela (SINONIMOS, MODIFICADORES): para aumentar,
+basta acrescentar palavras lá. Tudo vira um autômato de Aho-Corasick
+montado uma vez só, e o texto é lido em uma passada, sem acentos e sem
+diferenciar maiúsculas.
+
+- Radicais (SINONIMOS) casam em qualquer parte da palavra, como antes
+  ("ataq" pega "ataque", "ataca", "contra-ataque").
+- Cada categoria conta uma vez por comando, com peso 2 ("contra" dá +1
+  em ataque e +1 em defesa).
+- Modificadores (palavras inteiras) valem para a próxima palavra com
+  radical na mesma oração, ou para a anterior se não houver próxima:
+  "muito" dobra, "pouco" reduz a 1, "não" inverte o sinal.
+  Orações terminam em pontuação, "e", "mas", "depois"...
+
+Os jogadores repetem muito as mesmas frases: o resultado fica num cache
+LRU por texto.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+
+CATEGORIAS = ("ataque", "defesa", "esquiva")
+
+# radical -> categoria (ou combinação)
+SINONIMOS: dict[str, tuple[str, ...]] = {
+    "ataque": ("ataq", "agress", "bate", "bata", "golpe", "ofens", "invest", "avanc", "soca", "chuta"),
+    "defesa": ("defes", "defend", "proteg", "tank", "bloque", "guarda", "escud", "aguent"),
+    "esquiva": ("esquiv", "desvi", "foge", "fuja", "fugi", "distan", "afast", "recua", "evad"),
+    "contra": ("contra",),
+}
+
+# Quanto cada categoria soma em cada preferência
+EFEITOS: dict[str, dict[str, int]] = {
+    "ataque": {"ataque": 2},
+    "defesa": {"defesa": 2},
+    "esquiva": {"esquiva": 2},
+    "contra": {"ataque": 1, "defesa": 1},
+}
+
+# palavra (ou expressão) inteira -> modificador
+MODIFICADORES: dict[str, str] = {
+    **dict.fromkeys(("muito", "muita", "bastante", "total", "tudo", "maximo", "forte", "sempre"), "mais"),
+    **dict.fromkeys(("pouco", "pouca", "leve", "levemente"), "menos"),
+    **dict.fromkeys(("nao", "nunca", "sem", "evite", "evita", "pare de", "para de", "nada de"), "nao"),
+    **dict.fromkeys(("e", "mas", "depois", "entao", "porem", "enquanto"), "fim_oracao"),
+}
+FATORES = {"mais": 2.0, "menos": 0.5}
+
+_PONTUACAO_ORACAO = ",.;:!?"
+
+
+# -------------------------------
+# Autômato (Aho-Corasick)
+# -------------------------------
+
+
+class _Automato:
+    """
+    Aho-Corasick com as transições já resolvidas (sem seguir links de
+    falha na leitura), compilado numa tabela plana sobre bytes: o estado
+    já vem multiplicado por 256, então cada byte do texto é um índice de
+    lista, sem criar objetos. Os estados com saída ficam numerados por
+    último (>= self.primeiro_final), então conferir se houve casamento é
+    uma comparação.
+
+    Os padrões são ASCII; o texto vai como UTF-8, e os bytes de caracteres
+    não ASCII só levam de volta ao estado inicial, como qualquer caractere
+    que não está nos padrões.
+    """
+
+    def __init__(self, padroes: dict[str, tuple]):
+        transicoes: list[dict[str, int]] = [{}]
+        saidas: list[list] = [[]]
+        for padrao, valor in padroes.items():
+            if not padrao.isascii():
+                raise ValueError(f"Padrão não ASCII: {padrao!r}")
+            estado = 0
+            for ch in padrao:
+                proximo = transicoes[estado].get(ch)
+                if proximo is None:
+                    proximo = len(transicoes)
+                    transicoes[estado][ch] = proximo
+                    transicoes.append({})
+                    saidas.append([])
+                estado = proximo
+            saidas[estado].append((len(padrao), valor))
+
+        # links de falha, em largura; cada estado herda as transições e as
+        # saídas do estado de falha (já completo, por ser mais raso)
+        falha = [0] * len(transicoes)
+        fila = deque(transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            filhos = list(transicoes[estado].items())
+            if estado:
+                for ch, destino in transicoes[falha[estado]].items():
+                    transicoes[estado].setdefault(ch, destino)
+                saidas[estado] = saidas[estado] + saidas[falha[estado]]
+            for ch, proximo in filhos:
+                falha[proximo] = transicoes[falha[estado]].get(ch, 0) if estado else 0
+                fila.append(proximo)
+
+        # renumera: sem saída primeiro (o inicial continua 0), com saída no fim
+        ordem = sorted(range(len(transicoes)), key=lambda e: (bool(saidas[e]), e))
+        numero = {antigo: novo for novo, antigo in enumerate(ordem)}
+        self.primeiro_final = 256 * sum(1 for e in ordem if not saidas[e])
+        self.tabela = [0] * (256 * len(transicoes))
+        self.saidas: dict[int, tuple] = {}
+        for antigo, novo in numero.items():
+            for ch, destino in transicoes[antigo].items():
+                self.tabela[256 * novo + ord(ch)] = 256 * numero[destino]
+            if saidas[antigo]:
+                self.saidas[256 * novo] = tuple(saidas[antigo])
+
+    def ocorrencias(self, dados: bytes) -> list[tuple[int, int, tuple]]:
+        """(posição final, tamanho, valor) de cada padrão, na ordem do texto."""
+        tabela = self.tabela
+        primeiro_final = self.primeiro_final
+        achados = []
+        estado = 0
+        for i, byte in enumerate(dados):
+            estado = tabela[estado + byte]
+            if estado >= primeiro_final:
+                for tamanho, valor in self.saidas[estado]:
+                    achados.append((i, tamanho, valor))
+        return achados
+
+
+def _sem_acentos(texto: str) -> str:
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(ch for ch in decomposto if not unicodedata.combining(ch))
+
+
+class _TabelaNormalizacao(dict):
+    """
+    Tabela do str.translate de _normalizar: letra/dígito/hífen fica,
+    pontuação de oração vira "|", acento solto (depois do NFKD) some, o
+    resto vira espaço. O ASCII já vem pronto; outros caracteres são
+    calculados na primeira vez que aparecem (e guardados, até um limite).
+
+    No ASCII tudo é um caractere para um (o "|" da entrada vira espaço),
+    que é o caminho rápido do translate.
+    """
+
+    LIMITE = 4096
+
+    def __init__(self):
+        super().__init__()
+        for codigo in range(128):
+            self[codigo] = self._traduzir(chr(codigo))
+
+    @staticmethod
+    def _traduzir(ch: str) -> str:
+        if unicodedata.combining(ch):
+            return ""
+        if ch.isalnum() or ch == "-":
+            return ch
+        if ch in _PONTUACAO_ORACAO:
+            return "|"
+        return " "
+
+    def __missing__(self, codigo: int) -> str:
+        traducao = self._traduzir(chr(codigo))
+        if len(self) < self.LIMITE:
+            self[codigo] = traducao
+        return traducao
+
+
+_TABELA_NORMALIZACAO = _TabelaNormalizacao()
+
+
+def _normalizar(texto: str) -> str:
+    """Minúsculas sem acento; pontuação de oração vira "|"; espaços simples nas pontas."""
+    texto = texto.casefold()
+    if not texto.isascii():
+        # só aqui precisa do unicodedata: "ç" vira "c" + cedilha solta,
+        # que a tabela apaga
+        texto = unicodedata.normalize("NFKD", texto)
+    texto = texto.translate(_TABELA_NORMALIZACAO).replace("|", " | ")
+    return " " + " ".join(texto.split()) + " "
+
+
+def _padroes() -> dict[str, tuple]:
+    padroes: dict[str, tuple] = {}
+    for categoria, radicais in SINONIMOS.items():
+        for radical in radicais:
+            padroes[_sem_acentos(radical)] = ("radical", categoria)
+    for palavra, tipo in MODIFICADORES.items():
+        # com espaços em volta = só a palavra inteira
+        padroes[f" {_sem_acentos(palavra)} "] = ("modificador", tipo)
+    padroes[" | "] = ("modificador", "fim_oracao")
+    return padroes
+
+
+_AUTOMATO = _Automato(_padroes())
+
+
+# -------------------------------
+# Interpretação
+# -------------------------------
+
+
+def _palavras(dados: bytes) -> list[list]:
+    """
+    Palavras com radical do texto (normalizado, em UTF-8), em ordem, cada
+    uma como [categorias, fator, negada], já com os modificadores da
+    oração aplicados: cada um vale para a próxima palavra com radical da
+    oração, ou para a anterior se não houver próxima.
+    """
+    palavras: list[list] = []
+    inicio_oracao = 0  # índice em `palavras` da primeira palavra da oração
+    pendentes: list[str] = []  # modificadores esperando a próxima palavra
+    ultimo_fim_palavra = -1  # fim da palavra do último item, se ele foi um radical
+
+    for fim, tamanho, (tipo, valor) in _AUTOMATO.ocorrencias(dados):
+        if tipo == "modificador":
+            ultimo_fim_palavra = -1
+            if valor != "fim_oracao":
+                pendentes.append(valor)
+                continue
+            # sem próxima palavra: os pendentes ficam com a anterior (se houver)
+            if len(palavras) > inicio_oracao:
+                for modificador in pendentes:
+                    _modificar(palavras[-1], modificador)
+            pendentes.clear()
+            inicio_oracao = len(palavras)
+            continue
+        # radicais da mesma palavra (ex.: "contra-ataque") andam juntos
+        fim_palavra = dados.find(b" ", fim - tamanho + 1)
+        if fim_palavra == ultimo_fim_palavra:
+            palavras[-1][0].add(valor)
+            continue
+        palavra = [{valor}, 1.0, False]
+        for modificador in pendentes:
+            _modificar(palavra, modificador)
+        pendentes.clear()
+        palavras.append(palavra)
+        ultimo_fim_palavra = fim_palavra
+
+    if len(palavras) > inicio_oracao:
+        for modificador in pendentes:
+            _modificar(palavras[-1], modificador)
+    return palavras
+
+
+def _modificar(palavra: list, modificador: str):
+    if modificador == "nao":
+        palavra[2] = not palavra[2]
+    else:
+        palavra[1] *= FATORES[modificador]
+
+
+# EFEITOS como (índice em CATEGORIAS, peso), para somar direto na tupla do resultado
+_EFEITOS_INDICE = {
+    categoria: tuple((CATEGORIAS.index(preferencia), peso) for preferencia, peso in efeitos.items())
+    for categoria, efeitos in EFEITOS.items()
+}
+
+
+@lru_cache(maxsize=2048)
+def _interpretar(texto: str) -> tuple[int, int, int]:
+    total = [0, 0, 0]
+    vistas: set[str] = set()
+
+    for categorias, fator, negada in _palavras(_normalizar(texto).encode("utf-8")):
+        sinal = -1 if negada else 1
+        for categoria in categorias - vistas:
+            for indice, peso in _EFEITOS_INDICE[categoria]:
+                total[indice] += sinal * max(1, int(peso * fator))
+        vistas |= categorias
+
+    return tuple(total)
+
+
+def interpretar(texto: str) -> dict:
+    """Ajustes de preferência do comando, ex.: "focar no ataque" -> {"ataque": 2, ...}."""
+    ataque, defesa, esquiva = _interpretar(texto)
+    return {"ataque": ataque, "defesa": defesa, "esquiva": esquiva}
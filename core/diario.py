@@ -0,0 +1,281 @@
+"""
+Diário de batalha: a descrição mínima e determinística de uma luta.
+
+Como toda a aleatoriedade do GameState vem de um Random semeado, basta
+guardar:
+- os dois robôs como estavam no início (core.models.Robo.para_tupla)
+- o tamanho da arena (e o mapa, se tiver obstáculos)
+- a seed
+- os comandos, cada um com o turno em que chegou
+- com cérebro no adversário (core/cerebro.py): a dificuldade e as ações
+  que ele escolheu, que dependem do relógio e não se refazem
+
+Com isso dá para reconstruir o estado em qualquer turno e reproduzir
+exatamente um bug reportado. Codificado, um diário ocupa poucas centenas
+de bytes, então serve também para arquivar lutas terminadas sem os logs.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Iterator, Optional
+
+from .cerebro import NIVEIS, CerebroGravado, codificar_decisoes, decodificar_decisoes
+from .engine import GameState
+from .mapas import MapaInvalido, carregar_mapa
+from .models import Arena, Robo
+
+
+class DiarioInvalido(ValueError):
+    """Bytes que não são um diário (ou de uma versão desconhecida, ou com valores impossíveis)."""
+
+
+# Limites de um diário: ele pode vir de fora (POST /replay), então o que
+# decide o custo de reconstruir a luta tem teto
+MAX_LADO_ARENA = 64
+MAX_BYTES = 1 << 20  # JSON descomprimido (um diário normal tem poucos KB)
+CAMPOS_ROBO = 13  # Robo.para_tupla
+
+
+class Diario:
+    VERSAO = 1
+
+    def __init__(
+        self,
+        seed: int,
+        largura: int,
+        altura: int,
+        jogador: tuple,
+        adversario: tuple,
+        comandos: list[tuple[int, str]],
+        turno_final: int,
+        mapa: Optional[str] = None,
+        dificuldade: Optional[str] = None,
+        decisoes: Optional[list[str]] = None,
+    ):
+        self.seed = _inteiro(seed, "seed")
+        self.largura = _inteiro(largura, "largura", 1, MAX_LADO_ARENA)
+        self.altura = _inteiro(altura, "altura", 1, MAX_LADO_ARENA)
+        self.jogador = _robo(jogador, "jogador")
+        self.adversario = _robo(adversario, "adversario")
+        self.comandos = _comandos(comandos)
+        self.turno_final = _inteiro(turno_final, "turno_final", 1)
+        if mapa is not None:
+            _conferir_mapa(mapa, self.largura, self.altura)
+        self.mapa = mapa
+        if dificuldade is not None and (not isinstance(dificuldade, str) or dificuldade not in NIVEIS):
+            raise DiarioInvalido(f"Dificuldade desconhecida: {dificuldade}")
+        self.dificuldade = dificuldade
+        self.decisoes = _decisoes(decisoes, dificuldade, self.turno_final)
+
+    @classmethod
+    def de_jogo(cls, game: GameState) -> "Diario":
+        jogador, adversario = game.robos_iniciais
+        return cls(
+            seed=game.seed,
+            largura=game.arena.largura,
+            altura=game.arena.altura,
+            jogador=jogador,
+            adversario=adversario,
+            comandos=list(game.comandos),
+            turno_final=game.turno,
+            mapa=game.arena.mapa.texto if game.arena.mapa is not None else None,
+            dificuldade=game.dificuldade,
+            decisoes=game.decisoes,
+        )
+
+    # -------------------------------
+    # Codificação compacta
+    # -------------------------------
+
+    def codificar(self) -> bytes:
+        dados = [
+            self.VERSAO,
+            self.seed,
+            self.largura,
+            self.altura,
+            self.jogador,
+            self.adversario,
+            self.comandos,
+            self.turno_final,
+            self.mapa,
+            self.dificuldade,
+            codificar_decisoes(self.decisoes),
+        ]
+        texto = json.dumps(dados, ensure_ascii=False, separators=(",", ":"))
+        return zlib.compress(texto.encode("utf-8"), 9)
+
+    @classmethod
+    def decodificar(cls, dados: bytes) -> "Diario":
+        try:
+            descompressor = zlib.decompressobj()
+            texto = descompressor.decompress(dados, MAX_BYTES)
+            if descompressor.unconsumed_tail:
+                raise DiarioInvalido(f"Diário grande demais (mais de {MAX_BYTES} bytes descomprimido).")
+            lista = json.loads(texto.decode("utf-8"))
+            versao = lista[0]
+            if versao != cls.VERSAO:
+                raise DiarioInvalido(f"Versão de diário desconhecida: {versao}")
+            (
+                _,
+                seed,
+                largura,
+                altura,
+                jogador,
+                adversario,
+                comandos,
+                turno_final,
+                mapa,
+                dificuldade,
+                decisoes,
+            ) = lista
+            decisoes = decodificar_decisoes(decisoes)
+        except DiarioInvalido:
+            raise
+        except (zlib.error, UnicodeDecodeError, ValueError, TypeError, IndexError, KeyError) as e:
+            raise DiarioInvalido(f"Diário corrompido: {e}") from e
+
+        return cls(
+            seed, largura, altura, jogador, adversario, comandos, turno_final, mapa, dificuldade, decisoes
+        )
+
+    # -------------------------------
+    # Reprodução
+    # -------------------------------
+
+    def reconstruir(self, ate_turno: Optional[int] = None, max_logs: int = 500) -> GameState:
+        """
+        Refaz a luta a partir do início e devolve o GameState no turno
+        `ate_turno` (padrão: o turno em que o diário foi gerado), isto é,
+        logo antes de executar esse turno e já com os comandos que
+        chegaram antes dele.
+        """
+        for game in self.passos(ate_turno, max_logs):
+            pass
+        return game
+
+    def jogo_inicial(self, max_logs: int = 500) -> GameState:
+        """O GameState no turno 1, antes de qualquer comando (de onde passos() parte)."""
+        jogador = Robo.de_tupla(self.jogador)
+        adversario = Robo.de_tupla(self.adversario)
+        game = GameState(
+            jogador,
+            adversario,
+            Arena(self.largura, self.altura, carregar_mapa(self.mapa) if self.mapa else None),
+            max_logs=max_logs,
+            seed=self.seed,
+            posicoes=(jogador.posicao(), adversario.posicao()),
+            dificuldade=self.dificuldade,
+        )
+        if self.decisoes or game.cerebro is not None:
+            # as escolhas gravadas primeiro; depois delas, o cérebro do nível
+            game.cerebro = CerebroGravado(self.decisoes, game.cerebro)
+        return game
+
+    def passos(self, ate_turno: Optional[int] = None, max_logs: int = 500) -> Iterator[GameState]:
+        """
+        Como reconstruir(), mas entrega o GameState em cada turno do
+        caminho (1, 2, ..., ate_turno), já com os comandos daquele turno.
+        É sempre o mesmo objeto, alterado no lugar (ver core/replay.py).
+        """
+        alvo = self.turno_final if ate_turno is None else max(1, ate_turno)
+        game = self.jogo_inicial(max_logs)
+
+        pendentes = iter(self.comandos)
+        proximo = next(pendentes, None)
+        while True:
+            while proximo is not None and proximo[0] <= game.turno:
+                game.aplicar_comando(proximo[1])
+                proximo = next(pendentes, None)
+
+            yield game
+            if game.turno >= alvo or game.status != "running":
+                return
+            game.executar_turno()
+
+
+# -------------------------------
+# Validação (Diario.__init__)
+# -------------------------------
+
+
+def _inteiro(valor, campo: str, minimo: Optional[int] = None, maximo: Optional[int] = None) -> int:
+    # bool é int em Python, mas num diário é sempre erro
+    if type(valor) is not int:
+        raise DiarioInvalido(f"{campo} deve ser um inteiro, veio {valor!r}.")
+    if minimo is not None and valor < minimo:
+        raise DiarioInvalido(f"{campo} deve ser pelo menos {minimo}, veio {valor}.")
+    if maximo is not None and valor > maximo:
+        raise DiarioInvalido(f"{campo} deve ser no máximo {maximo}, veio {valor}.")
+    return valor
+
+
+def _texto(valor, campo: str) -> str:
+    if not isinstance(valor, str):
+        raise DiarioInvalido(f"{campo} deve ser um texto, veio {valor!r}.")
+    return valor
+
+
+def _robo(dados, campo: str) -> tuple:
+    """Tupla de Robo.para_tupla com tipos e valores que Robo.de_tupla aceita."""
+    if not isinstance(dados, (list, tuple)) or len(dados) != CAMPOS_ROBO:
+        raise DiarioInvalido(f"{campo}: o robô deve ter {CAMPOS_ROBO} campos.")
+    nome, cor, ataque, defesa, velocidade, personalidade, hp_max, hp_atual, *prefs, x, y = dados
+    for valor, nome_campo in ((nome, "nome"), (cor, "cor"), (personalidade, "personalidade")):
+        _texto(valor, f"{campo}.{nome_campo}")
+    for valor, nome_campo in ((ataque, "ataque"), (defesa, "defesa"), (velocidade, "velocidade")):
+        _inteiro(valor, f"{campo}.{nome_campo}", 0)
+    _inteiro(hp_max, f"{campo}.hp_max", 1)
+    _inteiro(hp_atual, f"{campo}.hp_atual", 0, hp_max)
+    # como em Robo.aplicar_preferencias: nunca abaixo de 1
+    for valor, nome_campo in zip(prefs, ("pref_ataque", "pref_defesa", "pref_esquiva")):
+        _inteiro(valor, f"{campo}.{nome_campo}", 1)
+    _inteiro(x, f"{campo}.x")
+    _inteiro(y, f"{campo}.y")
+    return tuple(dados)
+
+
+def _comandos(comandos) -> list[tuple[int, str]]:
+    if not isinstance(comandos, (list, tuple)):
+        raise DiarioInvalido("comandos deve ser uma lista de pares [turno, texto].")
+    resultado = []
+    for comando in comandos:
+        if not isinstance(comando, (list, tuple)) or len(comando) != 2:
+            raise DiarioInvalido(f"Comando mal formado: {comando!r} (use [turno, texto]).")
+        resultado.append((_inteiro(comando[0], "turno do comando", 1), _texto(comando[1], "comando")))
+    return resultado
+
+
+def _decisoes(decisoes, dificuldade: Optional[str], turno_final: int) -> list[str]:
+    """
+    Decisões do cérebro: só com dificuldade, e uma por turno jogado (o
+    último pode ter acabado antes de o adversário agir). Faltando, refazer
+    a luta buscaria de novo a cada turno, com o orçamento do nível.
+    """
+    decisoes = list(decisoes or ())
+    if dificuldade is None:
+        if decisoes:
+            raise DiarioInvalido("Decisões do cérebro num diário sem dificuldade.")
+        return decisoes
+    minimo = max(0, turno_final - 2)
+    if len(decisoes) < minimo:
+        raise DiarioInvalido(
+            f"O diário vai até o turno {turno_final}, mas tem {len(decisoes)} decisões do cérebro "
+            f"(pelo menos {minimo})."
+        )
+    return decisoes
+
+
+def _conferir_mapa(mapa, largura: int, altura: int):
+    _texto(mapa, "mapa")
+    if len(mapa) > MAX_LADO_ARENA * (MAX_LADO_ARENA + 2):
+        raise DiarioInvalido("Mapa grande demais.")
+    try:
+        carregado = carregar_mapa(mapa)
+    except MapaInvalido as e:
+        raise DiarioInvalido(f"Mapa inválido: {e}") from None
+    if (carregado.largura, carregado.altura) != (largura, altura):
+        raise DiarioInvalido(
+            f"O mapa é {carregado.largura}x{carregado.altura}, mas o diário diz {largura}x{altura}."
+        )
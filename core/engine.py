@@ -1,39 +1,24 @@
 from __future__ import annotations
 
 import random
-from typing import List, Literal, Optional
+from typing import Literal, Optional
 
+from . import eventos as ev
+from .cerebro import criar_cerebro
+from .comandos import interpretar
+from .logs import RegistroLogs
 from .models import Robo, Arena
 
 
 StatusJogo = Literal["running", "player_won", "enemy_won"]
+CondicaoParada = Literal["fim", "hp"]
+FormatoLogs = Literal["texto", "eventos"]
 
+# Índices dos robôs nos eventos (ver core/eventos.py)
+JOGADOR, ADVERSARIO = 0, 1
 
-def interpretar_comando(texto: str) -> dict:
-    """
-    Mesma lógica de antes, mas agora pensada para uso pela API.
-    Converte o texto em ajustes de preferência.
-    """
-    texto = texto.lower()
-    preferencias = {"ataque": 0, "defesa": 0, "esquiva": 0}
-
-    if not texto.strip():
-        return preferencias
-
-    if "ataq" in texto or "agress" in texto or "bate" in texto:
-        preferencias["ataque"] += 2
-
-    if "defes" in texto or "proteg" in texto or "tank" in texto:
-        preferencias["defesa"] += 2
-
-    if "esquiv" in texto or "desvi" in texto or "foge" in texto or "distân" in texto:
-        preferencias["esquiva"] += 2
-
-    if "contra" in texto:
-        preferencias["defesa"] += 1
-        preferencias["ataque"] += 1
-
-    return preferencias
+# Nome de antes de o interpretador ir para core/comandos.py
+interpretar_comando = interpretar
 
 
 class GameState:
@@ -44,37 +29,76 @@ class GameState:
     - robo adversário
     - turno atual
     - status (running / player_won / enemy_won)
-    - logs das ações (pra mostrar no front)
+    - logs das ações (pra mostrar no front), num buffer circular
+      de até `max_logs` entradas: eventos estruturados (core/eventos.py),
+      que só viram texto quando alguém lê (renderizar_logs)
+    - versao: sobe a cada mudança (comando ou turno); a API usa como ETag
+    - dificuldade: com um nível de core/cerebro.py, o adversário escolhe as
+      ações por busca (self.cerebro) em vez de sortear pelos pesos; as
+      escolhas ficam em self.decisoes
+
+    Toda a aleatoriedade vem de `self.rng`, semeado com `seed`. A luta
+    inteira fica descrita por (robôs iniciais, seed, comandos com o turno
+    em que chegaram, decisões do cérebro) - ver core/diario.py.
     """
 
-    def __init__(self, jogador: Robo, adversario: Robo, arena: Arena):
+    def __init__(
+        self,
+        jogador: Robo,
+        adversario: Robo,
+        arena: Arena,
+        max_logs: int = 500,
+        seed: Optional[int] = None,
+        posicoes: Optional[tuple[tuple[int, int], tuple[int, int]]] = None,
+        dificuldade: Optional[str] = None,
+    ):
         self.arena = arena
         self.jogador = jogador
         self.adversario = adversario
         self.turno = 1
         self.status: StatusJogo = "running"
-        self.logs: List[str] = []
+        self.logs = RegistroLogs(max_logs)
+        self.versao = 0
 
-        # posição inicial
-        self.jogador.set_posicao(2, 1, arena)
-        self.adversario.set_posicao(arena.largura - 3, arena.altura - 2, arena)
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
 
-        self.logs.append(
-            f"Iniciando batalha: {self.jogador.nome} vs {self.adversario.nome}."
-        )
+        # Diário: (turno em que o comando chegou, texto)
+        self.comandos: list[tuple[int, str]] = []
+
+        # Cérebro do adversário (None = sorteia pelos pesos) e as ações que
+        # ele escolheu, em ordem: a busca depende do relógio, então o
+        # diário guarda as escolhas em vez de refazê-las
+        self.dificuldade = dificuldade
+        self.cerebro = criar_cerebro(dificuldade)
+        self.decisoes: list[str] = []
+
+        # posição inicial (padrão da API; a campanha usa a linha do meio)
+        if posicoes is None:
+            posicoes = arena.posicoes_iniciais()
+        self.jogador.set_posicao(*posicoes[0], arena)
+        self.adversario.set_posicao(*posicoes[1], arena)
+        self.robos_iniciais = (self.jogador.para_tupla(), self.adversario.para_tupla())
+
+        self.logs.append((ev.INICIO, JOGADOR, ADVERSARIO))
 
     # -------------------------------
     # Comandos do jogador
     # -------------------------------
 
     def aplicar_comando(self, texto: str):
-        prefs = interpretar_comando(texto)
+        self.comandos.append((self.turno, texto))
+        self.versao += 1
+        prefs = interpretar(texto)
         self.jogador.aplicar_preferencias(prefs)
         self.logs.append(
-            f"Comando recebido: '{texto}'. "
-            f"Prefs -> ATAQUE x{self.jogador.pref_ataque}, "
-            f"DEFESA x{self.jogador.pref_defesa}, "
-            f"ESQUIVA x{self.jogador.pref_esquiva}."
+            (
+                ev.COMANDO,
+                texto,
+                self.jogador.pref_ataque,
+                self.jogador.pref_defesa,
+                self.jogador.pref_esquiva,
+            )
         )
 
     # -------------------------------
@@ -83,10 +107,17 @@ class GameState:
 
     def executar_turno(self):
         if self.status != "running":
-            self.logs.append("O jogo já terminou. Nenhum turno executado.")
+            # nada roda: o aviso entra uma vez só, e repetir o pedido (a
+            # retentativa de um /turno) não muda o jogo nem a versão
+            logs = self.logs
+            if not len(logs) or logs[-1][0] != ev.JA_TERMINOU:
+                self.versao += 1
+                logs.append((ev.JA_TERMINOU,))
             return
 
-        self.logs.append(f"--- TURNO {self.turno} ---")
+        self.versao += 1
+
+        self.logs.append((ev.TURNO, self.turno))
 
         ordem = sorted(
             [self.jogador, self.adversario],
@@ -98,62 +129,165 @@ class GameState:
             if not self.jogador.esta_vivo() or not self.adversario.esta_vivo():
                 break
 
-            alvo = self.adversario if robo is self.jogador else self.jogador
+            if robo is self.jogador:
+                alvo, i_robo, i_alvo = self.adversario, JOGADOR, ADVERSARIO
+            else:
+                alvo, i_robo, i_alvo = self.jogador, ADVERSARIO, JOGADOR
             dist_atual = self.arena.distancia(robo, alvo)
-            acao = robo.escolher_acao()
+            if i_robo == ADVERSARIO and self.cerebro is not None:
+                acao = self.cerebro.escolher(self, ADVERSARIO)
+                self.decisoes.append(acao)
+            else:
+                acao = robo.escolher_acao(self.rng)
 
             if acao == "atacar":
                 if dist_atual <= 1:
-                    dano = robo.atacar(alvo)
-                    self.logs.append(
-                        f"{robo.nome} ATACA {alvo.nome} e causa {dano} de dano."
-                    )
+                    dano = robo.atacar(alvo, self.rng)
+                    self.logs.append((ev.ATAQUE, i_robo, i_alvo, dano))
                 else:
+                    x, y = robo.x, robo.y
                     robo.mover_em_direcao(alvo, self.arena, aproximar=True)
                     nova_dist = self.arena.distancia(robo, alvo)
                     self.logs.append(
-                        f"{robo.nome} se aproxima de {alvo.nome} "
-                        f"para posição {robo.posicao()} (distância {nova_dist})."
+                        (ev.APROXIMA, i_robo, i_alvo, x, y, robo.x, robo.y, nova_dist)
                     )
 
             elif acao == "defender":
-                self.logs.append(
-                    f"{robo.nome} assume postura defensiva (ação ainda estética)."
-                )
+                self.logs.append((ev.DEFESA, i_robo))
 
             elif acao == "esquivar":
+                x, y = robo.x, robo.y
                 robo.mover_em_direcao(alvo, self.arena, aproximar=False)
                 nova_dist = self.arena.distancia(robo, alvo)
                 self.logs.append(
-                    f"{robo.nome} tenta esquivar e recua para {robo.posicao()} "
-                    f"(distância {nova_dist})."
+                    (ev.ESQUIVA, i_robo, i_alvo, x, y, robo.x, robo.y, nova_dist)
                 )
 
         # Checa fim de jogo
         if not self.jogador.esta_vivo() and not self.adversario.esta_vivo():
             # Empate teórico, mas vamos considerar derrota por enquanto
             self.status = "enemy_won"
-            self.logs.append("Ambos os robôs caíram. Você perdeu (empate técnico).")
+            self.logs.append((ev.VITORIA, None))
         elif not self.jogador.esta_vivo():
             self.status = "enemy_won"
-            self.logs.append(f"{self.adversario.nome} venceu a batalha.")
+            self.logs.append((ev.VITORIA, ADVERSARIO))
         elif not self.adversario.esta_vivo():
             self.status = "player_won"
-            self.logs.append(f"{self.jogador.nome} venceu a batalha.")
+            self.logs.append((ev.VITORIA, JOGADOR))
 
         self.turno += 1
 
+    # -------------------------------
+    # Vários turnos de uma vez
+    # -------------------------------
+
+    def avancar(self, max_turnos: int, ate: CondicaoParada = "fim") -> list[dict]:
+        """
+        Executa até `max_turnos` turnos seguidos, parando antes se o jogo
+        terminar. Com ate="hp", para também no primeiro turno em que o HP
+        de algum robô mudar.
+
+        Devolve um resumo compacto de cada turno executado.
+        """
+        eventos = []
+        for _ in range(max_turnos):
+            if self.status != "running":
+                break
+
+            hp_antes = (self.jogador.hp_atual, self.adversario.hp_atual)
+            turno = self.turno
+            self.executar_turno()
+            hp_depois = (self.jogador.hp_atual, self.adversario.hp_atual)
+
+            eventos.append(
+                {
+                    "turno": turno,
+                    "hp_jogador": hp_depois[0],
+                    "hp_adversario": hp_depois[1],
+                    "pos_jogador": self.jogador.posicao(),
+                    "pos_adversario": self.adversario.posicao(),
+                }
+            )
+
+            if ate == "hp" and hp_depois != hp_antes:
+                break
+
+        return eventos
+
+    # -------------------------------
+    # Cópias baratas (simular adiante)
+    # -------------------------------
+
+    def clonar(self, max_logs: int = 1) -> "GameState":
+        """
+        Cópia independente para simular adiante sem mexer neste jogo:
+        robôs (Robo.clonar) e gerador aleatório copiados, arena e cérebro
+        compartilhados, logs novos de `max_logs` entradas (os antigos não
+        são copiados, só a numeração continua).
+        """
+        clone = GameState.__new__(GameState)
+        clone.arena = self.arena
+        clone.jogador = self.jogador.clonar()
+        clone.adversario = self.adversario.clonar()
+        clone.turno = self.turno
+        clone.status = self.status
+        clone.logs = RegistroLogs(max_logs)
+        clone.logs.proximo_seq = self.logs.proximo_seq
+        clone.versao = self.versao
+        clone.seed = self.seed
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+        clone.comandos = list(self.comandos)
+        clone.dificuldade = self.dificuldade
+        clone.cerebro = self.cerebro
+        clone.decisoes = list(self.decisoes)
+        clone.robos_iniciais = self.robos_iniciais
+        return clone
+
+    def estado_compacto(self) -> tuple:
+        """(hp_jogador, hp_adversario, x_jogador, y_jogador, x_adversario, y_adversario)."""
+        j, a = self.jogador, self.adversario
+        return (j.hp_atual, a.hp_atual, j.x, j.y, a.x, a.y)
+
     # -------------------------------
     # Helpers para serializar em JSON
     # -------------------------------
 
-    def to_dict(self) -> dict:
+    def nomes(self) -> tuple[str, str]:
+        """Nomes na ordem dos índices dos eventos (JOGADOR, ADVERSARIO)."""
+        return (self.jogador.nome, self.adversario.nome)
+
+    def renderizar_logs(self, eventos) -> list[str]:
+        """Para RegistroLogs.desde/pagina(renderizar=...)."""
+        return ev.renderizar_todos(eventos, self.nomes())
+
+    def to_dict(self, since: Optional[int] = None, formato: FormatoLogs = "texto") -> dict:
+        """
+        `since` é o cursor de logs que o cliente já tem (o `log_cursor` da
+        resposta anterior): só as entradas a partir dele vêm em "logs".
+        Com formato="eventos", os logs vêm como as tuplas de core/eventos.py.
+        """
+        renderizar = self.renderizar_logs if formato == "texto" else None
+        log_inicio, logs = self.logs.desde(since, renderizar)
         return {
             "status": self.status,
             "turno": self.turno,
             "jogador": self._robo_to_dict(self.jogador),
             "adversario": self._robo_to_dict(self.adversario),
-            "logs": self.logs,
+            "arena": self._arena_to_dict(self.arena),
+            "logs": logs,
+            "log_inicio": log_inicio,
+            "log_cursor": self.logs.proximo_seq,
+        }
+
+    @staticmethod
+    def _arena_to_dict(arena: Arena) -> dict:
+        mapa = arena.mapa
+        return {
+            "largura": arena.largura,
+            "altura": arena.altura,
+            "mapa": mapa.nome if mapa is not None else None,
+            "bloqueios": mapa.bloqueios if mapa is not None else (),
         }
 
     @staticmethod
@@ -0,0 +1,132 @@
+"""
+Eventos estruturados das lutas (o que vai para o RegistroLogs).
+
+O motor não formata texto: cada ação vira uma tupla curta
+(tipo, campos...), com os robôs identificados pelo índice (no GameState,
+0 = jogador e 1 = adversário; na BatalhaEmGrupo, a posição na lista).
+O texto em português só é montado quando alguém pede (API, terminal),
+com `renderizar`; simulações headless nunca pagam por ele, e clientes
+podem pedir os eventos crus e escrever o próprio texto.
+
+Campos de cada tipo (em CAMPOS):
+
+    ("inicio", jogador, adversario)
+    ("inicio_grupo", robos, equipes)
+    ("comando", texto, pref_ataque, pref_defesa, pref_esquiva)
+    ("turno", numero)
+    ("ataque", ator, alvo, dano)
+    ("aproxima", ator, alvo, x_de, y_de, x_para, y_para, distancia)
+    ("defesa", ator)
+    ("esquiva", ator, alvo, x_de, y_de, x_para, y_para, distancia)
+    ("queda", robo)
+    ("vitoria", vencedor)        vencedor = índice do robô; None = empate
+    ("vitoria_equipe", equipe)   equipe = None se ninguém sobrou
+    ("ja_terminou",)
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+
+INICIO = "inicio"
+INICIO_GRUPO = "inicio_grupo"
+COMANDO = "comando"
+TURNO = "turno"
+ATAQUE = "ataque"
+APROXIMA = "aproxima"
+DEFESA = "defesa"
+ESQUIVA = "esquiva"
+QUEDA = "queda"
+VITORIA = "vitoria"
+VITORIA_EQUIPE = "vitoria_equipe"
+JA_TERMINOU = "ja_terminou"
+
+# Nome dos campos depois do tipo (para clientes que montam o próprio texto)
+CAMPOS: dict[str, tuple[str, ...]] = {
+    INICIO: ("jogador", "adversario"),
+    INICIO_GRUPO: ("robos", "equipes"),
+    COMANDO: ("texto", "pref_ataque", "pref_defesa", "pref_esquiva"),
+    TURNO: ("numero",),
+    ATAQUE: ("ator", "alvo", "dano"),
+    APROXIMA: ("ator", "alvo", "x_de", "y_de", "x_para", "y_para", "distancia"),
+    DEFESA: ("ator",),
+    ESQUIVA: ("ator", "alvo", "x_de", "y_de", "x_para", "y_para", "distancia"),
+    QUEDA: ("robo",),
+    VITORIA: ("vencedor",),
+    VITORIA_EQUIPE: ("equipe",),
+    JA_TERMINOU: (),
+}
+
+
+# -------------------------------
+# Texto (sob demanda)
+# -------------------------------
+
+
+def _texto(evento: tuple, nomes: Sequence[str]) -> str:
+    tipo = evento[0]
+    if tipo == TURNO:
+        return f"--- TURNO {evento[1]} ---"
+    if tipo == ATAQUE:
+        _, ator, alvo, dano = evento
+        return f"{nomes[ator]} ATACA {nomes[alvo]} e causa {dano} de dano."
+    if tipo == APROXIMA:
+        _, ator, alvo, _, _, x, y, distancia = evento
+        return f"{nomes[ator]} se aproxima de {nomes[alvo]} para posição ({x}, {y}) (distância {distancia})."
+    if tipo == DEFESA:
+        return f"{nomes[evento[1]]} assume postura defensiva (ação ainda estética)."
+    if tipo == ESQUIVA:
+        _, ator, _, _, _, x, y, distancia = evento
+        return f"{nomes[ator]} tenta esquivar e recua para ({x}, {y}) (distância {distancia})."
+    if tipo == COMANDO:
+        _, texto, ataque, defesa, esquiva = evento
+        return (
+            f"Comando recebido: '{texto}'. "
+            f"Prefs -> ATAQUE x{ataque}, DEFESA x{defesa}, ESQUIVA x{esquiva}."
+        )
+    if tipo == QUEDA:
+        return f"{nomes[evento[1]]} caiu."
+    if tipo == VITORIA:
+        if evento[1] is None:
+            return "Ambos os robôs caíram. Você perdeu (empate técnico)."
+        return f"{nomes[evento[1]]} venceu a batalha."
+    if tipo == VITORIA_EQUIPE:
+        return f"Fim da batalha. Equipe vencedora: {evento[1]}."
+    if tipo == INICIO:
+        return f"Iniciando batalha: {nomes[evento[1]]} vs {nomes[evento[2]]}."
+    if tipo == INICIO_GRUPO:
+        return f"Iniciando batalha com {evento[1]} robôs e {evento[2]} equipes."
+    if tipo == JA_TERMINOU:
+        return "O jogo já terminou. Nenhum turno executado."
+    raise ValueError(f"Tipo de evento desconhecido: {tipo!r}")
+
+
+# Os eventos se repetem muito (mesmo ataque, mesmo dano, mesmas posições):
+# uma consulta num dict sai mais barata que formatar de novo. Um dict por
+# conjunto de nomes (os índices dos eventos só fazem sentido com eles).
+MAX_TEXTOS_POR_NOMES = 4096
+
+
+@lru_cache(maxsize=256)
+def _textos_de(nomes: tuple[str, ...]) -> dict:
+    return {}
+
+
+def renderizar_todos(eventos: Iterable[tuple], nomes: tuple[str, ...]) -> list[str]:
+    """Texto em português de cada evento; `nomes[i]` é o nome do robô i."""
+    textos = _textos_de(nomes)
+    saida = []
+    for evento in eventos:
+        texto = textos.get(evento)
+        if texto is None:
+            if len(textos) >= MAX_TEXTOS_POR_NOMES:
+                textos.clear()
+            texto = textos[evento] = _texto(evento, nomes)
+        saida.append(texto)
+    return saida
+
+
+def renderizar(evento: tuple, nomes: tuple[str, ...]) -> str:
+    return renderizar_todos((evento,), nomes)[0]
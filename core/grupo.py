@@ -0,0 +1,379 @@
+"""
+Batalhas com vários robôs: equipes ou todos contra todos.
+
+Mesmas regras do GameState (core/engine.py), generalizadas para N robôs:
+- a cada turno, os robôs vivos agem em ordem de velocidade (empate: ordem
+  da lista);
+- o alvo de cada robô é o inimigo vivo mais próximo, pela mesma
+  distância do movimento (Arena.distancia: com mapa, o menor caminho);
+  empate: o primeiro da lista;
+- atacar só a distância <= 1 (senão aproxima), defender é estético,
+  esquivar afasta do alvo;
+- a luta acaba quando sobra só uma equipe viva.
+
+A busca pelo inimigo mais próximo usa uma grade espacial uniforme
+(GradeEspacial), atualizada a cada movimento, em vez de comparar com
+todos os robôs: o custo do turno fica ~O(N) em vez de O(N²). Com mapa, a
+grade separa os candidatos pela distância Manhattan (que o caminho nunca
+fica abaixo) e só esses são medidos pelo terreno.
+
+    python -m core.grupo    # custo por turno: grade x força bruta
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Callable, Literal, Optional, Sequence
+
+from . import eventos as ev
+from .engine import FormatoLogs, GameState
+from .logs import RegistroLogs
+from .models import Arena, Robo
+
+
+StatusGrupo = Literal["running", "finished"]
+
+
+class GradeEspacial:
+    """
+    Índice espacial em grade uniforme: a arena é dividida em células de
+    `tamanho_celula` x `tamanho_celula` e cada célula guarda os itens que
+    estão nela. Mover um item só mexe em duas células.
+
+    Os itens são inteiros (índices dos robôs na batalha).
+    """
+
+    def __init__(self, largura: int, altura: int, tamanho_celula: int = 4):
+        self.tamanho = tamanho_celula
+        self.colunas = -(-largura // tamanho_celula)
+        self.linhas = -(-altura // tamanho_celula)
+        self._celulas: list[set] = [set() for _ in range(self.colunas * self.linhas)]
+        self._posicoes: dict[int, tuple[int, int]] = {}
+
+    def _celula(self, x: int, y: int) -> int:
+        return (y // self.tamanho) * self.colunas + (x // self.tamanho)
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+    def __contains__(self, item: int) -> bool:
+        return item in self._posicoes
+
+    def inserir(self, item: int, x: int, y: int):
+        self._posicoes[item] = (x, y)
+        self._celulas[self._celula(x, y)].add(item)
+
+    def remover(self, item: int):
+        x, y = self._posicoes.pop(item)
+        self._celulas[self._celula(x, y)].discard(item)
+
+    def mover(self, item: int, x: int, y: int):
+        antigo = self._posicoes[item]
+        self._posicoes[item] = (x, y)
+        de, para = self._celula(*antigo), self._celula(x, y)
+        if de != para:
+            self._celulas[de].discard(item)
+            self._celulas[para].add(item)
+
+    def _anel(self, cx: int, cy: int, k: int):
+        """Células a exatamente k células de (cx, cy) (distância de Chebyshev)."""
+        if k == 0:
+            yield cy * self.colunas + cx
+            return
+        for gx in range(max(0, cx - k), min(self.colunas, cx + k + 1)):
+            for gy in (cy - k, cy + k):
+                if 0 <= gy < self.linhas:
+                    yield gy * self.colunas + gx
+        for gy in range(max(0, cy - k + 1), min(self.linhas, cy + k)):
+            for gx in (cx - k, cx + k):
+                if 0 <= gx < self.colunas:
+                    yield gy * self.colunas + gx
+
+    def mais_proximo(
+        self,
+        x: int,
+        y: int,
+        aceitar: Callable[[int], bool],
+        distancia: Optional[Callable[[int], int]] = None,
+    ) -> tuple[Optional[int], Optional[int]]:
+        """
+        (item, distância) do item aceito mais próximo de (x, y); empate: o
+        menor item. (None, None) se nenhum for aceito. A distância é a
+        Manhattan, ou `distancia(item)` (ex.: o menor caminho num mapa),
+        que nunca pode ser menor que a Manhattan.
+
+        Percorre anéis de células em volta de (x, y). Depois do anel k,
+        qualquer item mais longe está a pelo menos k * tamanho + 1, então
+        a busca para assim que o melhor encontrado estiver a <= k * tamanho.
+        """
+        cx, cy = x // self.tamanho, y // self.tamanho
+        posicoes = self._posicoes
+        melhor = None
+        melhor_dist = None
+        for k in range(max(self.colunas, self.linhas)):
+            for c in self._anel(cx, cy, k):
+                for item in self._celulas[c]:
+                    ix, iy = posicoes[item]
+                    d = abs(ix - x) + abs(iy - y)
+                    if melhor is not None and (d > melhor_dist or (d == melhor_dist and item > melhor)):
+                        continue
+                    if not aceitar(item):
+                        continue
+                    if distancia is not None:
+                        d = distancia(item)
+                        if melhor is not None and (d > melhor_dist or (d == melhor_dist and item > melhor)):
+                            continue
+                    melhor, melhor_dist = item, d
+            if melhor is not None and melhor_dist <= k * self.tamanho:
+                break
+        return melhor, melhor_dist
+
+    def no_raio(self, x: int, y: int, raio: int) -> list[int]:
+        """Itens a distância Manhattan <= raio de (x, y)."""
+        t = self.tamanho
+        resultado = []
+        for gy in range(max(0, (y - raio) // t), min(self.linhas, (y + raio) // t + 1)):
+            for gx in range(max(0, (x - raio) // t), min(self.colunas, (x + raio) // t + 1)):
+                for item in self._celulas[gy * self.colunas + gx]:
+                    ix, iy = self._posicoes[item]
+                    if abs(ix - x) + abs(iy - y) <= raio:
+                        resultado.append(item)
+        return resultado
+
+
+class BatalhaEmGrupo:
+    """
+    Estado de uma luta entre vários robôs.
+
+    - `equipes[i]`: equipe do robô i (padrão: cada robô na sua, todos
+      contra todos)
+    - `posicoes[i]`: posição inicial do robô i (padrão: a posição atual)
+    - `max_logs=0` desliga os logs (simulações em massa)
+    """
+
+    def __init__(
+        self,
+        robos: Sequence[Robo],
+        arena: Arena,
+        equipes: Optional[Sequence] = None,
+        posicoes: Optional[Sequence[tuple[int, int]]] = None,
+        seed: Optional[int] = None,
+        max_logs: int = 500,
+        tamanho_celula: int = 4,
+    ):
+        self.arena = arena
+        self.robos = list(robos)
+        self.equipes = list(equipes) if equipes is not None else list(range(len(self.robos)))
+        if len(self.equipes) != len(self.robos):
+            raise ValueError("Informe uma equipe para cada robô.")
+        self.turno = 1
+        self.status: StatusGrupo = "running"
+        self.vencedor = None  # equipe vencedora, quando status == "finished"
+        self.logs = RegistroLogs(max_logs) if max_logs else None
+
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+
+        self.grade = GradeEspacial(arena.largura, arena.altura, tamanho_celula)
+        self.vivos_por_equipe: dict = {}
+        for i, robo in enumerate(self.robos):
+            if posicoes is not None:
+                robo.set_posicao(*posicoes[i], arena)
+            if robo.esta_vivo():
+                self.grade.inserir(i, robo.x, robo.y)
+                equipe = self.equipes[i]
+                self.vivos_por_equipe[equipe] = self.vivos_por_equipe.get(equipe, 0) + 1
+
+        # velocidade não muda durante a luta: a ordem é calculada uma vez
+        self.ordem = sorted(range(len(self.robos)), key=lambda i: -self.robos[i].velocidade)
+
+        self._log((ev.INICIO_GRUPO, len(self.robos), len(self.vivos_por_equipe)))
+        self._checar_fim()
+
+    def _log(self, evento: tuple):
+        if self.logs is not None:
+            self.logs.append(evento)
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+
+    def inimigo_mais_proximo(self, i: int) -> Optional[int]:
+        """Índice do inimigo vivo mais próximo do robô i (None se não houver)."""
+        robo = self.robos[i]
+        equipe = self.equipes[i]
+        equipes = self.equipes
+        distancia = None
+        if self.arena.mapa is not None:
+            # o campo de distâncias até o robô i serve para todos os candidatos
+            robos, arena = self.robos, self.arena
+            distancia = lambda j: arena.distancia(robos[j], robo)
+        alvo, _ = self.grade.mais_proximo(robo.x, robo.y, lambda j: equipes[j] != equipe, distancia)
+        return alvo
+
+    def inimigos_no_alcance(self, i: int, alcance: int = 1) -> list[int]:
+        """Inimigos vivos a distância (Arena.distancia) <= alcance do robô i."""
+        robo = self.robos[i]
+        equipe = self.equipes[i]
+        return [
+            j
+            for j in self.grade.no_raio(robo.x, robo.y, alcance)
+            if self.equipes[j] != equipe and self.arena.distancia(self.robos[j], robo) <= alcance
+        ]
+
+    def vivos(self) -> list[Robo]:
+        return [r for r in self.robos if r.esta_vivo()]
+
+    # -------------------------------
+    # Turnos
+    # -------------------------------
+
+    def executar_turno(self):
+        if self.status != "running":
+            self._log((ev.JA_TERMINOU,))
+            return
+
+        self._log((ev.TURNO, self.turno))
+        arena = self.arena
+        grade = self.grade
+
+        for i in self.ordem:
+            robo = self.robos[i]
+            if not robo.esta_vivo():
+                continue
+            j = self.inimigo_mais_proximo(i)
+            if j is None:
+                break
+            alvo = self.robos[j]
+            acao = robo.escolher_acao(self.rng)
+
+            if acao == "atacar":
+                if arena.distancia(robo, alvo) <= 1:
+                    dano = robo.atacar(alvo, self.rng)
+                    self._log((ev.ATAQUE, i, j, dano))
+                    if not alvo.esta_vivo():
+                        grade.remover(j)
+                        self.vivos_por_equipe[self.equipes[j]] -= 1
+                        self._log((ev.QUEDA, j))
+                        if self._checar_fim():
+                            break
+                else:
+                    x, y = robo.x, robo.y
+                    robo.mover_em_direcao(alvo, arena, aproximar=True)
+                    grade.mover(i, robo.x, robo.y)
+                    if self.logs is not None:
+                        distancia = arena.distancia(robo, alvo)
+                        self._log((ev.APROXIMA, i, j, x, y, robo.x, robo.y, distancia))
+
+            elif acao == "defender":
+                self._log((ev.DEFESA, i))
+
+            elif acao == "esquivar":
+                x, y = robo.x, robo.y
+                robo.mover_em_direcao(alvo, arena, aproximar=False)
+                grade.mover(i, robo.x, robo.y)
+                if self.logs is not None:
+                    distancia = arena.distancia(robo, alvo)
+                    self._log((ev.ESQUIVA, i, j, x, y, robo.x, robo.y, distancia))
+
+        self.turno += 1
+
+    def _checar_fim(self) -> bool:
+        restantes = [e for e, n in self.vivos_por_equipe.items() if n > 0]
+        if len(restantes) > 1:
+            return False
+        self.status = "finished"
+        self.vencedor = restantes[0] if restantes else None
+        self._log((ev.VITORIA_EQUIPE, self.vencedor))
+        return True
+
+    def avancar(self, max_turnos: int) -> int:
+        """Executa até `max_turnos` turnos (para se a luta acabar). Devolve quantos rodou."""
+        executados = 0
+        while executados < max_turnos and self.status == "running":
+            self.executar_turno()
+            executados += 1
+        return executados
+
+    # -------------------------------
+    # Helpers para serializar em JSON
+    # -------------------------------
+
+    def nomes(self) -> tuple[str, ...]:
+        return tuple(r.nome for r in self.robos)
+
+    def renderizar_logs(self, eventos) -> list[str]:
+        return ev.renderizar_todos(eventos, self.nomes())
+
+    def to_dict(self, since: Optional[int] = None, formato: FormatoLogs = "texto") -> dict:
+        if self.logs is not None:
+            renderizar = self.renderizar_logs if formato == "texto" else None
+            log_inicio, logs = self.logs.desde(since, renderizar)
+            log_cursor = self.logs.proximo_seq
+        else:
+            log_inicio, logs, log_cursor = 0, [], 0
+        return {
+            "status": self.status,
+            "turno": self.turno,
+            "vencedor": self.vencedor,
+            "robos": [
+                {**GameState._robo_to_dict(r), "equipe": e} for r, e in zip(self.robos, self.equipes)
+            ],
+            "logs": logs,
+            "log_inicio": log_inicio,
+            "log_cursor": log_cursor,
+        }
+
+
+# -------------------------------
+# Força bruta (referência) / medição
+# -------------------------------
+
+
+def _mais_proximo_forca_bruta(batalha: BatalhaEmGrupo, i: int) -> Optional[int]:
+    robo = batalha.robos[i]
+    melhor = None
+    for j, outro in enumerate(batalha.robos):
+        if batalha.equipes[j] == batalha.equipes[i] or not outro.esta_vivo():
+            continue
+        d = batalha.arena.distancia(outro, robo)
+        if melhor is None or d < melhor[0]:
+            melhor = (d, j)
+    return melhor[1] if melhor else None
+
+
+def batalha_aleatoria(n: int, largura: int, altura: int, equipes: int = 0, seed: int = 0) -> BatalhaEmGrupo:
+    """N robôs com stats e posições sorteados (equipes=0: todos contra todos)."""
+    rng = random.Random(seed)
+    robos = []
+    posicoes = []
+    for i in range(n):
+        ataque, defesa, velocidade = (rng.randint(1, 5) for _ in range(3))
+        personalidade = rng.choice(["agressivo", "defensivo", "velocista"])
+        robos.append(Robo(f"R{i}", "branco", ataque, defesa, velocidade, personalidade))
+        posicoes.append((rng.randrange(largura), rng.randrange(altura)))
+    return BatalhaEmGrupo(
+        robos,
+        Arena(largura, altura),
+        equipes=[i % equipes for i in range(n)] if equipes else None,
+        posicoes=posicoes,
+        seed=seed,
+        max_logs=0,
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    print(f"{'robôs':>6s} {'arena':>9s} {'grade µs/turno':>15s} {'bruta µs/turno':>15s}")
+    for n in (50, 100, 200, 400, 800):
+        lado = int((n * 12) ** 0.5)
+        tempos = []
+        for bruta in (False, True):
+            batalha = batalha_aleatoria(n, lado, lado, seed=n)
+            if bruta:
+                batalha.inimigo_mais_proximo = lambda i, b=batalha: _mais_proximo_forca_bruta(b, i)
+            inicio = time.perf_counter()
+            turnos = batalha.avancar(20)
+            tempos.append((time.perf_counter() - inicio) / max(turnos, 1) * 1e6)
+        print(f"{n:6d} {f'{lado}x{lado}':>9s} {tempos[0]:15.0f} {tempos[1]:15.0f}")
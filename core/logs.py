@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Tuple
+
+
+class RegistroLogs:
+    """
+    Buffer circular de logs de uma luta.
+
+    Cada entrada recebe um número de sequência crescente (0, 1, 2, ...)
+    que nunca é reaproveitado. Quando o buffer enche, as entradas mais
+    antigas são descartadas, mas a numeração continua, então um cliente
+    pode pedir só "o que veio depois do cursor X".
+
+    As entradas podem ser eventos (core/eventos.py); quem lê passa
+    `renderizar` (lista de entradas -> lista de textos) para recebê-las
+    como texto. Cada entrada é renderizada uma vez só, na primeira leitura,
+    e o texto fica num buffer paralelo, alinhado com o das entradas.
+    """
+
+    def __init__(self, capacidade: int = 500):
+        self.capacidade = capacidade
+        self._entradas: deque = deque(maxlen=capacidade)
+        self.proximo_seq = 0
+        self._textos: deque = deque(maxlen=capacidade)
+        self._seq_textos = 0  # próxima sequência a renderizar
+
+    def append(self, entrada):
+        self._entradas.append(entrada)
+        self.proximo_seq += 1
+
+    @property
+    def primeiro_seq(self) -> int:
+        """Sequência da entrada mais antiga ainda guardada."""
+        return self.proximo_seq - len(self._entradas)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._entradas)
+
+    def __getitem__(self, i):
+        return self._entradas[i]
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self._entradas.__sizeof__() + self._textos.__sizeof__()
+
+    def _fonte(self, renderizar: Optional[Callable[[List], List[str]]]) -> deque:
+        """As entradas, ou os textos delas (renderizando as que faltam)."""
+        if renderizar is None:
+            return self._entradas
+        pendentes = self.proximo_seq - max(self._seq_textos, self.primeiro_seq)
+        if pendentes > 0:
+            n = len(self._entradas)
+            self._textos.extend(renderizar([self._entradas[i] for i in range(n - pendentes, n)]))
+            self._seq_textos = self.proximo_seq
+        return self._textos
+
+    def desde(
+        self, cursor: Optional[int], renderizar: Optional[Callable[[List], List[str]]] = None
+    ) -> Tuple[int, List]:
+        """
+        Entradas com sequência >= cursor (todas as guardadas se cursor for None).
+        Devolve (sequência da primeira entrada devolvida, entradas).
+        """
+        fonte = self._fonte(renderizar)
+        inicio = self.primeiro_seq
+        if cursor is None or cursor <= inicio:
+            return inicio, list(fonte)
+        if cursor >= self.proximo_seq:
+            return self.proximo_seq, []
+        pular = cursor - inicio
+        return cursor, [fonte[i] for i in range(pular, len(fonte))]
+
+    def pagina(
+        self,
+        antes: Optional[int] = None,
+        limite: int = 50,
+        renderizar: Optional[Callable[[List], List[str]]] = None,
+    ) -> Tuple[int, List]:
+        """
+        Até `limite` entradas imediatamente anteriores à sequência `antes`
+        (as mais recentes se `antes` for None), da mais antiga para a mais nova.
+        Devolve (sequência da primeira entrada devolvida, entradas).
+        """
+        fonte = self._fonte(renderizar)
+        inicio = self.primeiro_seq
+        fim = self.proximo_seq if antes is None else max(inicio, min(antes, self.proximo_seq))
+        comeco = max(inicio, fim - max(0, limite))
+        return comeco, [fonte[i - inicio] for i in range(comeco, fim)]
@@ -0,0 +1,287 @@
+"""
+Simulador headless de batalhas em lote (NumPy).
+
+Em vez de um GameState por luta, guarda status, HP, posições e pesos de
+ação de N batalhas em arrays e avança todas de uma vez a cada turno.
+As regras são as mesmas de core/engine.py e core/models.py:
+
+- ordem do turno pela velocidade (empate: jogador primeiro, como o sorted)
+- ação sorteada com pesos personalidade x preferências (Robo.escolher_acao)
+- ataque só a distância <= 1, senão aproxima (Robo.atacar / receber_dano)
+- esquiva afasta 1 passo, limitado à arena (Robo.mover_em_direcao)
+
+Não gera logs: serve para balanceamento, não para exibição.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from statistics import NormalDist
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .models import Robo, Arena
+
+
+JOGADOR = 0
+ADVERSARIO = 1
+
+# Códigos de resultado por batalha
+EM_ANDAMENTO = -1
+JOGADOR_VENCEU = 0
+ADVERSARIO_VENCEU = 1
+
+
+class ResultadoLote:
+    """
+    Resultado de simular_lote:
+    - vencedor[i]: JOGADOR_VENCEU, ADVERSARIO_VENCEU ou EM_ANDAMENTO
+      (batalha cortada por max_turnos)
+    - turnos[i]: quantos turnos a batalha i executou
+    - hp_jogador[i] / hp_adversario[i]: HP final de cada lado
+    """
+
+    def __init__(self, vencedor, turnos, hp_jogador, hp_adversario):
+        self.vencedor = vencedor
+        self.turnos = turnos
+        self.hp_jogador = hp_jogador
+        self.hp_adversario = hp_adversario
+
+    def __len__(self):
+        return len(self.vencedor)
+
+    def status(self, i: int) -> str:
+        """Resultado da batalha i no vocabulário do GameState."""
+        codigo = int(self.vencedor[i])
+        if codigo == JOGADOR_VENCEU:
+            return "player_won"
+        if codigo == ADVERSARIO_VENCEU:
+            return "enemy_won"
+        return "running"
+
+    def taxa_vitoria_jogador(self) -> float:
+        return float(np.mean(self.vencedor == JOGADOR_VENCEU))
+
+    def turnos_medios(self) -> float:
+        return float(np.mean(self.turnos))
+
+    def resumo(self) -> dict:
+        return {
+            "batalhas": len(self),
+            "vitorias_jogador": int(np.sum(self.vencedor == JOGADOR_VENCEU)),
+            "vitorias_adversario": int(np.sum(self.vencedor == ADVERSARIO_VENCEU)),
+            "inacabadas": int(np.sum(self.vencedor == EM_ANDAMENTO)),
+            "taxa_vitoria_jogador": self.taxa_vitoria_jogador(),
+            "turnos_medios": self.turnos_medios(),
+        }
+
+
+def _como_lista(robos: Robo | Sequence[Robo], n: int) -> list[Robo]:
+    if isinstance(robos, Robo):
+        return [robos] * n
+    robos = list(robos)
+    if len(robos) != n:
+        raise ValueError(f"Esperava {n} robôs, recebi {len(robos)}.")
+    return robos
+
+
+def simular_lote(
+    jogadores: Robo | Sequence[Robo],
+    adversarios: Robo | Sequence[Robo],
+    n: Optional[int] = None,
+    arena: Optional[Arena] = None,
+    max_turnos: int = 1000,
+    seed: Optional[int] = None,
+) -> ResultadoLote:
+    """
+    Roda N batalhas independentes até o fim (ou até max_turnos).
+
+    `jogadores` e `adversarios` podem ser um único Robo (repetido N vezes)
+    ou sequências de tamanho N. Os robôs não são alterados: só as suas
+    configurações (stats, HP atual, preferências) são lidas.
+    As posições iniciais são as do GameState.
+    """
+    if n is None:
+        for robos in (jogadores, adversarios):
+            if not isinstance(robos, Robo):
+                n = len(robos)
+                break
+        else:
+            n = 1
+
+    arena = arena or Arena()
+    if arena.mapa is not None:
+        raise ValueError("simular_lote só suporta arenas sem mapa (sem obstáculos).")
+    lado = [_como_lista(jogadores, n), _como_lista(adversarios, n)]
+    rng = np.random.default_rng(seed)
+
+    # Arrays (n, 2): coluna 0 = jogador, coluna 1 = adversário
+    ataque = np.array([[j.ataque, a.ataque] for j, a in zip(*lado)], dtype=np.int64)
+    defesa = np.array([[j.defesa, a.defesa] for j, a in zip(*lado)], dtype=np.int64)
+    velocidade = np.array(
+        [[j.velocidade, a.velocidade] for j, a in zip(*lado)], dtype=np.int64
+    )
+    hp = np.array([[j.hp_atual, a.hp_atual] for j, a in zip(*lado)], dtype=np.int64)
+    # pesos acumulados (n, 2, 3)
+    acumulado = np.array(
+        [[j.pesos_acumulados, a.pesos_acumulados] for j, a in zip(*lado)],
+        dtype=np.float64,
+    )
+
+    x = np.empty((n, 2), dtype=np.int64)
+    y = np.empty((n, 2), dtype=np.int64)
+    x[:, JOGADOR], y[:, JOGADOR] = arena.limitar_posicao(2, 1)
+    x[:, ADVERSARIO], y[:, ADVERSARIO] = arena.limitar_posicao(
+        arena.largura - 3, arena.altura - 2
+    )
+
+    # sorted(..., reverse=True) é estável: em empate o jogador age primeiro
+    primeiro = np.where(velocidade[:, ADVERSARIO] > velocidade[:, JOGADOR], 1, 0)
+
+    turnos = np.zeros(n, dtype=np.int64)
+    ativos = np.flatnonzero((hp[:, JOGADOR] > 0) & (hp[:, ADVERSARIO] > 0))
+
+    for _ in range(max_turnos):
+        if ativos.size == 0:
+            break
+
+        turnos[ativos] += 1
+
+        for fase in (0, 1):
+            # quem ainda está com os dois robôs vivos age nesta fase
+            vivos = (hp[ativos, JOGADOR] > 0) & (hp[ativos, ADVERSARIO] > 0)
+            idx = ativos[vivos]
+            if idx.size == 0:
+                break
+
+            ator = primeiro[idx] if fase == 0 else 1 - primeiro[idx]
+            alvo = 1 - ator
+
+            # Robo.escolher_acao: bisect nos pesos acumulados
+            cum = acumulado[idx, ator]
+            sorteio = rng.random(idx.size) * cum[:, 2]
+            acao = (sorteio >= cum[:, 0]).astype(np.int8) + (sorteio >= cum[:, 1])
+
+            ax, ay = x[idx, ator], y[idx, ator]
+            tx, ty = x[idx, alvo], y[idx, alvo]
+            dist = np.abs(ax - tx) + np.abs(ay - ty)
+
+            # atacar com alvo adjacente
+            bate = (acao == 0) & (dist <= 1)
+            if bate.any():
+                b_idx, b_ator, b_alvo = idx[bate], ator[bate], alvo[bate]
+                dano_base = ataque[b_idx, b_ator] + rng.integers(0, 3, size=b_idx.size)
+                dano = np.maximum(1, dano_base - defesa[b_idx, b_alvo])
+                hp[b_idx, b_alvo] -= dano
+
+            # atacar de longe = aproximar; esquivar = afastar
+            sentido = np.where(acao == 0, 1, np.where(acao == 2, -1, 0))
+            sentido[bate] = 0
+            move = sentido != 0
+            if move.any():
+                m_idx, m_ator = idx[move], ator[move]
+                s = sentido[move]
+                nx = ax[move] + s * np.sign(tx[move] - ax[move])
+                ny = ay[move] + s * np.sign(ty[move] - ay[move])
+                x[m_idx, m_ator] = np.clip(nx, 0, arena.largura - 1)
+                y[m_idx, m_ator] = np.clip(ny, 0, arena.altura - 1)
+
+        ativos = ativos[(hp[ativos, JOGADOR] > 0) & (hp[ativos, ADVERSARIO] > 0)]
+
+    vencedor = np.full(n, EM_ANDAMENTO, dtype=np.int8)
+    # Igual ao GameState: se o jogador caiu (mesmo com empate), o adversário vence
+    vencedor[hp[:, ADVERSARIO] <= 0] = JOGADOR_VENCEU
+    vencedor[hp[:, JOGADOR] <= 0] = ADVERSARIO_VENCEU
+
+    return ResultadoLote(vencedor, turnos, hp[:, JOGADOR].copy(), hp[:, ADVERSARIO].copy())
+
+
+# -----------------------------------------
+# Equivalência com a engine escalar
+# -----------------------------------------
+
+# Limite de z: o __main__ (e tests/test_lote.py) faz 6 comparações, 3 robôs
+# x 2 métricas; com Bonferroni, alarme falso em no máximo ALFA delas.
+# Dá ~3.14 (o antigo 4.0 só pegava divergências bem maiores). Com n=5000,
+# o pior robô hoje fica em z=2.35 (turnos do Verde), com folga.
+ALFA = 0.01
+COMPARACOES = 6
+Z_MAX = NormalDist().inv_cdf(1 - ALFA / (2 * COMPARACOES))
+
+
+def _simular_escalar(jogador: Robo, adversario: Robo, arena: Arena, n: int, seed: int):
+    """Roda n batalhas com o GameState (random global semeado)."""
+    from .engine import GameState
+
+    random.seed(seed)
+    vitorias = 0
+    turnos = []
+    for _ in range(n):
+        game = GameState(jogador.clonar(), adversario.clonar(), Arena(arena.largura, arena.altura))
+        while game.status == "running":
+            game.executar_turno()
+        vitorias += game.status == "player_won"
+        turnos.append(game.turno - 1)
+    return vitorias / n, turnos
+
+
+def verificar_equivalencia(
+    jogador: Robo,
+    adversario: Robo,
+    n: int = 5000,
+    arena: Optional[Arena] = None,
+    seed: int = 0,
+    z_max: float = Z_MAX,
+) -> dict:
+    """
+    Teste estatístico: compara a taxa de vitória e a duração média das
+    batalhas entre simular_lote e o GameState, para a mesma configuração.
+
+    Usa z-scores (duas proporções / duas médias); `equivalente` é True se
+    os dois ficarem abaixo de z_max (padrão: Z_MAX).
+    """
+    arena = arena or Arena()
+
+    taxa_escalar, turnos_escalar = _simular_escalar(jogador, adversario, arena, n, seed)
+    lote = simular_lote(jogador, adversario, n=n, arena=arena, seed=seed)
+    taxa_lote = lote.taxa_vitoria_jogador()
+
+    p = (taxa_escalar + taxa_lote) / 2
+    erro_p = math.sqrt(max(p * (1 - p), 1e-12) * 2 / n)
+    z_vitoria = abs(taxa_escalar - taxa_lote) / erro_p
+
+    media_escalar = float(np.mean(turnos_escalar))
+    var_escalar = float(np.var(turnos_escalar, ddof=1))
+    var_lote = float(np.var(lote.turnos, ddof=1))
+    erro_t = math.sqrt(max(var_escalar / n + var_lote / n, 1e-12))
+    z_turnos = abs(media_escalar - lote.turnos_medios()) / erro_t
+
+    return {
+        "taxa_vitoria_escalar": taxa_escalar,
+        "taxa_vitoria_lote": taxa_lote,
+        "z_vitoria": z_vitoria,
+        "turnos_medios_escalar": media_escalar,
+        "turnos_medios_lote": lote.turnos_medios(),
+        "z_turnos": z_turnos,
+        "equivalente": z_vitoria < z_max and z_turnos < z_max,
+    }
+
+
+if __name__ == "__main__":
+    # python -m core.lote  -> checa os três robôs iniciais contra o adversário da API
+    iniciais = [
+        Robo("Vermelho", "vermelho", 3, 2, 1, "agressivo"),
+        Robo("Verde", "verde", 2, 3, 1, "defensivo"),
+        Robo("Azul", "azul", 1, 1, 4, "velocista"),
+    ]
+    oponente = Robo("Adversário", "branco", 2, 2, 2, "agressivo")
+    for robo in iniciais:
+        r = verificar_equivalencia(robo, oponente)
+        print(
+            f"{robo.nome:9s} escalar {r['taxa_vitoria_escalar']:.3f} "
+            f"lote {r['taxa_vitoria_lote']:.3f} (z={r['z_vitoria']:.2f}) | "
+            f"turnos {r['turnos_medios_escalar']:.1f} vs {r['turnos_medios_lote']:.1f} "
+            f"(z={r['z_turnos']:.2f}) -> {'OK' if r['equivalente'] else 'DIVERGE'}"
+        )
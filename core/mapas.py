@@ -0,0 +1,293 @@
+"""
+Mapas de arena com obstáculos.
+
+Um mapa é um texto com uma linha por fileira da arena:
+    .  célula livre
+    #  célula bloqueada
+    J  livre, posição inicial do jogador
+    A  livre, posição inicial do adversário
+
+Numa arena com mapa, distância e movimento seguem o terreno:
+- distância = menor caminho em passos ortogonais (BFS), contornando os
+  bloqueios; sem obstáculos é a mesma distância Manhattan de sempre;
+- aproximar = ir para a vizinha (8 direções, sem cortar quina de
+  bloqueio) mais perto do alvo por esse caminho;
+- esquivar = ir para a vizinha mais longe do alvo (ou ficar, se nenhuma
+  afasta).
+
+Para cada célula alvo, o campo de distâncias e as tabelas de próximo
+passo (aproximar/afastar) são calculados uma vez, na primeira consulta,
+e guardados; depois disso distância e movimento são leituras de lista.
+
+O que depende só dos bloqueios fica num Terreno, compartilhado por todos
+os mapas (e jogos) com o mesmo layout: carregar_mapa() e MAPAS reaproveitam
+o mesmo Terreno para layouts iguais.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Optional
+
+
+LIVRE = "."
+BLOQUEADO = "#"
+INICIO_JOGADOR = "J"
+INICIO_ADVERSARIO = "A"
+
+# Diagonais primeiro: em empate, o passo diagonal ganha (como no
+# Robo.mover_em_direcao sem mapa, que anda em x e y ao mesmo tempo).
+_DIRECOES_MOVIMENTO = ((1, 1), (1, -1), (-1, 1), (-1, -1), (1, 0), (-1, 0), (0, 1), (0, -1))
+_DIRECOES_DISTANCIA = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class MapaInvalido(ValueError):
+    """Texto de mapa mal formado (linhas de tamanhos diferentes, áreas isoladas...)."""
+
+
+class Terreno:
+    """
+    Grade de células livres/bloqueadas e as tabelas calculadas sobre ela.
+
+    Células são indexadas por i = y * largura + x. Cada campo guardado é
+    (distancia, aproximar, afastar): distância até o alvo e a próxima
+    célula em cada sentido, para toda célula de origem.
+    """
+
+    # Campos guardados por terreno (cada um tem 3 listas do tamanho do mapa).
+    # Num mapa 16x5 todos cabem; em mapas grandes só os alvos recentes ficam.
+    MAX_CAMPOS = 4096
+
+    def __init__(self, largura: int, altura: int, livre: bytes):
+        self.largura = largura
+        self.altura = altura
+        self.livre = bytes(livre)
+        self._campos: dict = {}
+        self._lock = threading.Lock()
+
+        n = largura * altura
+        self._vizinhos_distancia = [[] for _ in range(n)]
+        self._vizinhos_movimento = [[] for _ in range(n)]
+        for i in range(n):
+            if not self.livre[i]:
+                continue
+            x, y = i % largura, i // largura
+            for dx, dy in _DIRECOES_DISTANCIA:
+                j = self._indice(x + dx, y + dy)
+                if j is not None:
+                    self._vizinhos_distancia[i].append(j)
+            for dx, dy in _DIRECOES_MOVIMENTO:
+                j = self._indice(x + dx, y + dy)
+                if j is None:
+                    continue
+                # diagonal só se as duas ortogonais estiverem livres
+                if dx and dy and (
+                    self._indice(x + dx, y) is None or self._indice(x, y + dy) is None
+                ):
+                    continue
+                self._vizinhos_movimento[i].append(j)
+
+    def _indice(self, x: int, y: int) -> Optional[int]:
+        if 0 <= x < self.largura and 0 <= y < self.altura:
+            i = y * self.largura + x
+            if self.livre[i]:
+                return i
+        return None
+
+    def esta_livre(self, x: int, y: int) -> bool:
+        return self._indice(x, y) is not None
+
+    # -------------------------------
+    # Campos por alvo
+    # -------------------------------
+
+    def campo(self, alvo: int):
+        """(distancia, aproximar, afastar) para a célula alvo, calculado uma vez."""
+        campo = self._campos.get(alvo)
+        if campo is None:
+            campo = self._calcular_campo(alvo)
+            with self._lock:
+                if len(self._campos) >= self.MAX_CAMPOS:
+                    self._campos.pop(next(iter(self._campos)))
+                self._campos[alvo] = campo
+        return campo
+
+    def _calcular_campo(self, alvo: int):
+        n = len(self.livre)
+        distancia = [-1] * n
+        distancia[alvo] = 0
+        fila = deque([alvo])
+        while fila:
+            i = fila.popleft()
+            d = distancia[i] + 1
+            for j in self._vizinhos_distancia[i]:
+                if distancia[j] < 0:
+                    distancia[j] = d
+                    fila.append(j)
+
+        aproximar = list(range(n))
+        afastar = list(range(n))
+        for i in range(n):
+            if not self.livre[i]:
+                continue
+            perto = longe = i
+            for j in self._vizinhos_movimento[i]:
+                if distancia[j] < distancia[perto]:
+                    perto = j
+                if distancia[j] > distancia[longe]:
+                    longe = j
+            aproximar[i] = perto
+            afastar[i] = longe
+        return distancia, aproximar, afastar
+
+    # -------------------------------
+    # Consultas
+    # -------------------------------
+
+    def distancia(self, x1: int, y1: int, x2: int, y2: int) -> int:
+        return self.campo(y2 * self.largura + x2)[0][y1 * self.largura + x1]
+
+    def passo(self, x: int, y: int, alvo_x: int, alvo_y: int, aproximar: bool = True):
+        """Próxima posição de quem está em (x, y), indo para/fugindo do alvo."""
+        _, perto, longe = self.campo(alvo_y * self.largura + alvo_x)
+        j = (perto if aproximar else longe)[y * self.largura + x]
+        return j % self.largura, j // self.largura
+
+    def livre_mais_proxima(self, x: int, y: int):
+        """(x, y) se estiver livre; senão a célula livre mais perto (BFS na grade)."""
+        if self.esta_livre(x, y):
+            return x, y
+        vistos = {(x, y)}
+        fila = deque([(x, y)])
+        while fila:
+            cx, cy = fila.popleft()
+            for dx, dy in _DIRECOES_DISTANCIA:
+                nx, ny = cx + dx, cy + dy
+                if (nx, ny) in vistos or not (0 <= nx < self.largura and 0 <= ny < self.altura):
+                    continue
+                if self.esta_livre(nx, ny):
+                    return nx, ny
+                vistos.add((nx, ny))
+                fila.append((nx, ny))
+        raise MapaInvalido("Mapa sem células livres.")
+
+
+class Mapa:
+    """Um mapa carregado: nome, terreno (compartilhado) e posições iniciais."""
+
+    __slots__ = ("nome", "texto", "terreno", "inicio_jogador", "inicio_adversario", "bloqueios")
+
+    def __init__(self, nome: Optional[str], texto: str, terreno: Terreno, inicio_jogador, inicio_adversario):
+        self.nome = nome
+        self.texto = texto
+        self.terreno = terreno
+        self.inicio_jogador = inicio_jogador
+        self.inicio_adversario = inicio_adversario
+        # células bloqueadas, em (x, y) (vai em toda resposta da API)
+        w = terreno.largura
+        self.bloqueios = tuple((i % w, i // w) for i, livre in enumerate(terreno.livre) if not livre)
+
+    @property
+    def largura(self) -> int:
+        return self.terreno.largura
+
+    @property
+    def altura(self) -> int:
+        return self.terreno.altura
+
+
+# -------------------------------
+# Carregamento (com cache por layout)
+# -------------------------------
+
+_terrenos: dict[str, Terreno] = {}
+_terrenos_lock = threading.Lock()
+# mapas prontos, pelo texto normalizado
+_por_texto: dict[str, Mapa] = {}
+
+
+def carregar_mapa(texto: str, nome: Optional[str] = None) -> Mapa:
+    """
+    Lê um mapa em texto (ver topo do módulo). Linhas em branco nas pontas
+    e espaços no fim das linhas são ignorados. Layouts iguais reaproveitam
+    o mesmo Terreno (e as tabelas já calculadas); o texto de um mapa de
+    MAPAS (ex: vindo de um snapshot) devolve o próprio mapa, com o nome.
+    """
+    linhas = [linha.rstrip() for linha in texto.strip("\n").splitlines()]
+    while linhas and not linhas[-1]:
+        linhas.pop()
+    if not linhas or not linhas[0]:
+        raise MapaInvalido("Mapa vazio.")
+
+    pronto = _por_texto.get("\n".join(linhas))
+    if pronto is not None and nome in (None, pronto.nome):
+        return pronto
+
+    largura = len(linhas[0])
+    if any(len(linha) != largura for linha in linhas):
+        raise MapaInvalido("Todas as linhas do mapa precisam ter o mesmo tamanho.")
+
+    livre = bytearray()
+    inicios = {}
+    for y, linha in enumerate(linhas):
+        for x, c in enumerate(linha):
+            if c not in (LIVRE, BLOQUEADO, INICIO_JOGADOR, INICIO_ADVERSARIO):
+                raise MapaInvalido(f"Caractere desconhecido no mapa: {c!r} em ({x}, {y}).")
+            if c in (INICIO_JOGADOR, INICIO_ADVERSARIO):
+                if c in inicios:
+                    raise MapaInvalido(f"Mais de uma posição inicial '{c}' no mapa.")
+                inicios[c] = (x, y)
+            livre.append(c != BLOQUEADO)
+
+    chave = "\n".join(
+        "".join(BLOQUEADO if c == BLOQUEADO else LIVRE for c in linha) for linha in linhas
+    )
+    with _terrenos_lock:
+        terreno = _terrenos.get(chave)
+        if terreno is None:
+            terreno = Terreno(largura, len(linhas), livre)
+            _validar_conexo(terreno)
+            _terrenos[chave] = terreno
+
+    return Mapa(
+        nome,
+        "\n".join(linhas),
+        terreno,
+        inicios.get(INICIO_JOGADOR),
+        inicios.get(INICIO_ADVERSARIO),
+    )
+
+
+def _validar_conexo(terreno: Terreno):
+    livres = [i for i, livre in enumerate(terreno.livre) if livre]
+    if len(livres) < 2:
+        raise MapaInvalido("O mapa precisa de pelo menos duas células livres.")
+    distancia = terreno.campo(livres[0])[0]
+    if any(distancia[i] < 0 for i in livres):
+        raise MapaInvalido("O mapa tem áreas livres isoladas (sem caminho entre elas).")
+
+
+# -------------------------------
+# Mapas prontos (mesmo tamanho e posições iniciais da arena padrão)
+# -------------------------------
+
+_TEXTOS_MAPAS = {
+    "pilares": """
+................
+..J.#.....#.....
+.......##.......
+.....#.....#.A..
+................
+""",
+    "muralha": """
+.......#........
+..J....#........
+................
+........#.......
+........#....A..
+""",
+}
+
+MAPAS: dict[str, Mapa] = {nome: carregar_mapa(texto, nome) for nome, texto in _TEXTOS_MAPAS.items()}
+_por_texto.update((m.texto, m) for m in MAPAS.values())
@@ -1,48 +1,191 @@
 import random
 
 
+# Pesos base (atacar, defender, esquivar) de cada personalidade
+PESOS_BASE = {
+    "agressivo": (3, 1, 1),
+    "defensivo": (1, 3, 2),
+    "velocista": (2, 1, 3),
+}
+PESOS_PADRAO = (1, 1, 1)
+
+
 class Arena:
-    def __init__(self, largura=16, altura=5):
+    __slots__ = ("largura", "altura", "mapa")
+
+    def __init__(self, largura=16, altura=5, mapa=None):
         """
         Arena lógica em forma de grade.
         Por enquanto é retangular, depois podemos pensar em hexágono visual.
+
+        Com `mapa` (core.mapas.Mapa), o tamanho vem do mapa e distância e
+        movimento contornam as células bloqueadas.
         """
+        self.mapa = mapa
+        if mapa is not None:
+            largura, altura = mapa.largura, mapa.altura
         self.largura = largura
         self.altura = altura
 
     def distancia(self, robo1, robo2):
-        """Distância Manhattan entre dois robôs."""
+        """Distância Manhattan entre dois robôs (com mapa: menor caminho)."""
+        if self.mapa is not None:
+            return self.mapa.terreno.distancia(robo1.x, robo1.y, robo2.x, robo2.y)
         return abs(robo1.x - robo2.x) + abs(robo1.y - robo2.y)
 
     def limitar_posicao(self, x, y):
-        """Garante que o robô não saia da arena."""
+        """Garante que o robô não saia da arena (nem fique num bloqueio)."""
         x = max(0, min(self.largura - 1, x))
         y = max(0, min(self.altura - 1, y))
+        if self.mapa is not None:
+            x, y = self.mapa.terreno.livre_mais_proxima(x, y)
         return x, y
 
+    def posicoes_iniciais(self):
+        """Posições de jogador e adversário no início da luta (padrão da API)."""
+        padrao = ((2, 1), (self.largura - 3, self.altura - 2))
+        if self.mapa is None:
+            return padrao
+        return (
+            self.mapa.inicio_jogador or padrao[0],
+            self.mapa.inicio_adversario or padrao[1],
+        )
+
 
 class Robo:
+    __slots__ = (
+        "nome",
+        "cor",
+        "ataque",
+        "defesa",
+        "velocidade",
+        "_personalidade",
+        "hp_max",
+        "hp_atual",
+        "_pref_ataque",
+        "_pref_defesa",
+        "_pref_esquiva",
+        "x",
+        "y",
+        "_acumulado",
+    )
+
     def __init__(self, nome, cor, ataque, defesa, velocidade, personalidade):
         self.nome = nome
         self.cor = cor
         self.ataque = ataque
         self.defesa = defesa
         self.velocidade = velocidade
-        self.personalidade = personalidade
+        self._personalidade = personalidade
 
         # HP máximo = defesa * 10 (regra simples para começar)
         self.hp_max = defesa * 10
         self.hp_atual = self.hp_max
 
         # Preferências de comportamento (ajustadas pelos comandos do jogador)
-        self.pref_ataque = 1
-        self.pref_defesa = 1
-        self.pref_esquiva = 1
+        self._pref_ataque = 1
+        self._pref_defesa = 1
+        self._pref_esquiva = 1
 
         # Posição na arena (x, y)
         self.x = 0
         self.y = 0
 
+        # Pesos acumulados de escolher_acao (refeitos quando as prefs mudam)
+        self._recalcular_pesos()
+
+    # -----------------------------------------
+    # Personalidade / preferências
+    # (escrever nelas invalida o cache de pesos)
+    # -----------------------------------------
+
+    @property
+    def personalidade(self):
+        return self._personalidade
+
+    @personalidade.setter
+    def personalidade(self, valor):
+        self._personalidade = valor
+        self._recalcular_pesos()
+
+    @property
+    def pref_ataque(self):
+        return self._pref_ataque
+
+    @pref_ataque.setter
+    def pref_ataque(self, valor):
+        self._pref_ataque = valor
+        self._recalcular_pesos()
+
+    @property
+    def pref_defesa(self):
+        return self._pref_defesa
+
+    @pref_defesa.setter
+    def pref_defesa(self, valor):
+        self._pref_defesa = valor
+        self._recalcular_pesos()
+
+    @property
+    def pref_esquiva(self):
+        return self._pref_esquiva
+
+    @pref_esquiva.setter
+    def pref_esquiva(self, valor):
+        self._pref_esquiva = valor
+        self._recalcular_pesos()
+
+    @property
+    def pesos_acumulados(self):
+        """(atacar, atacar+defender, total): a tabela que escolher_acao sorteia."""
+        return self._acumulado
+
+    def _recalcular_pesos(self):
+        base = PESOS_BASE.get(self._personalidade, PESOS_PADRAO)
+        atacar = base[0] * self._pref_ataque
+        defender = atacar + base[1] * self._pref_defesa
+        total = defender + base[2] * self._pref_esquiva
+        self._acumulado = (atacar, defender, total)
+
+    # -----------------------------------------
+    # Exportação compacta (diário / snapshots)
+    # -----------------------------------------
+
+    def para_tupla(self) -> tuple:
+        """Estado completo do robô numa tupla só de valores simples."""
+        return (
+            self.nome,
+            self.cor,
+            self.ataque,
+            self.defesa,
+            self.velocidade,
+            self._personalidade,
+            self.hp_max,
+            self.hp_atual,
+            self._pref_ataque,
+            self._pref_defesa,
+            self._pref_esquiva,
+            self.x,
+            self.y,
+        )
+
+    @classmethod
+    def de_tupla(cls, dados) -> "Robo":
+        """Inverso de para_tupla."""
+        robo = cls(*dados[:6])
+        robo.hp_max, robo.hp_atual = dados[6], dados[7]
+        robo._pref_ataque, robo._pref_defesa, robo._pref_esquiva = dados[8:11]
+        robo.x, robo.y = dados[11], dados[12]
+        robo._recalcular_pesos()
+        return robo
+
+    def clonar(self) -> "Robo":
+        """Cópia independente (os slots são só valores simples): sem deepcopy."""
+        clone = Robo.__new__(Robo)
+        for campo in Robo.__slots__:
+            setattr(clone, campo, getattr(self, campo))
+        return clone
+
     # -----------------------------------------
     # Posição / movimento
     # -----------------------------------------
@@ -62,6 +205,10 @@ class Robo:
         Move um passo em direção (aproximar=True) ou afastando (aproximar=False) do alvo.
         Por enquanto, sempre 1 passo por turno.
         """
+        if arena.mapa is not None:
+            self.x, self.y = arena.mapa.terreno.passo(self.x, self.y, alvo.x, alvo.y, aproximar)
+            return
+
         dx = 0
         dy = 0
 
@@ -95,8 +242,8 @@ class Robo:
         self.hp_atual -= dano_final
         return dano_final
 
-    def atacar(self, alvo):
-        dano_base = self.ataque + random.randint(0, 2)
+    def atacar(self, alvo, rng=random):
+        dano_base = self.ataque + rng.randint(0, 2)
         return alvo.receber_dano(dano_base)
 
     def esta_vivo(self):
@@ -113,40 +260,31 @@ class Robo:
         Ex: {"ataque": +2, "defesa": -1}
         """
 
-        self.pref_ataque = max(1, self.pref_ataque + preferencias.get("ataque", 0))
-        self.pref_defesa = max(1, self.pref_defesa + preferencias.get("defesa", 0))
-        self.pref_esquiva = max(1, self.pref_esquiva + preferencias.get("esquiva", 0))
+        self._pref_ataque = max(1, self._pref_ataque + preferencias.get("ataque", 0))
+        self._pref_defesa = max(1, self._pref_defesa + preferencias.get("defesa", 0))
+        self._pref_esquiva = max(1, self._pref_esquiva + preferencias.get("esquiva", 0))
+        self._recalcular_pesos()
 
     # -----------------------------------------
     # Lógica da IA do robô (usando personalidade + prefs)
     # -----------------------------------------
 
-    def escolher_acao(self):
+    def escolher_acao(self, rng=random):
         """
         IA simples:
-        - Personalidade define a base
+        - Personalidade define a base (PESOS_BASE)
         - Preferências (comando do jogador) ajustam os pesos
-        """
 
-        # Base pela personalidade
-        if self.personalidade == "agressivo":
-            base = {"atacar": 3, "defender": 1, "esquivar": 1}
-        elif self.personalidade == "defensivo":
-            base = {"atacar": 1, "defender": 3, "esquivar": 2}
-        elif self.personalidade == "velocista":
-            base = {"atacar": 2, "defender": 1, "esquivar": 3}
-        else:
-            base = {"atacar": 1, "defender": 1, "esquivar": 1}
-
-        # Ajuste pelas preferências
-        pesos = {
-            "atacar": base["atacar"] * self.pref_ataque,
-            "defender": base["defender"] * self.pref_defesa,
-            "esquivar": base["esquivar"] * self.pref_esquiva,
-        }
-
-        acoes = list(pesos.keys())
-        valores = list(pesos.values())
-
-        acao_escolhida = random.choices(acoes, weights=valores, k=1)[0]
-        return acao_escolhida
+        Os pesos acumulados ficam em cache no robô, então o sorteio é só
+        um random() e duas comparações (mesmo resultado de random.choices
+        com esses pesos).
+
+        `rng` é o gerador usado (o GameState passa o dele, semeado).
+        """
+        atacar, defender, total = self._acumulado
+        r = rng.random() * total
+        if r < atacar:
+            return "atacar"
+        if r < defender:
+            return "defender"
+        return "esquivar"
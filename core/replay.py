@@ -0,0 +1,482 @@
+"""
+Replays: a luta inteira num arquivo binário compacto, para assistir e
+pular para qualquer turno sem refazer a luta desde o começo.
+
+O diário (core/diario.py) descreve a luta, mas para ver o turno 900 é
+preciso simular os 899 anteriores. O replay guarda o resultado: o estado
+numérico dos robôs (stats, HP, posição, preferências) e o status em cada
+turno, mais os eventos (core/eventos.py) de cada um.
+
+Formato (inteiros little-endian):
+
+    cabeçalho  b"ARPL", versão (B), intervalo (H), tamanho dos metadados
+               (I) e do diário (I); os metadados (JSON) e o diário
+    blocos     um a cada `intervalo` turnos, comprimido com zlib: um
+               quadro-chave (estado completo) do primeiro turno do bloco
+               e um delta (só os campos que mudaram) para cada um dos
+               outros; todos com os eventos do turno
+    índice     (posição, tamanho) de cada bloco
+    rodapé     posição do índice (Q), número de blocos (I), b"ARPL"
+
+Ir ao turno t: rodapé -> índice -> bloco (t - 1) // intervalo, que é
+descomprimido e tem no máximo intervalo - 1 deltas aplicados. O último
+bloco lido fica em cache, então assistir em sequência sai de graça.
+
+O quadro do turno t é o estado com game.turno == t, já com os comandos
+que chegaram nesse turno (o mesmo de Diario.reconstruir(t)). Os eventos
+do quadro são os gerados desde o quadro anterior.
+
+    python -m core.replay gravar diario.bin -o luta.arpl
+    python -m core.replay mostrar luta.arpl --turno 120
+    python -m core.replay assistir luta.arpl --de 100 --velocidade 4
+    python -m core.replay medir
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import binascii
+import json
+import struct
+import sys
+import zlib
+
+from . import eventos as ev
+from .diario import Diario, DiarioInvalido
+from .engine import FormatoLogs, GameState
+from .mapas import carregar_mapa
+from .models import Arena, Robo
+
+
+MAGIA = b"ARPL"
+VERSAO = 1
+INTERVALO_PADRAO = 32  # turnos por quadro-chave
+
+# Estado numérico de cada robô, na ordem gravada
+CAMPOS_ROBO = (
+    "ataque",
+    "defesa",
+    "velocidade",
+    "hp_max",
+    "hp_atual",
+    "x",
+    "y",
+    "pref_ataque",
+    "pref_defesa",
+    "pref_esquiva",
+)
+STATUS = ("running", "player_won", "enemy_won")
+
+_CABECALHO = struct.Struct("<4sBHII")
+_INDICE = struct.Struct("<QI")
+_RODAPE = struct.Struct("<QI4s")
+_TAMANHO = struct.Struct("<I")
+_STATUS = struct.Struct("<B")
+_ROBO = struct.Struct("<" + "i" * len(CAMPOS_ROBO))
+_MASCARAS = struct.Struct("<BHH")  # status, campos mudados no jogador e no adversário
+_VALOR = struct.Struct("<i")
+
+# Eventos por quadro cabem folgados (um turno gera ~4, mais os comandos)
+_MAX_LOGS_GRAVACAO = 1000
+
+
+class ReplayInvalido(ValueError):
+    """Bytes que não são um replay (ou de uma versão desconhecida)."""
+
+
+# -------------------------------
+# Gravação
+# -------------------------------
+
+
+def _estado_robo(robo: Robo) -> tuple:
+    return tuple(getattr(robo, campo) for campo in CAMPOS_ROBO)
+
+
+def _json(valor) -> bytes:
+    return json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _delta(anterior: tuple, atual: tuple) -> tuple[int, list[int]]:
+    mascara = 0
+    valores = []
+    for i, (a, b) in enumerate(zip(anterior, atual)):
+        if a != b:
+            mascara |= 1 << i
+            valores.append(b)
+    return mascara, valores
+
+
+class _Escritor:
+    """
+    Os quadros de uma luta, em ordem, nos blocos do formato (ver o topo):
+    os blocos fechados já comprimidos, o aberto ainda em bytes crus.
+    """
+
+    def __init__(self, intervalo: int):
+        if not 1 <= intervalo <= 0xFFFF:
+            raise ValueError("O intervalo entre quadros-chave vai de 1 a 65535 turnos.")
+        self.intervalo = intervalo
+        self.blocos: list[bytes] = []
+        self.bloco = bytearray()
+        self.anterior = None  # (status, jogador, adversario) do último quadro
+        self.cursor = 0  # sequência do primeiro evento do próximo quadro
+        self.turno = 0  # turno do último quadro
+
+    def _quadro(self, game: GameState) -> tuple[bytes, tuple, int]:
+        """(bytes, estado, cursor seguinte) do quadro do turno atual do jogo, sem gravar."""
+        _, eventos = game.logs.desde(self.cursor)
+        status = STATUS.index(game.status)
+        robos = (_estado_robo(game.jogador), _estado_robo(game.adversario))
+
+        if (game.turno - 1) % self.intervalo == 0:
+            dados = bytearray(_STATUS.pack(status))
+            for robo in robos:
+                dados += _ROBO.pack(*robo)
+        else:
+            mascara_j, valores_j = _delta(self.anterior[1], robos[0])
+            mascara_a, valores_a = _delta(self.anterior[2], robos[1])
+            dados = bytearray(_MASCARAS.pack(status, mascara_j, mascara_a))
+            for valor in valores_j + valores_a:
+                dados += _VALOR.pack(valor)
+
+        eventos_json = _json(eventos)
+        dados += _TAMANHO.pack(len(eventos_json)) + eventos_json
+        return bytes(dados), (status, *robos), game.logs.proximo_seq
+
+    def adicionar(self, game: GameState):
+        dados, self.anterior, self.cursor = self._quadro(game)
+        if (game.turno - 1) % self.intervalo == 0 and self.bloco:
+            self.blocos.append(zlib.compress(bytes(self.bloco), 6))
+            self.bloco = bytearray()
+        self.bloco += dados
+        self.turno = game.turno
+
+    def arquivo(self, diario: Diario, game: GameState, provisorio: bool = False) -> bytes:
+        """
+        O replay até o último quadro. Com provisorio=True, o turno atual do
+        jogo entra como último quadro sem ser gravado (ele ainda pode
+        receber comandos): os blocos fechados não são comprimidos de novo.
+        """
+        blocos = list(self.blocos)
+        bloco, turno_final = self.bloco, self.turno
+        status = self.anterior[0] if self.anterior else None
+        if provisorio:
+            dados, (status, _, _), _ = self._quadro(game)
+            turno_final = game.turno
+            if (game.turno - 1) % self.intervalo == 0:
+                if bloco:
+                    blocos.append(zlib.compress(bytes(bloco), 6))
+                bloco = dados
+            else:
+                bloco = bloco + dados
+        blocos.append(zlib.compress(bytes(bloco), 6))
+
+        meta = _json(
+            {
+                "turno_final": turno_final,
+                "status": STATUS[status],
+                "nomes": [game.jogador.nome, game.adversario.nome],
+            }
+        )
+        dados_diario = diario.codificar()
+        partes = [_CABECALHO.pack(MAGIA, VERSAO, self.intervalo, len(meta), len(dados_diario)), meta, dados_diario]
+        posicao = sum(len(p) for p in partes)
+        indice = bytearray()
+        for dados in blocos:
+            indice += _INDICE.pack(posicao, len(dados))
+            posicao += len(dados)
+        return b"".join(partes + blocos) + bytes(indice) + _RODAPE.pack(posicao, len(blocos), MAGIA)
+
+
+def gravar(diario: Diario, intervalo: int = INTERVALO_PADRAO) -> bytes:
+    """
+    Refaz a luta do diário (uma vez só) e grava o replay de todos os
+    turnos, de 1 até o turno em que o diário foi gerado.
+    """
+    escritor = _Escritor(intervalo)
+    for game in diario.passos(max_logs=_MAX_LOGS_GRAVACAO):
+        escritor.adicionar(game)
+    return escritor.arquivo(diario, game)
+
+
+def gravar_jogo(game: GameState, intervalo: int = INTERVALO_PADRAO) -> bytes:
+    """Replay de uma luta em andamento ou terminada, até o turno atual."""
+    return gravar(Diario.de_jogo(game), intervalo)
+
+
+class GravadorJogo:
+    """
+    Replay de uma luta em andamento, mantido em dia: em vez de refazer a
+    luta desde o turno 1 a cada pedido (gravar_jogo), guarda uma cópia
+    dela, refeita pelo diário uma vez, que anda junto com o jogo, e os
+    blocos já fechados. atualizar(game) simula e codifica só os turnos
+    novos; o turno atual (que ainda pode receber comandos) entra como
+    quadro provisório. Os bytes são os mesmos de gravar_jogo(game).
+
+    A cópia segue os comandos e as decisões do cérebro do jogo, então
+    sempre deve receber o mesmo jogo, travado (a API usa o lock da sessão).
+    """
+
+    def __init__(self, game: GameState, intervalo: int = INTERVALO_PADRAO):
+        self._escritor = _Escritor(intervalo)
+        self._copia = Diario.de_jogo(game).jogo_inicial(_MAX_LOGS_GRAVACAO)
+        self._comandos = 0  # comandos do jogo já aplicados na cópia
+
+    @property
+    def intervalo(self) -> int:
+        return self._escritor.intervalo
+
+    def atualizar(self, game: GameState) -> bytes:
+        copia, comandos = self._copia, game.comandos
+        cerebro = copia.cerebro
+        if cerebro is not None:
+            cerebro.decisoes += game.decisoes[len(cerebro.decisoes) :]
+        while True:
+            while self._comandos < len(comandos) and comandos[self._comandos][0] <= copia.turno:
+                copia.aplicar_comando(comandos[self._comandos][1])
+                self._comandos += 1
+            if copia.turno >= game.turno or copia.status != "running":
+                break
+            self._escritor.adicionar(copia)
+            copia.executar_turno()
+        return self._escritor.arquivo(Diario.de_jogo(game), copia, provisorio=True)
+
+
+# -------------------------------
+# Leitura
+# -------------------------------
+
+
+class Replay:
+    def __init__(self, dados: bytes):
+        self.dados = dados
+        try:
+            magia, versao, intervalo, tamanho_meta, tamanho_diario = _CABECALHO.unpack_from(dados)
+            if magia != MAGIA:
+                raise ReplayInvalido("Não é um arquivo de replay.")
+            if versao != VERSAO:
+                raise ReplayInvalido(f"Versão de replay desconhecida: {versao}")
+            inicio = _CABECALHO.size
+            self.meta = json.loads(dados[inicio : inicio + tamanho_meta])
+            inicio += tamanho_meta
+            self.diario = Diario.decodificar(dados[inicio : inicio + tamanho_diario])
+
+            posicao_indice, total_blocos, magia_fim = _RODAPE.unpack_from(dados, len(dados) - _RODAPE.size)
+            if magia_fim != MAGIA:
+                raise ReplayInvalido("Replay truncado (sem rodapé).")
+            self._blocos = [
+                _INDICE.unpack_from(dados, posicao_indice + i * _INDICE.size) for i in range(total_blocos)
+            ]
+            self.turno_final = int(self.meta["turno_final"])
+        except ReplayInvalido:
+            raise
+        except (struct.error, ValueError, KeyError, TypeError, DiarioInvalido) as e:
+            raise ReplayInvalido(f"Replay corrompido: {e}") from e
+
+        self.intervalo = intervalo
+        self.nomes = tuple(self.meta["nomes"])
+        self.arena = Arena(
+            self.diario.largura,
+            self.diario.altura,
+            carregar_mapa(self.diario.mapa) if self.diario.mapa else None,
+        )
+        self._cache: tuple[int, list] = (-1, [])
+
+    @classmethod
+    def de_arquivo(cls, caminho: str) -> "Replay":
+        with open(caminho, "rb") as f:
+            return cls(f.read())
+
+    def __len__(self) -> int:
+        return self.turno_final
+
+    def _bloco(self, i: int) -> list[tuple]:
+        """Quadros (status, jogador, adversario, eventos) do bloco i, já com os deltas aplicados."""
+        cache = self._cache  # uma leitura só: o replay pode ser lido por várias threads
+        if cache[0] == i:
+            return cache[1]
+        posicao, tamanho = self._blocos[i]
+        try:
+            dados = zlib.decompress(self.dados[posicao : posicao + tamanho])
+        except zlib.error as e:
+            raise ReplayInvalido(f"Bloco {i} corrompido: {e}") from e
+
+        quadros = []
+        (status,) = _STATUS.unpack_from(dados)
+        p = _STATUS.size
+        jogador = list(_ROBO.unpack_from(dados, p))
+        adversario = list(_ROBO.unpack_from(dados, p + _ROBO.size))
+        p += 2 * _ROBO.size
+        while True:
+            (tamanho_eventos,) = _TAMANHO.unpack_from(dados, p)
+            p += _TAMANHO.size
+            eventos = [tuple(e) for e in json.loads(dados[p : p + tamanho_eventos])]
+            p += tamanho_eventos
+            quadros.append((STATUS[status], tuple(jogador), tuple(adversario), eventos))
+            if p >= len(dados):
+                break
+
+            status, mascara_j, mascara_a = _MASCARAS.unpack_from(dados, p)
+            p += _MASCARAS.size
+            for robo, mascara in ((jogador, mascara_j), (adversario, mascara_a)):
+                for campo in range(len(CAMPOS_ROBO)):
+                    if mascara & (1 << campo):
+                        (robo[campo],) = _VALOR.unpack_from(dados, p)
+                        p += _VALOR.size
+
+        self._cache = (i, quadros)
+        return quadros
+
+    def estado(self, turno: int) -> tuple:
+        """(status, jogador, adversario, eventos) no turno (tuplas na ordem de CAMPOS_ROBO)."""
+        if not 1 <= turno <= self.turno_final:
+            raise IndexError(f"O replay vai do turno 1 ao {self.turno_final}.")
+        i, deslocamento = divmod(turno - 1, self.intervalo)
+        return self._bloco(i)[deslocamento]
+
+    def robos(self, turno: int) -> tuple[Robo, Robo]:
+        """Robôs como estavam no turno (para desenhar, ex.: game_loop.assistir_replay)."""
+        _, jogador, adversario, _ = self.estado(turno)
+        robos = []
+        for inicial, valores in ((self.diario.jogador, jogador), (self.diario.adversario, adversario)):
+            nome, cor, _, _, _, personalidade = inicial[:6]
+            ataque, defesa, velocidade, hp_max, hp_atual, x, y, pref_a, pref_d, pref_e = valores
+            robos.append(
+                Robo.de_tupla(
+                    (nome, cor, ataque, defesa, velocidade, personalidade,
+                     hp_max, hp_atual, pref_a, pref_d, pref_e, x, y)
+                )
+            )
+        return tuple(robos)
+
+    def quadro(self, turno: int, formato: FormatoLogs = "texto") -> dict:
+        """O turno no formato das respostas da API (robôs como no GameState.to_dict)."""
+        status, _, _, eventos = self.estado(turno)
+        jogador, adversario = self.robos(turno)
+        return {
+            "turno": turno,
+            "status": status,
+            "jogador": GameState._robo_to_dict(jogador),
+            "adversario": GameState._robo_to_dict(adversario),
+            "logs": ev.renderizar_todos(eventos, self.nomes) if formato == "texto" else eventos,
+        }
+
+    def info(self) -> dict:
+        return {
+            "turno_final": self.turno_final,
+            "status": self.meta["status"],
+            "intervalo": self.intervalo,
+            "quadros_chave": len(self._blocos),
+            "bytes": len(self.dados),
+            "arena": GameState._arena_to_dict(self.arena),
+        }
+
+
+# -------------------------------
+# Medição
+# -------------------------------
+
+
+def _medir(turnos: int = 5000):
+    """Uma luta longa: tamanho do replay, gravar, ir ao último turno x refazer pelo diário."""
+    import time
+
+    jogador = Robo("Tanque", "verde", 1, 9, 1, "defensivo")
+    adversario = Robo("Outro", "azul", 1, 9, 1, "defensivo")
+    game = GameState(jogador, adversario, Arena(16, 5), max_logs=1, seed=1)
+    game.avancar(turnos)
+    diario = Diario.de_jogo(game)
+    t0 = time.perf_counter()
+    dados = gravar(diario)
+    t_gravar = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    Replay(dados).quadro(game.turno)
+    t_seek = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    diario.reconstruir()
+    t_diario = time.perf_counter() - t0
+    print(
+        f"luta de {game.turno - 1} turnos: replay {len(dados):,} bytes (diário {len(diario.codificar())}), "
+        f"gravar {t_gravar * 1e3:.1f} ms"
+    )
+    print(f"ir ao último turno: replay {t_seek * 1e3:.2f} ms, refazendo pelo diário {t_diario * 1e3:.1f} ms")
+
+    # A mesma luta andando: o gravador só codifica o turno novo
+    gravador = GravadorJogo(game)
+    gravador.atualizar(game)
+    game.executar_turno()
+    t0 = time.perf_counter()
+    gravador.atualizar(game)
+    t_gravador = time.perf_counter() - t0
+    print(f"um turno depois: gravador {t_gravador * 1e3:.2f} ms (gravar_jogo refaz a luta toda)")
+
+
+# -------------------------------
+# Linha de comando
+# -------------------------------
+
+
+def _ler_diario(caminho: str) -> Diario:
+    """Arquivo com os bytes do diário, ou com o base64 devolvido pelo /diario."""
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    try:
+        return Diario.decodificar(dados)
+    except DiarioInvalido:
+        try:
+            return Diario.decodificar(base64.b64decode(dados.strip(), validate=True))
+        except binascii.Error as e:
+            raise DiarioInvalido(f"Nem diário nem base64 de diário: {e}") from e
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replays de lutas (gravar, mostrar, assistir).")
+    sub = parser.add_subparsers(dest="acao", required=True)
+
+    p = sub.add_parser("gravar", help="grava o replay de um diário")
+    p.add_argument("diario", help="arquivo do diário (bytes ou o base64 do /diario)")
+    p.add_argument("-o", "--saida", required=True)
+    p.add_argument("--intervalo", type=int, default=INTERVALO_PADRAO, help="turnos por quadro-chave")
+
+    p = sub.add_parser("mostrar", help="mostra um turno do replay")
+    p.add_argument("arquivo")
+    p.add_argument("--turno", type=int, default=None, help="padrão: o último")
+    p.add_argument("--eventos", action="store_true", help="eventos crus em vez de texto")
+
+    p = sub.add_parser("assistir", help="assiste ao replay numa janela pygame")
+    p.add_argument("arquivo")
+    p.add_argument("--de", type=int, default=1, help="turno inicial")
+    p.add_argument("--velocidade", type=float, default=1.0)
+
+    sub.add_parser("medir", help="mede gravar e saltar numa luta longa")
+    args = parser.parse_args(argv)
+
+    if args.acao == "medir":
+        _medir()
+        return 0
+
+    if args.acao == "gravar":
+        dados = gravar(_ler_diario(args.diario), args.intervalo)
+        with open(args.saida, "wb") as f:
+            f.write(dados)
+        replay = Replay(dados)
+        print(f"{args.saida}: {replay.turno_final} turnos, {replay.info()['quadros_chave']} quadros-chave, {len(dados):,} bytes")
+        return 0
+
+    replay = Replay.de_arquivo(args.arquivo)
+    if args.acao == "mostrar":
+        quadro = replay.quadro(args.turno or replay.turno_final, "eventos" if args.eventos else "texto")
+        print(json.dumps({**replay.info(), "quadro": quadro}, ensure_ascii=False, indent=2))
+        return 0
+
+    # pygame só aqui: o resto do core roda sem ele
+    from game_loop import assistir_replay
+
+    assistir_replay(replay, args.de, args.velocidade)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
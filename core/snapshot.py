@@ -0,0 +1,117 @@
+"""
+Snapshot binário de um GameState, para persistir lutas em andamento.
+
+Guarda robôs (stats, HP, posição, preferências), arena (e mapa), turno, status,
+seed, estado do gerador aleatório, o diário de comandos e, com cérebro
+no adversário (core/cerebro.py), a dificuldade e as decisões. Os logs não
+entram, só o cursor deles, para a numeração continuar de onde parou
+depois de restaurar.
+
+Formato: cabeçalho "<BI" (versão, tamanho do JSON), o JSON compacto e
+o estado do Mersenne Twister (625 uint32, ~2,5 KB - a maior parte do
+snapshot). O JSON não é comprimido: são ~300 bytes e o zlib custaria
+mais que o resto da codificação.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import struct
+from array import array
+
+from .cerebro import codificar_decisoes, criar_cerebro, decodificar_decisoes
+from .engine import GameState
+from .logs import RegistroLogs
+from .mapas import carregar_mapa
+from .models import Arena, Robo
+
+
+VERSAO = 1
+_CABECALHO = struct.Struct("<BI")
+
+
+class SnapshotInvalido(ValueError):
+    """Bytes que não são um snapshot (ou de uma versão desconhecida)."""
+
+
+def codificar_estado(game: GameState) -> bytes:
+    versao_rng, estado_rng, gauss = game.rng.getstate()
+    campos = [
+        game.arena.largura,
+        game.arena.altura,
+        game.jogador.para_tupla(),
+        game.adversario.para_tupla(),
+        game.turno,
+        game.status,
+        game.seed,
+        versao_rng,
+        gauss,
+        game.comandos,
+        game.robos_iniciais,
+        game.logs.capacidade,
+        game.logs.proximo_seq,
+        game.arena.mapa.texto if game.arena.mapa is not None else None,
+        game.versao,
+        game.dificuldade,
+        codificar_decisoes(game.decisoes),
+    ]
+    bloco = json.dumps(campos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _CABECALHO.pack(VERSAO, len(bloco)) + bloco + array("I", estado_rng).tobytes()
+
+
+def decodificar_estado(dados: bytes) -> GameState:
+    try:
+        versao, tamanho = _CABECALHO.unpack_from(dados)
+        if versao != VERSAO:
+            raise SnapshotInvalido(f"Versão de snapshot desconhecida: {versao}")
+        inicio = _CABECALHO.size
+        campos = json.loads(dados[inicio : inicio + tamanho])
+        estado_rng = array("I")
+        estado_rng.frombytes(dados[inicio + tamanho :])
+        (
+            largura,
+            altura,
+            jogador,
+            adversario,
+            turno,
+            status,
+            seed,
+            versao_rng,
+            gauss,
+            comandos,
+            robos_iniciais,
+            capacidade_logs,
+            log_seq,
+            mapa,
+            versao_estado,
+            dificuldade,
+            decisoes,
+        ) = campos
+        decisoes = decodificar_decisoes(decisoes)
+        cerebro = criar_cerebro(dificuldade)
+    except SnapshotInvalido:
+        raise
+    except (struct.error, ValueError, TypeError) as e:
+        raise SnapshotInvalido(f"Snapshot corrompido: {e}") from e
+
+    # Monta o GameState sem passar pelo __init__ (que reposiciona os robôs
+    # e abre os logs da luta).
+    game = GameState.__new__(GameState)
+    game.arena = Arena(largura, altura, carregar_mapa(mapa) if mapa is not None else None)
+    game.jogador = Robo.de_tupla(jogador)
+    game.adversario = Robo.de_tupla(adversario)
+    game.turno = turno
+    game.status = status
+    game.seed = seed
+    game.rng = random.Random()
+    game.rng.setstate((versao_rng, tuple(estado_rng), gauss))
+    game.comandos = [tuple(c) for c in comandos]
+    game.robos_iniciais = tuple(tuple(r) for r in robos_iniciais)
+    game.logs = RegistroLogs(capacidade_logs)
+    game.logs.proximo_seq = log_seq
+    game.versao = versao_estado
+    game.dificuldade = dificuldade
+    game.cerebro = cerebro
+    game.decisoes = decisoes
+    return game
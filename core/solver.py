@@ -0,0 +1,393 @@
+"""
+Probabilidade exata de vitória (sem amostragem) para uma luta 1x1.
+
+A luta do GameState é um processo de Markov finito: HP dos dois robôs,
+posições na arena e de quem é a vez dentro do turno. Os pesos de ação
+são fixos (personalidade x preferências), então dá para calcular as
+probabilidades exatas em vez de sortear milhares de batalhas.
+
+Como o cálculo é feito:
+
+1. Posições. Enquanto ninguém acerta um ataque, só as posições mudam, e
+   essa parte da cadeia não depende do HP. Ela é resolvida uma vez só:
+   para cada estado de partida, a distribuição do "primeiro ataque"
+   (em qual posição/vez ele acontece) e o número esperado de turnos até
+   lá. São sistemas lineares (há ciclos: aproximar/esquivar/defender),
+   resolvidos com numpy. As simetrias de espelho da arena (x e y) reduzem
+   os estados a ~1/4, e a vez do segundo robô é eliminada algebricamente.
+   Com mapa de obstáculos (core.mapas) a simetria não vale, então a
+   primeira consulta num mapa 16x5 leva alguns segundos.
+2. HP. Cada ataque tira pelo menos 1 de HP, então as camadas (hp1, hp2)
+   formam uma ordem: uma DP memoizada camada por camada, da menor para a
+   maior, combina o passo 1 com os danos possíveis (ataque + 0..2 - defesa).
+
+Resultados ficam num cache em memória e, opcionalmente, num SQLite
+(`caminho_cache`), então consultas repetidas respondem em milissegundos.
+
+    python -m core.solver
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import sqlite3
+import threading
+from typing import Optional
+
+import numpy as np
+
+from .models import Arena, Robo
+
+
+def _posicoes_iniciais(arena: Arena):
+    # Mesmas do GameState
+    jogador, adversario = arena.posicoes_iniciais()
+    return arena.limitar_posicao(*jogador), arena.limitar_posicao(*adversario)
+
+
+def _passo(x, y, alvo_x, alvo_y, sentido, largura, altura):
+    """Robo.mover_em_direcao: um passo (diagonal) em direção (+1) ou contra (-1) o alvo."""
+    dx = (alvo_x > x) - (alvo_x < x)
+    dy = (alvo_y > y) - (alvo_y < y)
+    nx = min(largura - 1, max(0, x + sentido * dx))
+    ny = min(altura - 1, max(0, y + sentido * dy))
+    return nx, ny
+
+
+class _CadeiaPosicoes:
+    """
+    Parte "só posições" da luta, para um par de pesos de ação, uma ordem
+    de turno e uma arena (tamanho e mapa). Ver o passo 1 no topo do módulo.
+    Com mapa, só as células livres entram e as simetrias não são usadas:
+    o desempate entre passos igualmente bons (core.mapas) não é espelhado.
+
+    Depois de construída:
+    - classe[(x0, y0, x1, y1)] -> índice da classe de simetria
+    - saidas: lista de (classe, fase) em que um ataque pode acontecer
+      (robôs a distância <= 1)
+    - primeiro_ataque[fase][classe, k]: probabilidade de o primeiro ataque
+      acontecer na saída k, partindo de (classe, fase)
+    - turnos[fase][classe]: número esperado de turnos iniciados até lá
+    """
+
+    def __init__(self, probs, primeiro: int, arena: Arena):
+        self.largura = largura = arena.largura
+        self.altura = altura = arena.altura
+        self.terreno = arena.mapa.terreno if arena.mapa is not None else None
+        self.espelhos = (True, True) if self.terreno is None else (False, False)
+        self.primeiro = primeiro
+
+        celulas = [
+            (x, y)
+            for x in range(largura)
+            for y in range(altura)
+            if self.terreno is None or self.terreno.esta_livre(x, y)
+        ]
+
+        # Classes de simetria (espelho em x, em y e nos dois)
+        self.classe: dict = {}
+        representantes = []
+        for x0, y0 in celulas:
+            for x1, y1 in celulas:
+                p = (x0, y0, x1, y1)
+                if p in self.classe:
+                    continue
+                c = len(representantes)
+                representantes.append(p)
+                for q in self._imagens(p):
+                    self.classe[q] = c
+        n = len(representantes)
+
+        # Transições sem ataque (Q) e saídas (ataque a distância <= 1)
+        q = [np.zeros((n, n)), np.zeros((n, n))]
+        saidas = []
+        prob_saida = []
+        for fase in (0, 1):
+            ator = primeiro if fase == 0 else 1 - primeiro
+            p_atacar, p_defender, p_esquivar = probs[ator]
+            for c, pos in enumerate(representantes):
+                ax, ay, tx, ty = pos if ator == 0 else (pos[2], pos[3], pos[0], pos[1])
+                if self._distancia(ax, ay, tx, ty) <= 1:
+                    saidas.append((c, fase))
+                    prob_saida.append(p_atacar)
+                else:
+                    q[fase][c, self._mover(pos, ator, +1)] += p_atacar
+                q[fase][c, c] += p_defender
+                q[fase][c, self._mover(pos, ator, -1)] += p_esquivar
+
+        self.saidas = saidas
+        self.indice_saida = {s: k for k, s in enumerate(saidas)}
+        r = [np.zeros((n, len(saidas))), np.zeros((n, len(saidas)))]
+        for k, ((c, fase), p) in enumerate(zip(saidas, prob_saida)):
+            r[fase][c, k] = p
+
+        # Elimina a fase 1: X0 = Q0 (R1 + Q1 X0) + R0
+        rhs = np.hstack([r[0] + q[0] @ r[1], np.ones((n, 1))])
+        x0 = np.linalg.solve(np.eye(n) - q[0] @ q[1], rhs)
+        x1 = q[1] @ x0 + np.hstack([r[1], np.zeros((n, 1))])
+
+        self.primeiro_ataque = (x0[:, :-1], x1[:, :-1])
+        self.turnos = (x0[:, -1], x1[:, -1])
+
+    def _imagens(self, p):
+        x0, y0, x1, y1 = p
+        mx = self.largura - 1
+        my = self.altura - 1
+        espelho_x, espelho_y = self.espelhos
+        imagens = [p]
+        if espelho_x:
+            imagens.append((mx - x0, y0, mx - x1, y1))
+        if espelho_y:
+            imagens.append((x0, my - y0, x1, my - y1))
+        if espelho_x and espelho_y:
+            imagens.append((mx - x0, my - y0, mx - x1, my - y1))
+        return imagens
+
+    def _distancia(self, ax, ay, tx, ty):
+        if self.terreno is not None:
+            return self.terreno.distancia(ax, ay, tx, ty)
+        return abs(ax - tx) + abs(ay - ty)
+
+    def _andar(self, x, y, alvo_x, alvo_y, sentido):
+        if self.terreno is not None:
+            return self.terreno.passo(x, y, alvo_x, alvo_y, sentido > 0)
+        return _passo(x, y, alvo_x, alvo_y, sentido, self.largura, self.altura)
+
+    def _mover(self, pos, ator, sentido):
+        x0, y0, x1, y1 = pos
+        if ator == 0:
+            x0, y0 = self._andar(x0, y0, x1, y1, sentido)
+        else:
+            x1, y1 = self._andar(x1, y1, x0, y0, sentido)
+        return self.classe[(x0, y0, x1, y1)]
+
+
+class SolverExato:
+    """
+    Calcula vitória/derrota/duração esperada exatas para dois Robo.
+
+    As cadeias de posição (a parte cara) ficam em memória, indexadas
+    pelos pesos de ação, ordem de turno e tamanho da arena; os resultados
+    finais ficam também no SQLite de `caminho_cache`, se informado.
+    """
+
+    def __init__(self, caminho_cache: Optional[str] = None):
+        self._cadeias: dict = {}
+        self._resultados: dict = {}
+        self._lock = threading.Lock()
+        self._db = None
+        if caminho_cache:
+            self._db = sqlite3.connect(caminho_cache, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS resultados (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def _cadeia(self, probs, primeiro, arena: Arena) -> _CadeiaPosicoes:
+        # Terrenos iguais são o mesmo objeto (core.mapas), então servem de chave
+        terreno = arena.mapa.terreno if arena.mapa is not None else None
+        chave = (probs, primeiro, arena.largura, arena.altura, terreno)
+        cadeia = self._cadeias.get(chave)
+        if cadeia is None:
+            cadeia = self._cadeias[chave] = _CadeiaPosicoes(probs, primeiro, arena)
+        return cadeia
+
+    def resolver(
+        self,
+        jogador: Robo,
+        adversario: Robo,
+        arena: Optional[Arena] = None,
+        posicoes=None,
+    ) -> dict:
+        """
+        Luta entre `jogador` e `adversario` como o GameState a executaria
+        (mesmas posições iniciais, salvo `posicoes`), com as preferências
+        atuais fixas. Devolve:
+        - vitoria: P(jogador vence)
+        - derrota: P(adversário vence)
+        - turnos_esperados: duração média, em turnos
+        """
+        arena = arena or Arena()
+        posicoes = posicoes or _posicoes_iniciais(arena)
+        robos = (jogador, adversario)
+
+        probs = tuple(
+            tuple(round(w / r.pesos_acumulados[2], 12) for w in _pesos(r)) for r in robos
+        )
+        primeiro = 1 if adversario.velocidade > jogador.velocidade else 0
+        dano = tuple(
+            tuple(max(1, robos[a].ataque + extra - robos[1 - a].defesa) for extra in range(3))
+            for a in (0, 1)
+        )
+        hp = (jogador.hp_atual, adversario.hp_atual)
+
+        chave = json.dumps(
+            [
+                probs,
+                primeiro,
+                dano,
+                hp,
+                arena.largura,
+                arena.altura,
+                arena.mapa.bloqueios if arena.mapa is not None else None,
+                posicoes,
+            ],
+            separators=(",", ":"),
+        )
+        with self._lock:
+            resultado = self._resultados.get(chave)
+            if resultado is None and self._db is not None:
+                linha = self._db.execute(
+                    "SELECT valor FROM resultados WHERE chave = ?", (chave,)
+                ).fetchone()
+                if linha is not None:
+                    resultado = self._resultados[chave] = json.loads(linha[0])
+            if resultado is not None:
+                return dict(resultado)
+
+            cadeia = self._cadeia(probs, primeiro, arena)
+            resultado = _resolver_hp(cadeia, dano, hp, posicoes)
+            self._resultados[chave] = resultado
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO resultados (chave, valor) VALUES (?, ?)",
+                    (chave, json.dumps(resultado)),
+                )
+                self._db.commit()
+            return dict(resultado)
+
+
+def _pesos(robo: Robo) -> tuple:
+    atacar, defender, total = robo.pesos_acumulados
+    return (atacar, defender - atacar, total - defender)
+
+
+def _resolver_hp(cadeia: _CadeiaPosicoes, dano, hp, posicoes) -> dict:
+    """Passo 2: DP camada por camada sobre (hp do jogador, hp do adversário)."""
+    saidas = cadeia.saidas
+    n_saidas = len(saidas)
+    primeiro = cadeia.primeiro
+
+    # Depois de um ataque na saída k, a luta continua em (classe, outra fase)
+    continua_fase = np.array([1 - f for _, f in saidas])
+    continua_classe = np.array([c for c, _ in saidas])
+    # ... que também é uma saída (as posições não mudam), ou seja,
+    # o valor "ao entrar" numa camada só é necessário nos estados de saída.
+    linhas_m = np.vstack(
+        [cadeia.primeiro_ataque[f][c] for c, f in zip(continua_classe, continua_fase)]
+    )
+    turnos_m = np.array([cadeia.turnos[f][c] for c, f in zip(continua_classe, continua_fase)])
+
+    ator = np.array([primeiro if f == 0 else 1 - primeiro for _, f in saidas])
+    ataca_jogador = ator == 0
+
+    h0, h1 = hp
+    # valor[a, b] = (P(vitória), E[turnos]) ao entrar na camada (a, b)
+    # em cada estado de continuação, indexado pela saída que levou até ele.
+    vitoria = np.zeros((h0 + 1, h1 + 1, n_saidas))
+    turnos = np.zeros((h0 + 1, h1 + 1, n_saidas))
+
+    def valor_pos_ataque(a, b):
+        """Para cada saída k: valor esperado logo após o ataque, na camada (a, b)."""
+        v = np.zeros(n_saidas)
+        t = np.zeros(n_saidas)
+        for d_jog, d_adv in zip(dano[0], dano[1]):
+            # jogador ataca: adversário perde d_jog
+            nb = b - d_jog
+            if nb <= 0:
+                v_j = np.ones(n_saidas)
+                t_j = np.zeros(n_saidas)
+            else:
+                v_j = vitoria[a, nb]
+                t_j = turnos[a, nb]
+            # adversário ataca: jogador perde d_adv
+            na = a - d_adv
+            if na <= 0:
+                v_a = np.zeros(n_saidas)
+                t_a = np.zeros(n_saidas)
+            else:
+                v_a = vitoria[na, b]
+                t_a = turnos[na, b]
+            v += np.where(ataca_jogador, v_j, v_a)
+            t += np.where(ataca_jogador, t_j, t_a)
+        return v / 3, t / 3
+
+    for a in range(1, h0 + 1):
+        for b in range(1, h1 + 1):
+            v, t = valor_pos_ataque(a, b)
+            vitoria[a, b] = linhas_m @ v
+            turnos[a, b] = turnos_m + linhas_m @ t
+
+    # Estado inicial: início do turno (fase 0), posições iniciais
+    (x0, y0), (x1, y1) = posicoes
+    c0 = cadeia.classe[(x0, y0, x1, y1)]
+    v, t = valor_pos_ataque(h0, h1)
+    p_vitoria = float(cadeia.primeiro_ataque[0][c0] @ v)
+    e_turnos = float(cadeia.turnos[0][c0] + cadeia.primeiro_ataque[0][c0] @ t)
+
+    return {
+        "vitoria": p_vitoria,
+        "derrota": 1.0 - p_vitoria,
+        "turnos_esperados": e_turnos,
+    }
+
+
+def comparar_com_lote(
+    jogador: Robo,
+    adversario: Robo,
+    n: int = 20000,
+    arena: Optional[Arena] = None,
+    seed: int = 0,
+    z_max: Optional[float] = None,
+    solver: Optional[SolverExato] = None,
+) -> dict:
+    """
+    Confere o resultado exato contra uma amostra do simular_lote
+    (z-score da taxa de vitória e da duração média; `confere` se os dois
+    ficarem abaixo de z_max, padrão: o Z_MAX de core/lote.py).
+    """
+    from .lote import Z_MAX, simular_lote
+
+    z_max = Z_MAX if z_max is None else z_max
+
+    arena = arena or Arena()
+    exato = (solver or SolverExato()).resolver(jogador, adversario, arena)
+    lote = simular_lote(jogador, adversario, n=n, arena=arena, seed=seed)
+
+    p = exato["vitoria"]
+    z_vitoria = abs(lote.taxa_vitoria_jogador() - p) / math.sqrt(max(p * (1 - p), 1e-12) / n)
+    erro_t = math.sqrt(max(float(np.var(lote.turnos, ddof=1)), 1e-12) / n)
+    z_turnos = abs(lote.turnos_medios() - exato["turnos_esperados"]) / erro_t
+
+    return {
+        **exato,
+        "taxa_vitoria_lote": lote.taxa_vitoria_jogador(),
+        "turnos_medios_lote": lote.turnos_medios(),
+        "z_vitoria": z_vitoria,
+        "z_turnos": z_turnos,
+        "confere": z_vitoria < z_max and z_turnos < z_max,
+    }
+
+
+if __name__ == "__main__":
+    # python -m core.solver  -> robôs iniciais contra o adversário da API, exato x amostrado
+    import time
+
+    solver = SolverExato()
+    oponente = Robo("Adversário", "branco", 2, 2, 2, "agressivo")
+    for robo in (
+        Robo("Vermelho", "vermelho", 3, 2, 1, "agressivo"),
+        Robo("Verde", "verde", 2, 3, 1, "defensivo"),
+        Robo("Azul", "azul", 1, 1, 4, "velocista"),
+    ):
+        inicio = time.perf_counter()
+        solver.resolver(robo, oponente)
+        ms = (time.perf_counter() - inicio) * 1000
+        r = comparar_com_lote(robo, oponente, solver=solver)
+        print(
+            f"{robo.nome:9s} vitória {r['vitoria']:.4f} (lote {r['taxa_vitoria_lote']:.4f}, "
+            f"z={r['z_vitoria']:.2f}) | turnos {r['turnos_esperados']:.2f} "
+            f"(lote {r['turnos_medios_lote']:.2f}, z={r['z_turnos']:.2f}) | {ms:.0f} ms "
+            f"-> {'OK' if r['confere'] else 'DIVERGE'}"
+        )
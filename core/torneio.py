@@ -0,0 +1,522 @@
+"""
+Torneios entre configurações de Robo: todos contra todos ou mata-mata.
+
+O elenco padrão tem todas as triplas (ataque, defesa, velocidade) com
+soma numa faixa, e a personalidade/cor que definir_cor_e_personalidade
+daria a cada uma (nos empates, que ela sorteia, entra uma configuração
+por personalidade possível).
+
+Cada confronto são `batalhas` lutas headless (GameState sem logs úteis),
+alternando quem é o "jogador" (que age primeiro no empate de velocidade).
+Os confrontos são agrupados em tarefas de `tamanho_tarefa` e espalhados
+num pool de processos; os resultados voltam conforme as tarefas acabam.
+
+Cada tarefa concluída vira uma linha num checkpoint JSONL. Rodando de
+novo com o mesmo checkpoint, as tarefas já feitas são puladas e a
+classificação é refeita a partir do arquivo.
+
+    python -m core.torneio todos --status 6 18 --checkpoint torneio.jsonl
+    python -m core.torneio mata-mata --status 6 12 --batalhas 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, Optional
+
+from .campanha import definir_cor_e_personalidade
+from .engine import GameState
+from .models import Arena, Robo
+
+
+PERSONALIDADES = ("agressivo", "defensivo", "velocista")
+
+# Participante = (ataque, defesa, velocidade, personalidade, cor)
+
+# Pontos por confronto (vitória / empate / derrota)
+PONTOS = (3, 1, 0)
+
+# Luta que chega a este turno conta como empate (dois robôs defensivos
+# podem passar milhares de turnos se esquivando)
+MAX_TURNOS_LUTA = 1000
+
+
+class CheckpointIncompativel(ValueError):
+    """O checkpoint é de outro torneio (elenco, tipo, seed ou batalhas diferentes)."""
+
+
+# -------------------------------
+# Elenco
+# -------------------------------
+
+
+class _Escolha:
+    """rng falso para definir_cor_e_personalidade: escolhe `preferida` se der."""
+
+    def __init__(self, preferida: str):
+        self.preferida = preferida
+
+    def choice(self, opcoes):
+        return self.preferida if self.preferida in opcoes else opcoes[0]
+
+
+def elenco_completo(status_min: int = 6, status_max: int = 18) -> list[tuple]:
+    """Todas as configurações com ataque + defesa + velocidade entre status_min e status_max."""
+    elenco = []
+    for total in range(max(3, status_min), status_max + 1):
+        for ataque in range(1, total - 1):
+            for defesa in range(1, total - ataque):
+                velocidade = total - ataque - defesa
+                vistos = set()
+                for preferida in PERSONALIDADES:
+                    cor, personalidade = definir_cor_e_personalidade(
+                        ataque, defesa, velocidade, rng=_Escolha(preferida)
+                    )
+                    if personalidade not in vistos:
+                        vistos.add(personalidade)
+                        elenco.append((ataque, defesa, velocidade, personalidade, cor))
+    return elenco
+
+
+def nome_participante(p: tuple) -> str:
+    ataque, defesa, velocidade, personalidade, _ = p
+    return f"{personalidade[:3]} {ataque}/{defesa}/{velocidade}"
+
+
+def _criar_robo(p: tuple, nome: str) -> Robo:
+    ataque, defesa, velocidade, personalidade, cor = p
+    return Robo(nome, cor, ataque, defesa, velocidade, personalidade)
+
+
+# -------------------------------
+# Execução (dentro dos processos do pool)
+# -------------------------------
+
+_ELENCO: list = []
+_ARENA = Arena(largura=16, altura=5)
+
+
+def _inicializar(elenco: list):
+    global _ELENCO
+    _ELENCO = elenco
+
+
+def _confronto(i: int, j: int, batalhas: int, seed: int, max_turnos: int) -> list[int]:
+    """[i, j, vitórias de i, vitórias de j, empates, turnos somados]"""
+    rng = random.Random(f"{seed}:{i}:{j}")
+    vitorias_i = vitorias_j = empates = turnos = 0
+    for b in range(batalhas):
+        # alterna quem é o "jogador" (age primeiro no empate de velocidade)
+        primeiro, segundo = (i, j) if b % 2 == 0 else (j, i)
+        game = GameState(
+            _criar_robo(_ELENCO[primeiro], "A"),
+            _criar_robo(_ELENCO[segundo], "B"),
+            _ARENA,
+            max_logs=1,
+            seed=rng.getrandbits(32),
+        )
+        game.avancar(max_turnos)
+        turnos += game.turno - 1
+        if game.status == "running":
+            empates += 1
+        elif (game.status == "player_won") == (primeiro == i):
+            vitorias_i += 1
+        else:
+            vitorias_j += 1
+    return [i, j, vitorias_i, vitorias_j, empates, turnos]
+
+
+def _rodar_tarefa(chave: str, confrontos: list, batalhas: int, seed: int, max_turnos: int):
+    return chave, [_confronto(i, j, batalhas, seed, max_turnos) for i, j in confrontos]
+
+
+# -------------------------------
+# Classificação
+# -------------------------------
+
+
+class Classificacao:
+    """Tabela acumulada: confrontos (V/E/D), pontos e lutas ganhas/perdidas."""
+
+    def __init__(self, elenco: list):
+        self.elenco = elenco
+        n = len(elenco)
+        self.confrontos = [[0, 0, 0] for _ in range(n)]  # vitórias, empates, derrotas
+        self.lutas = [[0, 0, 0] for _ in range(n)]
+        self.total_confrontos = 0
+        self.total_turnos = 0
+        self.total_lutas = 0
+
+    def registrar(self, resultado: list):
+        i, j, vi, vj, empates, turnos = resultado
+        for a, va, vb in ((i, vi, vj), (j, vj, vi)):
+            self.confrontos[a][0 if va > vb else 1 if va == vb else 2] += 1
+            self.lutas[a][0] += va
+            self.lutas[a][1] += empates
+            self.lutas[a][2] += vb
+        self.total_confrontos += 1
+        self.total_lutas += vi + vj + empates
+        self.total_turnos += turnos
+
+    def pontos(self, a: int) -> int:
+        return sum(p * n for p, n in zip(PONTOS, self.confrontos[a]))
+
+    def ordem(self) -> list[int]:
+        def chave(a):
+            v, e, d = self.lutas[a]
+            jogadas = v + e + d
+            return (-self.pontos(a), -(v / jogadas if jogadas else 0.0), a)
+
+        return sorted(range(len(self.elenco)), key=chave)
+
+    def tabela(self, limite: Optional[int] = None) -> str:
+        linhas = [f"{'#':>4s}  {'robô':16s} {'pts':>6s} {'V':>5s} {'E':>5s} {'D':>5s}  lutas%"]
+        for pos, a in enumerate(self.ordem()[:limite], 1):
+            v, e, d = self.confrontos[a]
+            lv, le, ld = self.lutas[a]
+            jogadas = lv + le + ld
+            linhas.append(
+                f"{pos:4d}  {nome_participante(self.elenco[a]):16s} {self.pontos(a):6d} "
+                f"{v:5d} {e:5d} {d:5d}  {lv / jogadas * 100 if jogadas else 0:5.1f}"
+            )
+        return "\n".join(linhas)
+
+
+# -------------------------------
+# Checkpoint
+# -------------------------------
+
+
+class Checkpoint:
+    """
+    Arquivo JSONL: a primeira linha descreve o torneio, as demais são
+    tarefas concluídas ({"tarefa": chave, "resultados": [...]}). Uma
+    última linha cortada (processo morto no meio da escrita) é ignorada.
+    """
+
+    def __init__(self, caminho: Optional[str], cabecalho: dict):
+        self.caminho = caminho
+        # como volta do JSON (tuplas viram listas), para comparar com o arquivo
+        self.cabecalho = cabecalho = json.loads(json.dumps(cabecalho))
+        self.concluidas: dict[str, list] = {}
+        self._arquivo = None
+        if caminho is None:
+            return
+
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as f:
+                linhas = f.read().split("\n")
+            if linhas and linhas[0]:
+                if json.loads(linhas[0]) != cabecalho:
+                    raise CheckpointIncompativel(
+                        f"{caminho} é de outro torneio; use outro arquivo ou apague este."
+                    )
+                for linha in linhas[1:]:
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        break
+                    self.concluidas[registro["tarefa"]] = registro["resultados"]
+            # reescreve sem a linha cortada, se houver
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(json.dumps(cabecalho) + "\n")
+                for chave, resultados in self.concluidas.items():
+                    f.write(json.dumps({"tarefa": chave, "resultados": resultados}) + "\n")
+        else:
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(json.dumps(cabecalho) + "\n")
+
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+
+    def registrar(self, chave: str, resultados: list):
+        self.concluidas[chave] = resultados
+        if self._arquivo is not None:
+            self._arquivo.write(json.dumps({"tarefa": chave, "resultados": resultados}) + "\n")
+            self._arquivo.flush()
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+# -------------------------------
+# Agendamento
+# -------------------------------
+
+
+def _executar(
+    pool: ProcessPoolExecutor,
+    tarefas: Iterator[tuple[str, list]],
+    checkpoint: Checkpoint,
+    processos: int,
+    args: tuple,
+    ao_concluir,
+):
+    """
+    Envia as tarefas ao pool (no máximo processos * 2 em voo) e chama
+    ao_concluir(resultados) para cada uma, na ordem em que terminam.
+    As que já estão no checkpoint não são enviadas de novo.
+    """
+    em_voo = set()
+    pendentes = iter(tarefas)
+
+    def agendar():
+        while len(em_voo) < processos * 2:
+            proxima = next(pendentes, None)
+            if proxima is None:
+                return
+            chave, confrontos = proxima
+            if chave in checkpoint.concluidas:
+                continue
+            em_voo.add(pool.submit(_rodar_tarefa, chave, confrontos, *args))
+
+    agendar()
+    while em_voo:
+        prontos, _ = wait(em_voo, return_when=FIRST_COMPLETED)
+        for futuro in prontos:
+            em_voo.discard(futuro)
+            chave, resultados = futuro.result()
+            checkpoint.registrar(chave, resultados)
+            ao_concluir(resultados)
+        agendar()
+
+
+def _em_tarefas(prefixo: str, confrontos: Iterator[tuple[int, int]], tamanho: int):
+    lote = []
+    k = 0
+    for par in confrontos:
+        lote.append(par)
+        if len(lote) == tamanho:
+            yield f"{prefixo}{k}", lote
+            lote = []
+            k += 1
+    if lote:
+        yield f"{prefixo}{k}", lote
+
+
+class _Progresso:
+    """Mostra a classificação parcial a cada `intervalo` segundos."""
+
+    def __init__(self, classificacao: Classificacao, total: int, intervalo: float, saida, linhas: int):
+        self.classificacao = classificacao
+        self.total = total
+        self.intervalo = intervalo
+        self.saida = saida
+        self.linhas = linhas
+        self.inicio = time.perf_counter()
+        self.ultimo = self.inicio
+        self.feitos_inicio = classificacao.total_confrontos
+
+    def __call__(self, forcar: bool = False):
+        agora = time.perf_counter()
+        if self.saida is None or (not forcar and agora - self.ultimo < self.intervalo):
+            return
+        self.ultimo = agora
+        feitos = self.classificacao.total_confrontos
+        taxa = (feitos - self.feitos_inicio) / max(agora - self.inicio, 1e-9)
+        restante = (self.total - feitos) / taxa if taxa > 0 else float("inf")
+        print(
+            f"\n{feitos}/{self.total} confrontos ({taxa:.0f}/s, faltam ~{restante:.0f}s)",
+            file=self.saida,
+        )
+        print(self.classificacao.tabela(self.linhas), file=self.saida, flush=True)
+
+
+# -------------------------------
+# Torneios
+# -------------------------------
+
+
+def todos_contra_todos(
+    elenco: list,
+    batalhas: int = 2,
+    seed: int = 0,
+    processos: Optional[int] = None,
+    tamanho_tarefa: int = 500,
+    checkpoint: Optional[str] = None,
+    max_turnos: int = MAX_TURNOS_LUTA,
+    intervalo: float = 10.0,
+    saida=sys.stdout,
+    linhas: int = 10,
+) -> Classificacao:
+    """Cada par do elenco se enfrenta uma vez (confronto de `batalhas` lutas)."""
+    n = len(elenco)
+    classificacao = Classificacao(elenco)
+    ponto = Checkpoint(
+        checkpoint,
+        {"tipo": "todos", "elenco": elenco, "batalhas": batalhas, "seed": seed, "tarefa": tamanho_tarefa, "max_turnos": max_turnos},
+    )
+    for resultados in ponto.concluidas.values():
+        for r in resultados:
+            classificacao.registrar(r)
+
+    progresso = _Progresso(classificacao, n * (n - 1) // 2, intervalo, saida, linhas)
+
+    def ao_concluir(resultados):
+        for r in resultados:
+            classificacao.registrar(r)
+        progresso()
+
+    pares = ((i, j) for i in range(n) for j in range(i + 1, n))
+    processos = processos or os.cpu_count() or 1
+    try:
+        with ProcessPoolExecutor(processos, initializer=_inicializar, initargs=(elenco,)) as pool:
+            _executar(
+                pool,
+                _em_tarefas("t", pares, tamanho_tarefa),
+                ponto,
+                processos,
+                (batalhas, seed, max_turnos),
+                ao_concluir,
+            )
+    finally:
+        ponto.fechar()
+    progresso(forcar=True)
+    return classificacao
+
+
+def mata_mata(
+    elenco: list,
+    batalhas: int = 3,
+    seed: int = 0,
+    processos: Optional[int] = None,
+    tamanho_tarefa: int = 64,
+    checkpoint: Optional[str] = None,
+    max_turnos: int = MAX_TURNOS_LUTA,
+    saida=sys.stdout,
+) -> tuple[int, Classificacao]:
+    """
+    Eliminatória simples com chaveamento sorteado por `seed`. Quem ganha
+    mais lutas do confronto passa; no empate passa o de melhor posição no
+    chaveamento. Número ímpar de vivos: o último da rodada passa direto.
+    Devolve (índice do campeão, classificação com todos os confrontos).
+    """
+    classificacao = Classificacao(elenco)
+    ponto = Checkpoint(
+        checkpoint,
+        {"tipo": "mata-mata", "elenco": elenco, "batalhas": batalhas, "seed": seed, "tarefa": tamanho_tarefa, "max_turnos": max_turnos},
+    )
+    vivos = list(range(len(elenco)))
+    random.Random(seed).shuffle(vivos)
+
+    processos = processos or os.cpu_count() or 1
+    rodada = 1
+    try:
+        with ProcessPoolExecutor(processos, initializer=_inicializar, initargs=(elenco,)) as pool:
+            while len(vivos) > 1:
+                confrontos = [(vivos[k], vivos[k + 1]) for k in range(0, len(vivos) - 1, 2)]
+                vencedores: dict[tuple[int, int], int] = {}
+
+                def ao_concluir(resultados):
+                    for i, j, vi, vj, empates, turnos in resultados:
+                        classificacao.registrar([i, j, vi, vj, empates, turnos])
+                        vencedores[(i, j)] = j if vj > vi else i
+
+                for chave, _ in _em_tarefas(f"r{rodada}:", iter(confrontos), tamanho_tarefa):
+                    if chave in ponto.concluidas:
+                        ao_concluir(ponto.concluidas[chave])
+                _executar(
+                    pool,
+                    _em_tarefas(f"r{rodada}:", iter(confrontos), tamanho_tarefa),
+                    ponto,
+                    processos,
+                    (batalhas, seed, max_turnos),
+                    ao_concluir,
+                )
+
+                proximos = [vencedores[par] for par in confrontos]
+                if len(vivos) % 2:
+                    proximos.append(vivos[-1])
+                if saida is not None:
+                    print(f"Rodada {rodada}: {len(vivos)} -> {len(proximos)}", file=saida, flush=True)
+                vivos = proximos
+                rodada += 1
+    finally:
+        ponto.fechar()
+    return vivos[0], classificacao
+
+
+# -------------------------------
+# Linha de comando
+# -------------------------------
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneio entre configurações de robôs.")
+    parser.add_argument("tipo", choices=["todos", "mata-mata"])
+    parser.add_argument("--status", type=int, nargs=2, default=[6, 18], metavar=("MIN", "MAX"),
+                        help="faixa da soma ataque + defesa + velocidade")
+    parser.add_argument("--batalhas", type=int, default=None, help="lutas por confronto (padrão: 2 / 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--tarefa", type=int, default=None, help="confrontos por tarefa do pool")
+    parser.add_argument("--checkpoint", help="arquivo JSONL para retomar o torneio")
+    parser.add_argument("--max-turnos", type=int, default=MAX_TURNOS_LUTA)
+    parser.add_argument("--intervalo", type=float, default=10.0, help="segundos entre parciais")
+    parser.add_argument("--linhas", type=int, default=10, help="linhas da classificação parcial")
+    parser.add_argument("--json", help="salva a classificação final neste arquivo")
+    args = parser.parse_args(argv)
+
+    elenco = elenco_completo(*args.status)
+    print(f"Elenco: {len(elenco)} configurações")
+
+    if args.tipo == "todos":
+        classificacao = todos_contra_todos(
+            elenco,
+            batalhas=args.batalhas or 2,
+            seed=args.seed,
+            processos=args.processos,
+            tamanho_tarefa=args.tarefa or 500,
+            checkpoint=args.checkpoint,
+            max_turnos=args.max_turnos,
+            intervalo=args.intervalo,
+            linhas=args.linhas,
+        )
+    else:
+        campeao, classificacao = mata_mata(
+            elenco,
+            batalhas=args.batalhas or 3,
+            seed=args.seed,
+            processos=args.processos,
+            tamanho_tarefa=args.tarefa or 64,
+            checkpoint=args.checkpoint,
+            max_turnos=args.max_turnos,
+        )
+        print(f"Campeão: {nome_participante(elenco[campeao])}")
+
+    print(
+        f"\n{classificacao.total_confrontos} confrontos, {classificacao.total_lutas} lutas, "
+        f"{classificacao.total_turnos / max(classificacao.total_lutas, 1):.1f} turnos por luta"
+    )
+    print(classificacao.tabela(args.linhas))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                [
+                    {
+                        "robo": nome_participante(elenco[a]),
+                        "ataque": elenco[a][0],
+                        "defesa": elenco[a][1],
+                        "velocidade": elenco[a][2],
+                        "personalidade": elenco[a][3],
+                        "pontos": classificacao.pontos(a),
+                        "confrontos": classificacao.confrontos[a],
+                        "lutas": classificacao.lutas[a],
+                    }
+                    for a in classificacao.ordem()
+                ],
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
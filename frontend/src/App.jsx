@@ -1,14 +1,35 @@
 import { useState, useEffect } from "react";
 
 const API_BASE = "https://arena-de-robos-ia.onrender.com";
+const WS_BASE = API_BASE.replace(/^http/, "ws");
+const MAX_LOGS_CLIENTE = 500;
+
+// Junta uma resposta da API ao estado atual. Com `since`, a API só manda
+// os logs a partir do cursor, então eles são anexados aos que já temos.
+function mesclarEstado(prev, data) {
+  const merged = { ...(prev || {}), ...data };
+  const novos = Array.isArray(data.logs) ? data.logs : [];
+  const continua =
+    prev &&
+    prev.game_id === data.game_id &&
+    data.log_inicio === prev.log_cursor &&
+    Array.isArray(prev.logs);
+  return {
+    ...merged,
+    arena: merged.arena || { largura: 16, altura: 5 },
+    logs: (continua ? [...prev.logs, ...novos] : novos).slice(-MAX_LOGS_CLIENTE),
+  };
+}
 
 function App() {
   const [roboEscolha, setRoboEscolha] = useState(1);
+  const [mapa, setMapa] = useState("");
   const [nomeRobo, setNomeRobo] = useState("Meu Robo");
   const [gameState, setGameState] = useState(null);
   const [commandText, setCommandText] = useState("");
   const [loading, setLoading] = useState(false);
   const [erro, setErro] = useState("");
+  const [streamAtivo, setStreamAtivo] = useState(false);
 
   const temJogo = !!gameState;
 
@@ -26,6 +47,7 @@ function App() {
         body: JSON.stringify({
           robo_escolha: Number(roboEscolha),
           nome: nomeRobo || "SemNome",
+          mapa: mapa || null,
         }),
       });
 
@@ -41,11 +63,7 @@ function App() {
       const data = await resp.json();
 
       // Normaliza o estado para evitar undefined
-      setGameState({
-        ...data,
-        arena: data.arena || { largura: 16, altura: 5 },
-        logs: Array.isArray(data.logs) ? data.logs : [],
-      });
+      setGameState(mesclarEstado(null, data));
       setCommandText("");
     } catch (err) {
       console.error(err);
@@ -63,7 +81,7 @@ function App() {
     setLoading(true);
 
     try {
-      const resp = await fetch(`${API_BASE}/command`, {
+      const resp = await fetch(`${API_BASE}/command?game_id=${encodeURIComponent(gameState.game_id)}&since=${gameState.log_cursor}`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -81,14 +99,7 @@ function App() {
       }
 
       const data = await resp.json();
-      setGameState((prev) => {
-        const merged = { ...(prev || {}), ...data };
-        return {
-          ...merged,
-          arena: merged.arena || { largura: 16, altura: 5 },
-          logs: Array.isArray(merged.logs) ? merged.logs : [],
-        };
-      });
+      setGameState((prev) => mesclarEstado(prev, data));
     } catch (err) {
       console.error(err);
       setErro(err.message || "Erro desconhecido ao enviar comando");
@@ -107,7 +118,7 @@ function App() {
     setLoading(true);
 
     try {
-      const resp = await fetch(`${API_BASE}/turno`, {
+      const resp = await fetch(`${API_BASE}/turno?game_id=${encodeURIComponent(gameState.game_id)}&since=${gameState.log_cursor}&turno=${gameState.turno}`, {
         method: "POST",
       });
 
@@ -121,14 +132,7 @@ function App() {
       }
 
       const data = await resp.json();
-      setGameState((prev) => {
-        const merged = { ...(prev || {}), ...data };
-        return {
-          ...merged,
-          arena: merged.arena || { largura: 16, altura: 5 },
-          logs: Array.isArray(merged.logs) ? merged.logs : [],
-        };
-      });
+      setGameState((prev) => mesclarEstado(prev, data));
     } catch (err) {
       console.error(err);
       setErro(err.message || "Erro desconhecido ao executar turno");
@@ -150,16 +154,39 @@ function App() {
   const arenaData = gameState?.arena || { largura: 16, altura: 5 };
   const logs = Array.isArray(gameState?.logs) ? gameState.logs : [];
 
-  // 🔁 Loop automático de turnos a cada 10s
+  // 📡 Turnos empurrados pelo servidor via WebSocket
+  useEffect(() => {
+    const gameId = gameState?.game_id;
+    if (!gameId || typeof WebSocket === "undefined") return;
+
+    const ws = new WebSocket(
+      `${WS_BASE}/ws?game_id=${encodeURIComponent(gameId)}`
+    );
+
+    ws.onopen = () => setStreamAtivo(true);
+    ws.onmessage = (ev) => {
+      const msg = JSON.parse(ev.data);
+      if (msg.tipo === "estado") {
+        setGameState((prev) => mesclarEstado(prev, msg.estado));
+      } else if (msg.tipo === "ping") {
+        ws.send(JSON.stringify({ tipo: "pong" }));
+      }
+    };
+    ws.onclose = () => setStreamAtivo(false);
+
+    return () => ws.close();
+  }, [gameState?.game_id]);
+
+  // 🔁 Loop automático de turnos (fallback quando o WebSocket não conecta)
   useEffect(() => {
-    if (!temJogo || jogoFinalizado) return;
+    if (!temJogo || jogoFinalizado || streamAtivo) return;
 
     const id = setInterval(() => {
       executarTurno();
     }, 2000); // 2 segundos
 
     return () => clearInterval(id);
-  }, [temJogo, jogoFinalizado, gameState?.turno]); // reinicia o timer quando o turno muda
+  }, [temJogo, jogoFinalizado, streamAtivo, gameState?.turno]); // reinicia o timer quando o turno muda
 
   return (
     <div
@@ -222,6 +249,27 @@ function App() {
             </select>
           </div>
 
+          <div>
+            <label style={{ display: "block", marginBottom: "4px" }}>
+              Mapa
+            </label>
+            <select
+              value={mapa}
+              onChange={(e) => setMapa(e.target.value)}
+              style={{
+                padding: "6px 8px",
+                borderRadius: "8px",
+                border: "1px solid #334155",
+                background: "#020617",
+                color: "#f5f5f5",
+              }}
+            >
+              <option value="">Aberta (sem obstáculos)</option>
+              <option value="pilares">Pilares</option>
+              <option value="muralha">Muralha</option>
+            </select>
+          </div>
+
           <div>
             <label style={{ display: "block", marginBottom: "4px" }}>
               Nome do robô
@@ -332,6 +380,7 @@ function App() {
               <ArenaGrid
                 largura={arenaData.largura}
                 altura={arenaData.altura}
+                bloqueios={arenaData.bloqueios}
                 jogador={gameState.jogador}
                 adversario={gameState.adversario}
               />
@@ -514,9 +563,10 @@ function RoboCard({ title, robo, destaque = false }) {
   );
 }
 
-function ArenaGrid({ largura, altura, jogador, adversario }) {
+function ArenaGrid({ largura, altura, bloqueios, jogador, adversario }) {
   const w = Number.isFinite(largura) ? largura : 16;
   const h = Number.isFinite(altura) ? altura : 5;
+  const bloqueadas = new Set((bloqueios || []).map(([bx, by]) => `${bx}-${by}`));
 
   const cells = [];
 
@@ -538,6 +588,9 @@ function ArenaGrid({ largura, altura, jogador, adversario }) {
       } else if (isAdversario) {
         bg = "#ef4444";
         content = "A";
+      } else if (bloqueadas.has(`${x}-${y}`)) {
+        bg = "#475569"; // obstáculo
+        border = "1px solid #64748b";
       }
 
       cells.push(
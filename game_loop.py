@@ -1,9 +1,16 @@
-import random
 import time
 
 import pygame
 
+from core.engine import GameState
 from core.models import Robo, Arena
+from core.campanha import (
+    MAX_TURNOS_BATALHA,
+    aplicar_ponto,
+    definir_cor_e_personalidade,
+    gerar_stats_aleatorios,
+    obter_status_maximo,
+)
 
 # -----------------------------------------
 # Criação de robôs e arena
@@ -38,79 +45,8 @@ def criar_arena():
 # Lógica de progressão da campanha
 # -----------------------------------------
 
-# Status máximo do adversário por partida (1 a 10)
-STATUS_MAX_POR_PARTIDA = [6, 7, 8, 10, 11, 12, 14, 15, 16, 18]
-
-
-def obter_status_maximo(partida: int) -> int:
-    """
-    Retorna o status máximo da partida (1 a 10).
-    Usa a tabela acima, baseada no exemplo do documento.
-    """
-    indice = max(1, min(partida, 10)) - 1
-    return STATUS_MAX_POR_PARTIDA[indice]
-
-
-def gerar_stats_aleatorios(status_max: int) -> tuple[int, int, int]:
-    """
-    Gera (ataque, defesa, velocidade) com soma = status_max.
-    Garante que cada um é pelo menos 1.
-    """
-    # ataque entre 1 e status_max - 2
-    ataque = random.randint(1, status_max - 2)
-    restante = status_max - ataque
-
-    defesa = random.randint(1, restante - 1)
-    velocidade = restante - defesa
-
-    return ataque, defesa, velocidade
-
-
-def definir_cor_e_personalidade(ataque: int, defesa: int, velocidade: int) -> tuple[str, str]:
-    """
-    Define cor do robô adversário com base no maior status:
-    - maior = ataque -> vermelho
-    - maior = defesa -> verde
-    - maior = velocidade -> azul
-    - todos iguais -> branco
-    - empate entre dois -> escolhe aleatório entre as cores correspondentes
-
-    Também define personalidade:
-    - ataque maior -> agressivo
-    - defesa maior -> defensivo
-    - velocidade maior -> velocista
-    - empatado -> aleatório entre esses perfis
-    """
-    valores = {"ataque": ataque, "defesa": defesa, "velocidade": velocidade}
-    max_valor = max(valores.values())
-
-    maiores = [k for k, v in valores.items() if v == max_valor]
-
-    cores_map = {
-        "ataque": "vermelho",
-        "defesa": "verde",
-        "velocidade": "azul",
-    }
-
-    if len(maiores) == 3:
-        cor = "branco"
-    elif len(maiores) == 1:
-        cor = cores_map[maiores[0]]
-    else:
-        cor = cores_map[random.choice(maiores)]
-
-    # personalidade
-    if len(maiores) == 1:
-        if maiores[0] == "ataque":
-            personalidade = "agressivo"
-        elif maiores[0] == "defesa":
-            personalidade = "defensivo"
-        else:
-            personalidade = "velocista"
-    else:
-        personalidade = random.choice(["agressivo", "defensivo", "velocista"])
-
-    return cor, personalidade
+# Tabela de status, sorteio dos adversários e upgrades ficam em
+# core/campanha.py (compartilhados com a simulação headless).
 
 
 def criar_robo_adversario_procedural(partida: int) -> Robo:
@@ -144,20 +80,16 @@ def aplicar_upgrade(jogador: Robo):
     escolha = input("Digite o número (1/2/3): ").strip()
 
     if escolha == "1":
-        jogador.ataque += 1
+        aplicar_ponto(jogador, "ataque")
         print(f"{jogador.nome} agora tem ATAQUE {jogador.ataque}.")
     elif escolha == "2":
-        jogador.defesa += 1
-        jogador.hp_max += 10
-        jogador.hp_atual += 10
-        if jogador.hp_atual > jogador.hp_max:
-            jogador.hp_atual = jogador.hp_max
+        aplicar_ponto(jogador, "defesa")
         print(
             f"{jogador.nome} agora tem DEFESA {jogador.defesa} "
             f"e HP máximo {jogador.hp_max}."
         )
     else:
-        jogador.velocidade += 1
+        aplicar_ponto(jogador, "velocidade")
         print(f"{jogador.nome} agora tem VELOCIDADE {jogador.velocidade}.")
 
     print(
@@ -170,6 +102,25 @@ def aplicar_upgrade(jogador: Robo):
 # Pygame – janela e desenho
 # -----------------------------------------
 
+FPS = 60
+MARGEM = 60
+
+COR_FUNDO = (90, 70, 50)  # marrom
+COR_ARENA = (160, 160, 160)  # cinza
+COR_GRADE = (145, 145, 145)
+COR_OBSTACULO = (70, 70, 70)
+COR_BORDA = (0, 0, 0)
+COR_TEXTO = (255, 255, 255)
+COR_TURNO = (255, 255, 0)
+COR_DICA = (200, 190, 170)
+
+CORES_ROBOS = {
+    "vermelho": (220, 60, 60),
+    "verde": (60, 220, 60),
+    "azul": (80, 80, 220),
+    "branco": (230, 230, 230),
+}
+
 
 def iniciar_pygame(arena: Arena):
     pygame.init()
@@ -179,140 +130,162 @@ def iniciar_pygame(arena: Arena):
     pygame.display.set_caption("ARIA - Arena de Robôs IA")
     fonte = pygame.font.SysFont(None, 24)
     clock = pygame.time.Clock()
+    # comandos são digitados na própria janela (eventos TEXTINPUT)
+    pygame.key.start_text_input()
     return tela, fonte, clock
 
 
-def desenhar_arena(tela, arena: Arena, jogador: Robo, adversario: Robo, fonte, turno: int):
-    largura_tela, altura_tela = tela.get_size()
-
-    cor_fundo = (90, 70, 50)    # marrom
-    cor_arena = (160, 160, 160) # cinza
-    cor_borda = (0, 0, 0)
-
-    tela.fill(cor_fundo)
-
-    margem = 60
-    arena_larg_px = largura_tela - 2 * margem
-    arena_alt_px = altura_tela - 2 * margem
-    arena_rect = pygame.Rect(margem, margem, arena_larg_px, arena_alt_px)
-
-    # Área da arena
-    pygame.draw.rect(tela, cor_arena, arena_rect)
-    pygame.draw.rect(tela, cor_borda, arena_rect, 3)
-
-    # Tamanho de cada "célula" lógica
-    cell_w = arena_larg_px / arena.largura
-    cell_h = arena_alt_px / arena.altura
-
-    def desenhar_robo(robo: Robo):
-        cores = {
-            "vermelho": (220, 60, 60),
-            "verde": (60, 220, 60),
-            "azul": (80, 80, 220),
-            "branco": (230, 230, 230),
-        }
-        cor = cores.get(robo.cor, (200, 200, 200))
-
-        cx = arena_rect.left + robo.x * cell_w + cell_w / 2
-        cy = arena_rect.top + robo.y * cell_h + cell_h / 2
-
-        raio = int(min(cell_w, cell_h) / 3)
-        pygame.draw.circle(tela, cor, (int(cx), int(cy)), raio)
-        pygame.draw.circle(tela, cor_borda, (int(cx), int(cy)), raio, 2)
-
-    desenhar_robo(jogador)
-    desenhar_robo(adversario)
-
-    # HUD
-    hud1 = fonte.render(
-        f"{jogador.nome} HP {jogador.hp_atual}/{jogador.hp_max}", True, (255, 255, 255)
-    )
-    hud2 = fonte.render(
-        f"{adversario.nome} HP {adversario.hp_atual}/{adversario.hp_max}",
-        True,
-        (255, 255, 255),
-    )
-    hud_turno = fonte.render(f"Turno {turno}", True, (255, 255, 0))
-
-    tela.blit(hud1, (20, 10))
-    tela.blit(hud2, (largura_tela - hud2.get_width() - 20, 10))
-    tela.blit(hud_turno, (largura_tela / 2 - hud_turno.get_width() / 2, 10))
-
-
-# -----------------------------------------
-# Interpretação de comandos do jogador
-# -----------------------------------------
-
-
-def interpretar_comando(texto: str) -> dict:
+class RenderizadorArena:
     """
-    Recebe um texto e devolve um dicionário com ajustes de preferência.
-    Ex: "focar no ataque" -> {"ataque": +2}
-    Aqui usamos uma lógica simples de palavras-chave.
+    Desenha a batalha em camadas, sem redesenhar a tela inteira:
+    - o fundo (arena, grade e obstáculos) é pintado uma vez numa Surface;
+    - robôs e textos do HUD são Surfaces prontas (os textos só são
+      renderizados de novo quando mudam);
+    - a cada quadro, o que mudou é apagado copiando o pedaço do fundo e
+      desenhado de novo, e só esses retângulos vão para a tela
+      (pygame.display.update(retangulos)).
     """
 
-    texto = texto.lower()
-    preferencias = {"ataque": 0, "defesa": 0, "esquiva": 0}
-
-    if not texto.strip():
-        # Nenhum comando = não muda nada
-        return preferencias
-
-    # Ataque
-    if "ataq" in texto or "agress" in texto or "bate" in texto:
-        preferencias["ataque"] += 2
-
-    # Defesa
-    if "defes" in texto or "proteg" in texto or "tank" in texto:
-        preferencias["defesa"] += 2
-
-    # Esquiva / distância
-    if "esquiv" in texto or "desvi" in texto or "foge" in texto or "distân" in texto:
-        preferencias["esquiva"] += 2
-
-    # Combos simples
-    if "contra" in texto:
-        # defesa + ataque
-        preferencias["defesa"] += 1
-        preferencias["ataque"] += 1
-
-    return preferencias
-
-
-def obter_comando_do_jogador(robo_jogador: Robo):
-    print(
-        "\n💬 Oriente seu robô "
-        "(ex: 'focar no ataque', 'focar mais na defesa', "
-        "'tentar esquivar', 'esquiva e contra-ataca'):"
-    )
-    texto = input("Comando (ou deixe vazio para manter): ")
-
-    prefs = interpretar_comando(texto)
-    robo_jogador.aplicar_preferencias(prefs)
+    def __init__(self, tela, arena: Arena, fonte):
+        self.tela = tela
+        self.fonte = fonte
+        largura_tela, altura_tela = tela.get_size()
+        self.area = pygame.Rect(MARGEM, MARGEM, largura_tela - 2 * MARGEM, altura_tela - 2 * MARGEM)
+        # Tamanho de cada "célula" lógica
+        self.cell_w = self.area.width / arena.largura
+        self.cell_h = self.area.height / arena.altura
+        self.raio = int(min(self.cell_w, self.cell_h) / 3)
+
+        self.fundo = self._desenhar_fundo(arena)
+        self._sprites: dict[str, pygame.Surface] = {}
+        self._textos: dict[str, tuple[str, pygame.Surface]] = {}
+        # o que está na tela: chave -> (Surface, Rect)
+        self._na_tela: dict[str, tuple] = {}
+        self._tudo = True
+
+    def invalidar(self):
+        """O próximo quadro redesenha a tela inteira (janela exposta de novo)."""
+        self._tudo = True
+
+    def _desenhar_fundo(self, arena: Arena):
+        fundo = pygame.Surface(self.tela.get_size()).convert()
+        fundo.fill(COR_FUNDO)
+        pygame.draw.rect(fundo, COR_ARENA, self.area)
+
+        for cx in range(1, arena.largura):
+            x = self.area.left + round(cx * self.cell_w)
+            pygame.draw.line(fundo, COR_GRADE, (x, self.area.top), (x, self.area.bottom - 1))
+        for cy in range(1, arena.altura):
+            y = self.area.top + round(cy * self.cell_h)
+            pygame.draw.line(fundo, COR_GRADE, (self.area.left, y), (self.area.right - 1, y))
+
+        # Obstáculos do mapa (se houver)
+        if arena.mapa is not None:
+            for bx, by in arena.mapa.bloqueios:
+                rect = pygame.Rect(
+                    self.area.left + bx * self.cell_w,
+                    self.area.top + by * self.cell_h,
+                    self.cell_w + 1,
+                    self.cell_h + 1,
+                )
+                pygame.draw.rect(fundo, COR_OBSTACULO, rect)
+
+        pygame.draw.rect(fundo, COR_BORDA, self.area, 3)
+        return fundo
+
+    def _sprite(self, cor: str):
+        sprite = self._sprites.get(cor)
+        if sprite is None:
+            lado = 2 * self.raio + 1
+            sprite = pygame.Surface((lado, lado), pygame.SRCALPHA)
+            centro = (self.raio, self.raio)
+            pygame.draw.circle(sprite, CORES_ROBOS.get(cor, (200, 200, 200)), centro, self.raio)
+            pygame.draw.circle(sprite, COR_BORDA, centro, self.raio, 2)
+            self._sprites[cor] = sprite.convert_alpha()
+        return self._sprites[cor]
+
+    def _texto(self, chave: str, texto: str, cor):
+        guardado = self._textos.get(chave)
+        if guardado is None or guardado[0] != texto:
+            guardado = self._textos[chave] = (texto, self.fonte.render(texto, True, cor))
+        return guardado[1]
+
+    def _robo(self, robo: Robo):
+        sprite = self._sprite(robo.cor)
+        cx = self.area.left + robo.x * self.cell_w + self.cell_w / 2
+        cy = self.area.top + robo.y * self.cell_h + self.cell_h / 2
+        return sprite, sprite.get_rect(center=(int(cx), int(cy)))
+
+    def desenhar(
+        self, jogador: Robo, adversario: Robo, turno: int, rodape: str, estado: str
+    ) -> list:
+        """Atualiza a tela (sem flip) e devolve os retângulos que mudaram."""
+        largura_tela, altura_tela = self.tela.get_size()
+        hud1 = self._texto("hud1", f"{jogador.nome} HP {jogador.hp_atual}/{jogador.hp_max}", COR_TEXTO)
+        hud2 = self._texto(
+            "hud2", f"{adversario.nome} HP {adversario.hp_atual}/{adversario.hp_max}", COR_TEXTO
+        )
+        hud_turno = self._texto("turno", f"Turno {turno}", COR_TURNO)
+        texto_rodape = self._texto("rodape", rodape, COR_TEXTO)
+        texto_estado = self._texto("estado", estado, COR_DICA)
+        base = altura_tela - MARGEM / 2
+
+        quadro = {
+            "jogador": self._robo(jogador),
+            "adversario": self._robo(adversario),
+            "hud1": (hud1, hud1.get_rect(topleft=(20, 10))),
+            "hud2": (hud2, hud2.get_rect(topright=(largura_tela - 20, 10))),
+            "turno": (hud_turno, hud_turno.get_rect(midtop=(largura_tela // 2, 10))),
+            "rodape": (texto_rodape, texto_rodape.get_rect(midleft=(20, base))),
+            "estado": (texto_estado, texto_estado.get_rect(midright=(largura_tela - 20, base))),
+        }
 
-    print(
-        f"Preferências atualizadas: "
-        f"ATAQUE x{robo_jogador.pref_ataque}, "
-        f"DEFESA x{robo_jogador.pref_defesa}, "
-        f"ESQUIVA x{robo_jogador.pref_esquiva}"
-    )
+        if self._tudo:
+            self._tudo = False
+            self.tela.blit(self.fundo, (0, 0))
+            for superficie, rect in quadro.values():
+                self.tela.blit(superficie, rect)
+            self._na_tela = quadro
+            return [self.tela.get_rect()]
+
+        # Apaga o que mudou (sprite ou posição) e redesenha o que mudou ou
+        # estava embaixo de algo apagado (ex.: um robô que passou pelo outro)
+        mudou = {chave for chave, item in quadro.items() if self._na_tela.get(chave) != item}
+        apagados = [self._na_tela[chave][1] for chave in mudou if chave in self._na_tela]
+        for rect in apagados:
+            self.tela.blit(self.fundo, rect, rect)
+
+        sujos = list(apagados)
+        for chave, (superficie, rect) in quadro.items():
+            if chave in mudou or rect.collidelist(apagados) != -1:
+                self.tela.blit(superficie, rect)
+                sujos.append(rect)
+        self._na_tela = quadro
+        return sujos
 
 
 # -----------------------------------------
 # Simulação de batalha com arena + visual
 # -----------------------------------------
 
+# A simulação anda em turnos de tempo fixo, separada do desenho: a janela
+# desenha a FPS quadros por segundo e, a cada quadro, executa os turnos
+# que couberem no tempo que passou (vezes a velocidade escolhida).
+PASSO_TURNO = 0.3  # s por turno em 1x
+VELOCIDADES = (1, 4, None)  # None = máximo: o que der no quadro
+NOMES_VELOCIDADES = {1: "1x", 4: "4x", None: "máx"}
+ORCAMENTO_MAXIMO = 0.75 / FPS  # s de simulação por quadro, no máximo
+ATRASO_MAXIMO = 4 * PASSO_TURNO  # janela travada (arrastar...) não vira rajada de turnos
 
-def mostrar_status_terminal(jogador: Robo, adversario: Robo, arena: Arena, turno: int):
-    print(f"\n----- TURNO {turno} -----")
-    print(
-        f"{jogador.nome}: HP {jogador.hp_atual}/{jogador.hp_max} "
-        f"Pos {jogador.posicao()}  ||  "
-        f"{adversario.nome}: HP {adversario.hp_atual}/{adversario.hp_max} "
-        f"Pos {adversario.posicao()}"
-    )
-    dist = arena.distancia(jogador, adversario)
-    print(f"Distância entre eles: {dist}")
+DICA_COMANDOS = "Digite um comando + Enter | Tab: velocidade | Esc: pausa"
+
+
+def _imprimir_logs(game: GameState, cursor: int) -> int:
+    """Imprime no terminal os logs a partir de `cursor`; devolve o novo cursor."""
+    _, linhas = game.logs.desde(cursor, game.renderizar_logs)
+    for linha in linhas:
+        print(linha)
+    return game.logs.proximo_seq
 
 
 def simular_batalha(
@@ -326,6 +299,10 @@ def simular_batalha(
     """
     Executa uma batalha entre jogador e adversário.
     Retorna True se o jogador venceu, False se perdeu ou a janela foi fechada.
+
+    A luta é um GameState (a mesma batalha da campanha headless) e começa
+    pausada, para o jogador orientar o robô antes. Comandos são digitados
+    na janela a qualquer momento, sem parar a simulação.
     """
     print("\n🔥 A BATALHA VAI COMEÇAR! 🔥")
     print(
@@ -333,104 +310,140 @@ def simular_batalha(
         f"VS  {adversario.nome} (HP {adversario.hp_atual})\n"
     )
 
-    # Posição inicial dos robôs na arena
-    jogador.set_posicao(2, arena.altura // 2, arena)
-    adversario.set_posicao(arena.largura - 3, arena.altura // 2, arena)
-
-    # Antes da batalha, já deixa o jogador orientar o robô
-    obter_comando_do_jogador(jogador)
+    # Posição inicial dos robôs: linha do meio da arena
+    game = GameState(
+        jogador,
+        adversario,
+        arena,
+        posicoes=((2, arena.altura // 2), (arena.largura - 3, arena.altura // 2)),
+    )
+    renderizador = RenderizadorArena(tela, arena, fonte)
+    cursor_logs = _imprimir_logs(game, 0)
 
-    turnos = 1
-    rodando = True
+    entrada = ""  # comando sendo digitado
+    velocidade = VELOCIDADES[0]
+    pausado = True
+    acumulado = 0.0
+    clock.tick()  # não conta o tempo de espera antes da batalha
 
-    # Primeiro desenho antes dos turnos
-    desenhar_arena(tela, arena, jogador, adversario, fonte, turnos)
-    pygame.display.flip()
+    while game.status == "running" and game.turno <= MAX_TURNOS_BATALHA:
+        dt = clock.tick(FPS) / 1000
 
-    while jogador.esta_vivo() and adversario.esta_vivo() and rodando:
-        # Eventos do Pygame (fechar janela, etc.)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                rodando = False
-
-        if not rodando:
-            break
-
-        mostrar_status_terminal(jogador, adversario, arena, turnos)
-
-        # A cada turno, oferece opção de mudar a orientação
-        mudar = input("Quer mudar a orientação do seu robô? (s/N): ").strip().lower()
-        if mudar == "s":
-            obter_comando_do_jogador(jogador)
-
-        # quem age primeiro? (maior velocidade)
-        ordem = sorted([jogador, adversario], key=lambda r: r.velocidade, reverse=True)
-
-        for robo in ordem:
-            if not jogador.esta_vivo() or not adversario.esta_vivo():
-                break
-
-            alvo = adversario if robo is jogador else jogador
-
-            dist_atual = arena.distancia(robo, alvo)
-            acao = robo.escolher_acao()
-
-            # ---------- Lógica de movimento + ação ----------
-
-            if acao == "atacar":
-                if dist_atual <= 1:
-                    dano = robo.atacar(alvo)
-                    print(
-                        f"{robo.nome} ATACA! Causa {dano} de dano em {alvo.nome}."
-                    )
-                else:
-                    robo.mover_em_direcao(alvo, arena, aproximar=True)
-                    print(
-                        f"{robo.nome} se aproxima de {alvo.nome} "
-                        f"e vai para {robo.posicao()} "
-                        f"(distância {arena.distancia(robo, alvo)})."
-                    )
-
-            elif acao == "defender":
-                print(f"{robo.nome} levanta a guarda e se prepara para reduzir dano.")
-                # futura lógica de buff de defesa pode entrar aqui
-
-            elif acao == "esquivar":
-                print(f"{robo.nome} tenta ESQUIVAR e se afastar!")
-                robo.mover_em_direcao(alvo, arena, aproximar=False)
-                print(
-                    f"{robo.nome} recua para {robo.posicao()} "
-                    f"(distância {arena.distancia(robo, alvo)})."
-                )
-
-            print(
-                f"{alvo.nome} agora tem {alvo.hp_atual} HP "
-                f"e está em {alvo.posicao()}."
-            )
+                # Se a janela foi fechada, consideramos como derrota / interrupção
+                print("Jogo interrompido.")
+                return False
+            if event.type == pygame.TEXTINPUT:
+                if event.text.isprintable():
+                    entrada += event.text
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_RETURN:
+                    if entrada.strip():
+                        game.aplicar_comando(entrada.strip())
+                        cursor_logs = _imprimir_logs(game, cursor_logs)
+                    entrada = ""
+                elif event.key == pygame.K_BACKSPACE:
+                    entrada = entrada[:-1]
+                elif event.key == pygame.K_TAB:
+                    velocidade = VELOCIDADES[(VELOCIDADES.index(velocidade) + 1) % len(VELOCIDADES)]
+                elif event.key == pygame.K_ESCAPE:
+                    pausado = not pausado
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderizador.invalidar()
+
+        if not pausado:
+            if velocidade is None:
+                limite = time.perf_counter() + ORCAMENTO_MAXIMO
+                while game.status == "running" and time.perf_counter() < limite:
+                    game.executar_turno()
+                acumulado = 0.0
+            else:
+                acumulado = min(acumulado + dt * velocidade, ATRASO_MAXIMO)
+                while acumulado >= PASSO_TURNO and game.status == "running":
+                    game.executar_turno()
+                    acumulado -= PASSO_TURNO
+
+        if velocidade is None and not pausado:
+            # no máximo, o terminal não acompanharia: só o desenho
+            cursor_logs = game.logs.proximo_seq
+        else:
+            cursor_logs = _imprimir_logs(game, cursor_logs)
 
-        # Atualiza visual
-        desenhar_arena(tela, arena, jogador, adversario, fonte, turnos)
-        pygame.display.flip()
+        rodape = f"> {entrada}_" if entrada else DICA_COMANDOS
+        estado = "pausado" if pausado else NOMES_VELOCIDADES[velocidade]
+        pygame.display.update(
+            renderizador.desenhar(jogador, adversario, max(1, game.turno - 1), rodape, estado)
+        )
 
-        turnos += 1
-        clock.tick(60)
-        time.sleep(0.3)
+    _imprimir_logs(game, cursor_logs)
+    pygame.display.update(
+        renderizador.desenhar(jogador, adversario, max(1, game.turno - 1), "", "fim")
+    )
 
     print("\n💥 FIM DA BATALHA! 💥")
 
-    if not jogador.esta_vivo():
-        print(f"🏆 {adversario.nome} venceu!")
-        return False
-
-    if not adversario.esta_vivo():
+    if game.status == "player_won":
         print(f"🏆 {jogador.nome} venceu!")
         return True
 
-    # Se a janela foi fechada, consideramos como derrota / interrupção
-    print("Jogo interrompido.")
+    if game.status == "enemy_won":
+        print(f"🏆 {adversario.nome} venceu!")
+    else:
+        print(f"Limite de {MAX_TURNOS_BATALHA} turnos atingido. Você perdeu.")
     return False
 
 
+def assistir_replay(replay, de: int = 1, velocidade: float = 1.0):
+    """
+    Mostra um replay (core/replay.py) na janela, a partir do turno `de`,
+    com o mesmo passo de tempo das lutas (PASSO_TURNO / velocidade).
+    Setas pulam 10 turnos (PgUp/PgDn: 100); pular não refaz a luta, só
+    lê o quadro-chave mais próximo do arquivo.
+    """
+    tela, fonte, clock = iniciar_pygame(replay.arena)
+    pygame.key.stop_text_input()
+    renderizador = RenderizadorArena(tela, replay.arena, fonte)
+    saltos = {pygame.K_LEFT: -10, pygame.K_RIGHT: 10, pygame.K_PAGEUP: -100, pygame.K_PAGEDOWN: 100}
+
+    turno = min(max(1, de), replay.turno_final)
+    pausado = False
+    acumulado = 0.0
+    while True:
+        dt = clock.tick(FPS) / 1000
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if event.type == pygame.KEYDOWN:
+                if event.key in saltos:
+                    turno = min(max(1, turno + saltos[event.key]), replay.turno_final)
+                    acumulado = 0.0
+                elif event.key in (pygame.K_ESCAPE, pygame.K_SPACE):
+                    pausado = not pausado
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderizador.invalidar()
+
+        if not pausado and turno < replay.turno_final:
+            acumulado = min(acumulado + dt * velocidade, ATRASO_MAXIMO * max(1.0, velocidade))
+            while acumulado >= PASSO_TURNO and turno < replay.turno_final:
+                turno += 1
+                acumulado -= PASSO_TURNO
+
+        jogador, adversario = replay.robos(turno)
+        status = replay.estado(turno)[0]
+        estado = "fim" if turno == replay.turno_final else ("pausado" if pausado else f"{velocidade:g}x")
+        pygame.display.update(
+            renderizador.desenhar(
+                jogador,
+                adversario,
+                max(1, turno - 1),
+                f"Replay: turno {turno}/{replay.turno_final} ({status}) | setas/PgUp/PgDn: pular | Espaço: pausa",
+                estado,
+            )
+        )
+
+
 # -----------------------------------------
 # Campanha de 10 partidas
 # -----------------------------------------
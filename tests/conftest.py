@@ -0,0 +1,4 @@
+import os
+
+# Os testes que importam api.main não gravam num aria_jogos.db de verdade
+os.environ.setdefault("ARIA_DB", "")
@@ -0,0 +1,55 @@
+"""
+Analisador Monte Carlo (core/analise_campanha.py): curva e intervalo
+de confiança, e histogramas que não dependem de quantos processos
+rodaram as tarefas.
+"""
+
+import json
+
+import pytest
+
+from core.analise_campanha import analisar, curva_sobrevivencia, largura_maxima, largura_wilson, main
+from core.campanha import TOTAL_PARTIDAS
+
+
+def test_curva_sobrevivencia():
+    # 10 campanhas: 4 perdem a 1ª partida, 3 vencem uma, 3 vencem todas
+    histograma = [4, 3] + [0] * (TOTAL_PARTIDAS - 2) + [3]
+    assert curva_sobrevivencia(histograma) == [0.6] + [0.3] * (TOTAL_PARTIDAS - 1)
+    assert curva_sobrevivencia([0] * (TOTAL_PARTIDAS + 1)) == [0.0] * TOTAL_PARTIDAS
+
+
+def test_largura_wilson():
+    assert largura_wilson(0.5, 0) == 1.0
+    assert largura_wilson(0.5, 100) == pytest.approx(0.1924, abs=1e-4)
+    # mais ensaios, intervalo mais estreito; nos extremos continua > 0
+    assert largura_wilson(0.5, 10_000) < largura_wilson(0.5, 100)
+    assert 0 < largura_wilson(0.0, 100) < largura_wilson(0.5, 100)
+
+
+def test_analisar_nao_depende_dos_processos():
+    kwargs = dict(iniciais=["vermelho", "azul"], estrategias=["ataque"], campanhas=12, tamanho_tarefa=4, seed=7)
+    sozinho = analisar(processos=1, **kwargs)
+    assert set(sozinho) == {("vermelho", "ataque"), ("azul", "ataque")}
+    assert all(sum(h) == 12 for h in sozinho.values())
+    assert analisar(processos=2, **kwargs) == sozinho
+
+
+def test_analisar_para_no_ic():
+    histogramas = analisar(
+        iniciais=["verde"], estrategias=["defesa"], campanhas=1_000, largura_ic=0.6, processos=1, tamanho_tarefa=5
+    )
+    histograma = histogramas[("verde", "defesa")]
+    assert sum(histograma) < 1_000
+    assert largura_maxima(histograma) <= 0.6
+
+
+def test_main_json(tmp_path, capsys):
+    saida = tmp_path / "curvas.json"
+    main(["--campanhas", "6", "--tarefa", "3", "--processos", "1", "--robo", "verde", "--estrategia", "alternado", "--json", str(saida)])
+    assert "verde" in capsys.readouterr().out
+
+    (linha,) = json.loads(saida.read_text(encoding="utf-8"))
+    assert (linha["robo"], linha["estrategia"]) == ("verde", "alternado")
+    assert sum(linha["histograma_vitorias"]) == 6
+    assert linha["sobrevivencia"] == curva_sobrevivencia(linha["histograma_vitorias"])
@@ -0,0 +1,88 @@
+"""
+Cérebro de busca (core/cerebro.py): o modelo da busca anda e mede como a
+engine, clonar é independente, e diário/snapshot refazem as decisões.
+"""
+
+import pytest
+
+from core.cerebro import CerebroBusca, CerebroGravado, _Modelo, codificar_decisoes, decodificar_decisoes
+from core.diario import Diario
+from core.engine import GameState
+from core.mapas import MAPAS
+from core.models import Arena, Robo
+from core.snapshot import codificar_estado, decodificar_estado
+
+
+def _robos():
+    return (
+        Robo("Jogador", "vermelho", 3, 2, 1, "agressivo"),
+        Robo("Adversário", "branco", 2, 2, 2, "agressivo"),
+    )
+
+
+@pytest.mark.parametrize("arena", [Arena(16, 5), Arena(mapa=MAPAS["pilares"])], ids=["aberta", "pilares"])
+def test_modelo_igual_a_engine(arena):
+    for seed in range(30):
+        game = GameState(*_robos(), arena, max_logs=1, seed=seed)
+        modelo = _Modelo(game, game.adversario, game.jogador, {})
+        while game.status == "running":
+            a, j = game.adversario, game.jogador
+            assert modelo.distancia(a.x, a.y, j.x, j.y) == arena.distancia(a, j)
+            for aproximar in (True, False):
+                clone = game.clonar()
+                clone.adversario.mover_em_direcao(clone.jogador, arena, aproximar)
+                assert clone.adversario.posicao() == modelo.passo(a.x, a.y, j.x, j.y, aproximar)
+            game.executar_turno()
+
+
+def test_clonar_nao_mexe_no_original():
+    game = GameState(*_robos(), Arena(16, 5), seed=3)
+    game.avancar(5)
+    clone = game.clonar()
+    clone.avancar(1000)
+    assert game.turno == 6
+    assert game.estado_compacto() != clone.estado_compacto()
+    assert len(clone.logs) <= 1
+
+    # o mesmo ponto de partida refaz a mesma luta
+    continuacao = game.clonar()
+    continuacao.avancar(1000)
+    assert (continuacao.estado_compacto(), continuacao.turno) == (clone.estado_compacto(), clone.turno)
+
+
+def test_escolha_dentro_de_acoes_e_conta_nos():
+    game = GameState(*_robos(), Arena(16, 5), seed=1)
+    cerebro = CerebroBusca("facil")
+    assert cerebro.escolher(game, 1) in ("atacar", "defender", "esquivar")
+    assert cerebro.nos > 0 and cerebro.profundidade_alcancada >= 1
+
+
+def test_diario_e_snapshot_com_cerebro():
+    game = GameState(*_robos(), Arena(16, 5), seed=7, dificuldade="dificil")
+    game.avancar(3)
+    game.aplicar_comando("ataque muito")
+    game.avancar(1000)
+
+    refeito = Diario.decodificar(Diario.de_jogo(game).codificar()).reconstruir()
+    assert refeito.estado_compacto() == game.estado_compacto()
+    assert refeito.decisoes == game.decisoes
+
+    restaurado = decodificar_estado(codificar_estado(game))
+    assert restaurado.decisoes == game.decisoes
+    assert restaurado.dificuldade == "dificil"
+
+
+def test_decisoes_codificadas():
+    decisoes = ["atacar", "defender", "esquivar", "atacar"]
+    assert decodificar_decisoes(codificar_decisoes(decisoes)) == decisoes
+    with pytest.raises(ValueError):
+        decodificar_decisoes("ax")
+
+
+def test_cerebro_gravado_sem_continuacao():
+    game = GameState(*_robos(), Arena(16, 5), seed=1)
+    gravado = CerebroGravado(["defender"])
+    assert gravado.escolher(game, 1) == "defender"
+    game.decisoes.append("defender")
+    with pytest.raises(ValueError):
+        gravado.escolher(game, 1)
@@ -0,0 +1,54 @@
+"""
+Interpretador de comandos (core/comandos.py): tabela de frases, o
+autômato contra uma busca ingênua e o cache.
+"""
+
+import pytest
+
+from core.comandos import _AUTOMATO, _interpretar, _normalizar, _padroes, interpretar
+
+
+CASOS = {
+    "focar no ataque": (2, 0, 0),
+    "focar mais na defesa": (0, 2, 0),
+    "tentar esquivar": (0, 0, 2),
+    "esquiva e contra-ataca": (1, 1, 2),
+    "contra-ataque": (3, 1, 0),
+    "ATAQUE!!! ataque": (2, 0, 0),
+    "manter distância": (0, 0, 2),
+    "manter distancia": (0, 0, 2),
+    "não ataque": (-2, 0, 0),
+    "nao ataque, defenda": (-2, 2, 0),
+    "ataque muito": (4, 0, 0),
+    "muito ataque e pouca defesa": (4, 1, 0),
+    "defenda um pouco": (0, 1, 0),
+    "não fuja, bata forte": (4, 0, -2),
+    "sem medo, ataque": (2, 0, 0),
+    "Defesa TOTAL!": (0, 4, 0),
+    "": (0, 0, 0),
+    "pular": (0, 0, 0),
+}
+
+
+@pytest.mark.parametrize("texto, esperado", CASOS.items(), ids=repr)
+def test_frases(texto, esperado):
+    assert _interpretar.__wrapped__(texto) == esperado
+    assert interpretar(texto) == dict(zip(("ataque", "defesa", "esquiva"), esperado))
+
+
+@pytest.mark.parametrize("texto", [*CASOS, "pare de fugir | já", "ação-reação... não!", "çççataque"])
+def test_automato_igual_busca_ingenua(texto):
+    dados = _normalizar(texto).encode("utf-8")
+    ingenua = sorted(
+        (inicio + len(padrao) - 1, len(padrao), valor)
+        for padrao, valor in _padroes().items()
+        for inicio in range(len(dados))
+        if dados.startswith(padrao.encode("ascii"), inicio)
+    )
+    assert sorted(_AUTOMATO.ocorrencias(dados)) == ingenua
+
+
+def test_cache_devolve_copias():
+    primeiro = interpretar("focar no ataque")
+    primeiro["ataque"] = 99
+    assert interpretar("focar no ataque")["ataque"] == 2
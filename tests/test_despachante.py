@@ -0,0 +1,184 @@
+"""
+Despachante com 3 workers de verdade em localhost (api/despachante.py):
+roteamento pelo anel, 421 de quem não é dono (e o reenvio), failover
+quando um worker morre e rebalanceamento quando ele volta.
+
+Sobe os processos uma vez para o módulo todo; o teste de failover fica
+por último porque derruba um worker.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+import uvicorn
+
+from api.despachante import TIMEOUT_PARTIDA, Despachante, conectar_ws, criar_app, porta_livre
+
+
+WORKERS = 3
+JOGOS = 30
+
+
+@pytest.fixture(scope="module")
+def cluster(tmp_path_factory):
+    despachante = Despachante(WORKERS, str(tmp_path_factory.mktemp("cluster") / "cluster.db"))
+    porta = porta_livre()
+    servidor = uvicorn.Server(
+        uvicorn.Config(criar_app(despachante), host="127.0.0.1", port=porta, log_level="warning")
+    )
+    thread = threading.Thread(target=servidor.run, daemon=True)
+    thread.start()
+    limite = time.monotonic() + TIMEOUT_PARTIDA
+    while not servidor.started and thread.is_alive() and time.monotonic() < limite:
+        time.sleep(0.05)
+    assert servidor.started, "o despachante não subiu"
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{porta}", timeout=30) as cliente:
+            yield despachante, cliente
+    finally:
+        servidor.should_exit = True
+        thread.join(TIMEOUT_PARTIDA)
+
+
+def _novos(cliente, jogos: int = JOGOS) -> dict[str, int]:
+    """game_id -> turno atual de `jogos` jogos novos."""
+    turnos = {}
+    for k in range(jogos):
+        r = cliente.post("/new_game", json={"robo_escolha": 1 + k % 3, "nome": f"R{k}", "seed": k})
+        assert r.status_code == 200, r.text
+        turnos[r.json()["game_id"]] = r.json()["turno"]
+    return turnos
+
+
+def _jogar(cliente, turnos: dict[str, int], gid: str) -> bool:
+    r = cliente.post("/turno", params={"game_id": gid})
+    if r.status_code != 200:
+        return False
+    esperado = turnos[gid] + 1
+    turnos[gid] = r.json()["turno"]
+    # jogo que terminou não avança o turno
+    return r.json()["turno"] == esperado or r.json()["status"] != "running"
+
+
+def _donos(despachante, ids) -> dict[str, list[str]]:
+    donos = {}
+    for gid in ids:
+        donos.setdefault(despachante.anel.dono(gid), []).append(gid)
+    return donos
+
+
+# -------------------------------
+# Roteamento
+# -------------------------------
+
+
+def test_jogos_espalhados_e_turno_chega_ao_dono(cluster):
+    despachante, cliente = cluster
+    turnos = _novos(cliente)
+    assert len(_donos(despachante, turnos)) == WORKERS
+    assert all(_jogar(cliente, turnos, gid) for gid in turnos for _ in range(3))
+
+
+def test_lote_turnos_dividido_entre_os_donos(cluster):
+    _, cliente = cluster
+    turnos = _novos(cliente)
+    ids = list(turnos)
+    r = cliente.post("/lote/turnos", json={"game_ids": [*ids, "nao-existe"]})
+    assert r.status_code == 200
+    lote = r.json()["resultados"]
+    assert len(lote) == len(ids) + 1 and lote[-1]["status"] == 404
+    for gid, item in zip(ids, lote):
+        # na ordem do pedido, cada um com um turno a mais
+        assert item["game_id"] == gid and item["status"] == 200
+        assert item["estado"]["turno"] == turnos[gid] + 1 or item["estado"]["status"] != "running"
+
+
+def test_etag_e_id_desconhecido(cluster):
+    _, cliente = cluster
+    gid = next(iter(_novos(cliente, 1)))
+    etag = cliente.get("/state", params={"game_id": gid}).headers.get("etag")
+    r = cliente.get("/state", params={"game_id": gid}, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert cliente.get("/state", params={"game_id": "nao-existe"}).status_code == 404
+
+
+def test_turno_repetido_executa_uma_vez(cluster):
+    _, cliente = cluster
+    r = cliente.post("/new_game", json={"robo_escolha": 1, "nome": "Repetido", "seed": 1})
+    gid, turno, etag = r.json()["game_id"], r.json()["turno"], r.headers.get("etag")
+    with ThreadPoolExecutor(5) as pool:
+        respostas = list(
+            pool.map(lambda _: cliente.post("/turno", params={"game_id": gid, "turno": turno}), range(5))
+        )
+    assert all(r.status_code == 200 and r.json()["turno"] == turno + 1 for r in respostas)
+    r = cliente.post("/command", params={"game_id": gid}, json={"texto": "ataque"}, headers={"If-Match": etag})
+    assert r.status_code == 409
+
+
+def test_nao_dono_responde_421_e_despachante_reenvia(cluster):
+    despachante, cliente = cluster
+    gid = next(iter(_novos(cliente, 1)))
+    dono = despachante.anel.dono(gid)
+    outro = next(w for n, w in despachante.workers.items() if n != dono)
+    assert cliente.get(outro.url + "/state", params={"game_id": gid}).status_code == 421
+
+    # como no meio de uma troca de anel: a primeira tentativa vai ao worker errado
+    dono_certo = despachante.dono
+    errados = [outro]
+    despachante.dono = lambda game_id: errados.pop() if errados and game_id == gid else dono_certo(game_id)
+    reenvios = despachante.total_reenvios
+    try:
+        r = cliente.get("/state", params={"game_id": gid})
+    finally:
+        del despachante.dono
+    assert r.status_code == 200 and r.json()["turno"] == 1
+    assert not errados and despachante.total_reenvios == reenvios + 1
+
+
+@pytest.mark.skipif(conectar_ws is None, reason="precisa do websockets")
+def test_ws_pelo_despachante(cluster):
+    _, cliente = cluster
+    gid = next(iter(_novos(cliente, 1)))
+    base = str(cliente.base_url).replace("http", "ws")
+
+    async def primeira_mensagem():
+        async with conectar_ws(f"{base}/ws?game_id={gid}") as ws:
+            return json.loads(await ws.recv())
+
+    assert asyncio.run(primeira_mensagem()).get("tipo") == "estado"
+
+
+# -------------------------------
+# Failover (por último: derruba um worker)
+# -------------------------------
+
+
+def test_failover_e_rebalanceamento(cluster):
+    despachante, cliente = cluster
+    turnos = _novos(cliente)
+    assert all(_jogar(cliente, turnos, gid) for gid in turnos)
+    vitima = despachante.workers[sorted(_donos(despachante, turnos))[0]]
+
+    # sem aviso, depois de a escrita atrasada chegar ao disco
+    time.sleep(1.0)
+    vitima.processo.kill()
+    assert all(_jogar(cliente, turnos, gid) for gid in turnos)
+    assert vitima.nome not in despachante.ativos
+    assert len(_donos(despachante, turnos)) == WORKERS - 1
+
+    limite = time.monotonic() + TIMEOUT_PARTIDA
+    while vitima.nome not in despachante.ativos and time.monotonic() < limite:
+        time.sleep(0.1)
+    assert vitima.nome in despachante.ativos, f"{vitima.nome} não voltou ao anel"
+    assert vitima.reinicios == 1
+
+    # os jogos continuam de onde pararam, e os dele voltam para ele
+    assert all(_jogar(cliente, turnos, gid) for gid in turnos for _ in range(2))
+    assert len(_donos(despachante, turnos)) == WORKERS
+    r = cliente.get(vitima.url + "/_cluster/saude", headers={"X-Aria-Token": despachante.token})
+    assert r.json()["jogos"] > 0
@@ -0,0 +1,73 @@
+"""
+Diários vindos de fora (POST /replay): o que não dá para reproduzir sem
+buscar de novo vira DiarioInvalido, e o /replay responde 422.
+"""
+
+import base64
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from core.diario import Diario, DiarioInvalido
+from core.engine import GameState
+from core.models import Arena, Robo
+
+
+def _jogo(dificuldade=None, turnos=10) -> GameState:
+    game = GameState(
+        Robo("Vermelho", "vermelho", 3, 2, 1, "agressivo"),
+        Robo("Adversário", "branco", 2, 2, 2, "agressivo"),
+        Arena(),
+        seed=1,
+        dificuldade=dificuldade,
+    )
+    game.avancar(turnos)
+    return game
+
+
+def _alterado(game: GameState, **campos) -> Diario:
+    diario = Diario.de_jogo(game)
+    valores = {**vars(diario), **campos}
+    return Diario(**valores)
+
+
+@pytest.mark.parametrize("turnos", [10, 1000])  # em andamento e terminada
+def test_diario_do_jogo_com_cerebro_reconstroi_igual(turnos):
+    game = _jogo("facil", turnos)
+    diario = Diario.decodificar(Diario.de_jogo(game).codificar())
+    assert diario.decisoes == game.decisoes
+    refeito = diario.reconstruir()
+    assert (refeito.turno, refeito.jogador.hp_atual, refeito.adversario.hp_atual) == (
+        game.turno,
+        game.jogador.hp_atual,
+        game.adversario.hp_atual,
+    )
+
+
+def test_decisoes_sem_dificuldade():
+    with pytest.raises(DiarioInvalido, match="sem dificuldade"):
+        _alterado(_jogo(), decisoes=["atacar"])
+
+
+def test_decisoes_de_menos():
+    game = _jogo("dificil", turnos=0)
+    for turno_final in (1, 2):
+        assert _alterado(game, turno_final=turno_final).decisoes == []
+    with pytest.raises(DiarioInvalido, match="decisões do cérebro"):
+        _alterado(game, turno_final=200)
+
+
+@pytest.mark.parametrize(
+    "campos",
+    [
+        {"decisoes": ["atacar"], "turno_final": 20},
+        {"dificuldade": "dificil", "decisoes": [], "turno_final": 200},
+    ],
+)
+def test_replay_responde_422(campos):
+    diario = Diario.de_jogo(_jogo())
+    diario.__dict__.update(campos)  # como um cliente que montou o diário à mão
+    texto = base64.b64encode(diario.codificar()).decode("ascii")
+    r = TestClient(app).post("/replay", json={"diario": texto})
+    assert r.status_code == 422, r.text
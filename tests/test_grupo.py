@@ -0,0 +1,73 @@
+"""
+Batalhas em grupo (core/grupo.py): o alvo escolhido pela grade espacial é
+o mesmo da busca por força bruta, também em mapas com obstáculos.
+"""
+
+import random
+
+import pytest
+
+from core.grupo import BatalhaEmGrupo, GradeEspacial, _mais_proximo_forca_bruta, batalha_aleatoria
+from core.mapas import carregar_mapa
+from core.models import Arena, Robo
+
+
+# Muralha de cima a baixo com uma passagem só, na última linha
+MURALHA = "\n".join(["." * 10 + "#" + "." * 9] * 8 + ["." * 20])
+
+
+def _robo(nome: str) -> Robo:
+    return Robo(nome, "branco", 2, 2, 2, "agressivo")
+
+
+@pytest.mark.parametrize("tamanho_celula", [1, 4, 16])
+def test_grade_igual_forca_bruta(tamanho_celula):
+    batalha = batalha_aleatoria(150, 60, 30, equipes=4, seed=1)
+    batalha.grade = GradeEspacial(60, 30, tamanho_celula)
+    for i, robo in enumerate(batalha.robos):
+        batalha.grade.inserir(i, robo.x, robo.y)
+    while batalha.status == "running" and batalha.turno < 100:
+        for i, robo in enumerate(batalha.robos):
+            if robo.esta_vivo():
+                assert batalha.inimigo_mais_proximo(i) == _mais_proximo_forca_bruta(batalha, i)
+        batalha.executar_turno()
+
+
+def test_grade_acompanha_movimentos_e_quedas():
+    batalha = batalha_aleatoria(60, 20, 20, equipes=2, seed=2)
+    batalha.avancar(200)
+    vivos = {i for i, r in enumerate(batalha.robos) if r.esta_vivo()}
+    assert len(vivos) < 60
+    assert len(batalha.grade) == len(vivos) and all(i in batalha.grade for i in vivos)
+    for equipe, n in batalha.vivos_por_equipe.items():
+        assert n == sum(batalha.equipes[i] == equipe for i in vivos)
+    for i in vivos:
+        robo = batalha.robos[i]
+        assert i in batalha.grade.no_raio(robo.x, robo.y, 0)
+
+
+def test_alvo_pelo_caminho_e_nao_pela_manhattan():
+    arena = Arena(mapa=carregar_mapa(MURALHA))
+    # o 1 está a 2 passos em linha reta, mas do outro lado da muralha
+    batalha = BatalhaEmGrupo(
+        [_robo("A"), _robo("B"), _robo("C")], arena, posicoes=[(9, 0), (11, 0), (4, 0)], max_logs=0
+    )
+    a, b, c = batalha.robos
+    assert arena.distancia(a, b) > arena.distancia(a, c) > abs(a.x - b.x)
+    assert batalha.inimigo_mais_proximo(0) == 2
+    assert batalha.inimigos_no_alcance(0, 2) == []
+
+
+def test_grade_igual_forca_bruta_com_mapa():
+    rng = random.Random(3)
+    arena = Arena(mapa=carregar_mapa(MURALHA))
+    robos = [_robo(f"R{i}") for i in range(40)]
+    posicoes = [(rng.randrange(arena.largura), rng.randrange(arena.altura)) for _ in robos]
+    batalha = BatalhaEmGrupo(
+        robos, arena, equipes=[i % 3 for i in range(40)], posicoes=posicoes, seed=3, max_logs=0, tamanho_celula=3
+    )
+    while batalha.status == "running" and batalha.turno < 100:
+        for i, robo in enumerate(batalha.robos):
+            if robo.esta_vivo():
+                assert batalha.inimigo_mais_proximo(i) == _mais_proximo_forca_bruta(batalha, i)
+        batalha.executar_turno()
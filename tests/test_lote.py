@@ -0,0 +1,26 @@
+"""
+simular_lote (NumPy) contra o GameState: mesma taxa de vitória e mesma
+duração média para os três robôs iniciais, com seeds fixas.
+"""
+
+import pytest
+
+from core.lote import verificar_equivalencia
+from core.models import Robo
+
+
+OPONENTE = Robo("Adversário", "branco", 2, 2, 2, "agressivo")
+
+
+@pytest.mark.parametrize(
+    "robo",
+    [
+        Robo("Vermelho", "vermelho", 3, 2, 1, "agressivo"),
+        Robo("Verde", "verde", 2, 3, 1, "defensivo"),
+        Robo("Azul", "azul", 1, 1, 4, "velocista"),
+    ],
+    ids=lambda robo: robo.nome,
+)
+def test_lote_equivale_ao_game_state(robo):
+    r = verificar_equivalencia(robo, OPONENTE, n=5000, seed=0)
+    assert r["equivalente"], r
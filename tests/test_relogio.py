@@ -0,0 +1,51 @@
+"""
+Relógio do servidor (api/relogio.py): cada lote de ticks gasta no máximo
+o orçamento de busca dos cérebros; o resto fica para o lote seguinte.
+"""
+
+import asyncio
+
+from api.relogio import ADIADO, Relogio
+from api.store import GameStore
+from core.cerebro import NIVEIS
+from core.engine import GameState
+from core.models import Arena, Robo
+
+
+def _novo(store: GameStore, dificuldade=None) -> str:
+    jogador = Robo("Vermelho", "vermelho", 3, 2, 1, "agressivo")
+    adversario = Robo("Adversário", "branco", 2, 2, 2, "agressivo")
+    return store.criar(GameState(jogador, adversario, Arena(), seed=1, dificuldade=dificuldade))
+
+
+def test_lote_respeita_o_orcamento_de_busca():
+    store = GameStore()
+    relogio = Relogio(store, orcamento_ms=100.0)
+    sem_cerebro = [_novo(store) for _ in range(5)]
+    com_cerebro = [_novo(store, "dificil") for _ in range(10)]
+
+    resultados = relogio._avancar(sem_cerebro + com_cerebro)
+    adiados = [gid for gid, r in resultados.items() if r is ADIADO]
+    cabem = int(100.0 // NIVEIS["dificil"].orcamento_ms)
+    assert len(adiados) == len(com_cerebro) - cabem
+    assert all(resultados[gid] == "running" for gid in sem_cerebro)
+    for gid in com_cerebro:
+        with store.usar(gid) as game:
+            assert game.turno == (1 if gid in adiados else 2)
+
+
+def test_adiados_rodam_no_mesmo_tick():
+    store = GameStore()
+    relogio = Relogio(store, orcamento_ms=NIVEIS["dificil"].orcamento_ms)
+    ids = [_novo(store, "dificil") for _ in range(3)]
+
+    async def assistir():
+        assinaturas = [relogio.assistir(gid, 0.05) for gid in ids]
+        await asyncio.wait_for(asyncio.gather(*(a.mudou.wait() for a in assinaturas)), 5)
+        for a in assinaturas:
+            relogio.deixar(a)
+        await relogio.parar()
+
+    asyncio.run(assistir())
+    # um lote por jogo: o orçamento só dá para um cérebro por vez
+    assert relogio.total_ticks >= 3 and relogio.total_lotes == relogio.total_ticks
@@ -0,0 +1,89 @@
+"""
+Replays (core/replay.py): cada turno do arquivo bate com o diário
+refeito, e o gravador incremental dá os mesmos bytes de gravar_jogo.
+"""
+
+import base64
+import json
+import random
+
+import pytest
+
+from core.campanha import gerar_adversario
+from core.diario import Diario
+from core.engine import GameState
+from core.models import Arena, Robo
+from core.replay import GravadorJogo, Replay, ReplayInvalido, _estado_robo, gravar, gravar_jogo, main
+
+
+COMANDOS = ["focar no ataque", "defenda muito", "não fuja", "esquiva"]
+
+
+def _luta(k: int, rng: random.Random) -> GameState:
+    jogador = Robo("Jogador", "vermelho", 3, 2, 1, "agressivo")
+    return GameState(jogador, gerar_adversario(1 + k % 10, rng), Arena(16, 5), seed=k)
+
+
+@pytest.mark.parametrize("k", range(10))
+def test_gravador_igual_gravar_jogo(k):
+    rng = random.Random(k)
+    game = _luta(k, rng)
+    gravador = GravadorJogo(game, intervalo=1 + k % 40)
+    while game.status == "running" and game.turno < 400:
+        if rng.random() < 0.1:
+            game.aplicar_comando(rng.choice(COMANDOS))
+        game.executar_turno()
+        if rng.random() < 0.05:
+            assert gravador.atualizar(game) == gravar_jogo(game, gravador.intervalo), game.turno
+    assert gravador.atualizar(game) == gravar_jogo(game, gravador.intervalo)
+
+
+@pytest.mark.parametrize("k", range(10))
+def test_replay_igual_diario(k):
+    rng = random.Random(k)
+    game = _luta(k, rng)
+    while game.status == "running" and game.turno < 400:
+        if rng.random() < 0.1:
+            game.aplicar_comando(rng.choice(COMANDOS))
+        game.executar_turno()
+
+    diario = Diario.de_jogo(game)
+    replay = Replay(gravar(diario, intervalo=1 + k % 40))
+    assert replay.turno_final == game.turno
+    for turno in sorted({1, replay.turno_final, *range(17, replay.turno_final, 17)}):
+        esperado = diario.reconstruir(turno)
+        _, jogador, adversario, _ = replay.estado(turno)
+        assert (jogador, adversario) == (_estado_robo(esperado.jogador), _estado_robo(esperado.adversario))
+    assert replay.quadro(replay.turno_final)["status"] == game.status
+
+
+def test_luta_longa_salta_ao_ultimo_turno():
+    game = GameState(
+        Robo("Tanque", "verde", 1, 9, 1, "defensivo"), Robo("Outro", "azul", 1, 9, 1, "defensivo"), Arena(), seed=1
+    )
+    game.avancar(2000)
+    replay = Replay(gravar_jogo(game))
+    ultimo = replay.quadro(game.turno)
+    assert ultimo["jogador"]["hp_atual"] == game.jogador.hp_atual
+    assert ultimo["adversario"]["hp_atual"] == game.adversario.hp_atual
+
+
+def test_bytes_invalidos():
+    dados = gravar_jogo(_luta(0, random.Random(0)))
+    for ruim in (b"", dados[:-3], b"XXXX" + dados[4:]):
+        with pytest.raises(ReplayInvalido):
+            Replay(ruim)
+
+
+def test_linha_de_comando(tmp_path, capsys):
+    game = _luta(1, random.Random(1))
+    game.avancar(50)
+    entrada = tmp_path / "diario.txt"
+    entrada.write_bytes(base64.b64encode(Diario.de_jogo(game).codificar()))
+    saida = tmp_path / "luta.arpl"
+
+    assert main(["gravar", str(entrada), "-o", str(saida), "--intervalo", "8"]) == 0
+    capsys.readouterr()
+    assert main(["mostrar", str(saida), "--turno", "10", "--eventos"]) == 0
+    mostrado = json.loads(capsys.readouterr().out)
+    assert mostrado["intervalo"] == 8 and mostrado["quadro"]["turno"] == 10
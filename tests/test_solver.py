@@ -0,0 +1,48 @@
+"""
+Solver exato (core/solver.py): bate com a amostra do simular_lote para
+os robôs iniciais, e o cache em SQLite devolve o mesmo resultado.
+"""
+
+import pytest
+
+from core.mapas import carregar_mapa
+from core.models import Arena, Robo
+from core.solver import SolverExato, comparar_com_lote
+
+
+OPONENTE = Robo("Adversário", "branco", 2, 2, 2, "agressivo")
+INICIAIS = [
+    Robo("Vermelho", "vermelho", 3, 2, 1, "agressivo"),
+    Robo("Verde", "verde", 2, 3, 1, "defensivo"),
+    Robo("Azul", "azul", 1, 1, 4, "velocista"),
+]
+
+
+@pytest.fixture(scope="module")
+def solver():
+    return SolverExato()
+
+
+@pytest.mark.parametrize("robo", INICIAIS, ids=lambda robo: robo.nome)
+def test_exato_confere_com_lote(solver, robo):
+    r = comparar_com_lote(robo, OPONENTE, n=20000, seed=0, solver=solver)
+    assert r["confere"], r
+    assert 0.0 <= r["vitoria"] <= 1.0
+    assert r["vitoria"] + r["derrota"] == pytest.approx(1.0)
+
+
+def test_preferencias_mudam_o_resultado(solver):
+    robo = Robo("Vermelho", "vermelho", 3, 2, 1, "agressivo")
+    antes = solver.resolver(robo, OPONENTE)["vitoria"]
+    robo.aplicar_preferencias({"ataque": 4, "defesa": 0, "esquiva": 0})
+    assert solver.resolver(robo, OPONENTE)["vitoria"] != antes
+
+
+def test_cache_em_sqlite(tmp_path):
+    caminho = str(tmp_path / "solver.db")
+    arena = Arena(mapa=carregar_mapa("J..#..\n......\n..#..A"))
+    primeiro = SolverExato(caminho).resolver(INICIAIS[0], OPONENTE, arena)
+    # outro solver, sem nada em memória: vem do SQLite
+    segundo = SolverExato(caminho)
+    assert segundo.resolver(INICIAIS[0], OPONENTE, arena) == primeiro
+    assert not segundo._cadeias
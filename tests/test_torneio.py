@@ -0,0 +1,112 @@
+"""
+Torneios (core/torneio.py): a classificação não depende de quantos
+processos nem do tamanho das tarefas, e retomar do checkpoint dá o
+mesmo resultado que rodar direto.
+"""
+
+import json
+
+import pytest
+
+from core.torneio import (
+    PERSONALIDADES,
+    CheckpointIncompativel,
+    Classificacao,
+    elenco_completo,
+    main,
+    mata_mata,
+    todos_contra_todos,
+)
+
+
+# 12 configurações, lutas curtas: o torneio inteiro leva menos de um segundo
+ELENCO = elenco_completo(6, 6)
+MAX_TURNOS = 200
+
+
+def _todos(**kwargs):
+    kwargs.setdefault("processos", 1)
+    return todos_contra_todos(ELENCO, seed=3, max_turnos=MAX_TURNOS, saida=None, **kwargs)
+
+
+def _tabela(classificacao: Classificacao) -> tuple:
+    return (
+        classificacao.confrontos,
+        classificacao.lutas,
+        classificacao.total_lutas,
+        classificacao.total_turnos,
+    )
+
+
+def test_elenco_completo():
+    elenco = elenco_completo(6, 8)
+    assert len(set(elenco)) == len(elenco)
+    for ataque, defesa, velocidade, personalidade, _ in elenco:
+        assert min(ataque, defesa, velocidade) >= 1
+        assert 6 <= ataque + defesa + velocidade <= 8
+        assert personalidade in PERSONALIDADES
+    assert len(ELENCO) == 12
+
+
+def test_classificacao_registrar():
+    classificacao = Classificacao(ELENCO[:3])
+    classificacao.registrar([0, 1, 2, 0, 0, 30])
+    classificacao.registrar([1, 2, 1, 1, 0, 20])
+    classificacao.registrar([0, 2, 0, 1, 1, 50])
+    assert classificacao.confrontos == [[1, 0, 1], [0, 1, 1], [1, 1, 0]]
+    assert classificacao.lutas == [[2, 1, 1], [1, 0, 3], [2, 1, 1]]
+    assert [classificacao.pontos(a) for a in range(3)] == [3, 1, 4]
+    assert classificacao.ordem() == [2, 0, 1]
+    assert (classificacao.total_confrontos, classificacao.total_lutas, classificacao.total_turnos) == (3, 6, 100)
+
+
+def test_todos_contra_todos_nao_depende_dos_processos():
+    n = len(ELENCO)
+    sozinho = _todos(tamanho_tarefa=7)
+    assert sozinho.total_confrontos == n * (n - 1) // 2
+    assert sozinho.total_lutas == 2 * sozinho.total_confrontos
+    assert _tabela(_todos(processos=2, tamanho_tarefa=500)) == _tabela(sozinho)
+
+
+def test_checkpoint_retoma(tmp_path):
+    caminho = tmp_path / "torneio.jsonl"
+    direto = _todos(tamanho_tarefa=10, checkpoint=str(caminho))
+
+    # processo morto no meio: sobram o cabeçalho, duas tarefas e uma linha cortada
+    linhas = caminho.read_text(encoding="utf-8").split("\n")
+    caminho.write_text("\n".join(linhas[:3]) + "\n" + linhas[3][:15], encoding="utf-8")
+    retomado = _todos(tamanho_tarefa=10, checkpoint=str(caminho))
+    assert _tabela(retomado) == _tabela(direto)
+
+    # tudo no arquivo: nada roda de novo
+    assert _tabela(_todos(tamanho_tarefa=10, checkpoint=str(caminho))) == _tabela(direto)
+
+    with pytest.raises(CheckpointIncompativel):
+        _todos(tamanho_tarefa=10, checkpoint=str(caminho), batalhas=4)
+
+
+def test_mata_mata(tmp_path):
+    caminho = str(tmp_path / "mata.jsonl")
+    campeao, classificacao = mata_mata(
+        ELENCO, batalhas=3, seed=5, processos=1, tamanho_tarefa=2, checkpoint=caminho, max_turnos=MAX_TURNOS, saida=None
+    )
+    assert 0 <= campeao < len(ELENCO)
+    assert classificacao.total_confrontos == len(ELENCO) - 1
+    # o campeão não perdeu nenhum confronto
+    assert classificacao.confrontos[campeao][2] == 0
+
+    de_novo = mata_mata(
+        ELENCO, batalhas=3, seed=5, processos=2, tamanho_tarefa=2, checkpoint=caminho, max_turnos=MAX_TURNOS, saida=None
+    )
+    assert de_novo[0] == campeao
+    assert _tabela(de_novo[1]) == _tabela(classificacao)
+
+
+def test_main_json(tmp_path, capsys):
+    saida = tmp_path / "classificacao.json"
+    main(["todos", "--status", "6", "6", "--processos", "1", "--max-turnos", str(MAX_TURNOS), "--seed", "3", "--json", str(saida)])
+    assert "Elenco: 12 configurações" in capsys.readouterr().out
+
+    linhas = json.loads(saida.read_text(encoding="utf-8"))
+    assert len(linhas) == len(ELENCO)
+    assert [linha["pontos"] for linha in linhas] == sorted((linha["pontos"] for linha in linhas), reverse=True)